@@ -0,0 +1,83 @@
+"""
+日付・締め切り抽出のマイクロベンチマーク
+本番の経路 _extract_deadline（iter_label_dates を締切ラベルで打ち切り、無ければ募集期間・hint で推定）を、
+置き換え前の従来方式（締め切りテキストの正規表現 → parse_japanese_date）および
+打ち切らずに全ラベルの日付を解釈する iter_label_dates と、bench/fixtures/ の本文と長文で比較する。
+
+実行: python -m bench.bench_dates [--repeat N]
+"""
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.bench_parse_backends import load_fixtures
+from src.crawl.parse import _extract_deadline, parse_html_bs4
+from src.utils.dates import iter_label_dates, parse_japanese_date
+
+# 締め切り表記が末尾にしか無い長文（全文走査のスループット確認用）
+_LONG_TEXT = (
+    "建設現場の生産性向上に取り組むスタートアップとの共創を目指します。" * 400
+    + " 募集期間：2026年9月20日〜2026年11月30日"
+)
+# 「応募」が多く締め切り表記が無い本文（従来方式の "応募.*?締" が出現ごとに末尾まで走査する）
+_NO_DEADLINE_TEXT = "応募方法は専用フォームからお願いします。" * 500
+
+# 置き換え前の src/crawl/parse.py の締め切りテキストのパターン（比較用）
+_LEGACY_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"応募.*?締[め切り]+[：:\s]*(.{5,30})",
+        r"締[め切り]+[：:\s]*(.{5,30})",
+        r"募集期間[：:\s]*(.{5,50})",
+        r"期限[：:\s]*(.{5,30})",
+        r"deadline[：:\s]*(.{5,30})",
+    )
+]
+
+
+def _legacy(text: str) -> None:
+    for pattern in _LEGACY_PATTERNS:
+        m = pattern.search(text)
+        if m:
+            parse_japanese_date(m.group(1).strip())
+            return
+
+
+def _all_labels(text: str) -> int:
+    return len(list(iter_label_dates(text)))
+
+
+def _production(text: str) -> None:
+    _extract_deadline(text, None)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500, help="1テキストあたりの実行回数")
+    args = parser.parse_args()
+
+    texts = [(name, parse_html_bs4(url, html).body_text) for name, url, html in load_fixtures()]
+    texts.append(("long_text", _LONG_TEXT))
+    texts.append(("no_deadline_text", _NO_DEADLINE_TEXT))
+
+    print(
+        f"{'text':<28}{'chars':>7}{'legacy [us]':>13}{'all_labels [us]':>17}"
+        f"{'extract [us]':>14}{'mentions':>10}"
+    )
+    for name, text in texts:
+        t_legacy = timeit.timeit(lambda: _legacy(text), number=args.repeat) / args.repeat
+        t_labels = timeit.timeit(lambda: _all_labels(text), number=args.repeat) / args.repeat
+        t_extract = timeit.timeit(lambda: _production(text), number=args.repeat) / args.repeat
+        print(
+            f"{name:<28}{len(text):>7}{t_legacy * 1e6:>13.1f}{t_labels * 1e6:>17.1f}"
+            f"{t_extract * 1e6:>14.1f}{_all_labels(text):>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
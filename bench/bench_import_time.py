@@ -0,0 +1,101 @@
+"""
+起動（import）時間の計測と退行チェック
+軽量コマンドが読み込むモジュールを別プロセスで `python -X importtime` 付きで import し、
+累積 import 時間を計測する。あわせて次を検査し、違反があれば終了コード 1 を返す。
+  - 重い依存（httpx / bs4 / lxml）を読み込んでいないこと
+  - import だけでデータディレクトリを作成していないこと
+  - 累積 import 時間が --budget-ms 以内であること
+
+実行: python -m bench.bench_import_time [--repeat N] [--budget-ms MS] [--output result.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# CLIの軽量サブコマンドが読み込むモジュール
+LIGHT_MODULES = [
+    "src.config",
+    "src.utils.logger",
+    "src.cli",
+    "src.filter.seen_store",
+    "src.notify.emailer",
+    "src.llm.usage",
+    "src.profiles",
+]
+HEAVY_DEPENDENCIES = ("httpx", "bs4", "lxml")
+
+_PROBE = """
+import json, sys
+import {module}
+from src.utils.logger import get_logger
+get_logger()
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+
+def _import_once(module: str, data_dir: Path) -> tuple[float, list[str]]:
+    """module を新しいプロセスで import し、(累積import時間[ms], 読み込まれた重い依存) を返す"""
+    env = {**os.environ, "REVERSE_ACCEL_DATA_DIR": str(data_dir), "PYTHONPATH": str(ROOT)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_DEPENDENCIES)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="モジュールごとの計測回数（最小値を採用）")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="累積 import 時間の上限")
+    parser.add_argument("--output", type=Path, help="結果 JSON の出力先")
+    args = parser.parse_args()
+
+    failures = 0
+    results: dict[str, dict] = {}
+    print(f"{'module':<26}{'import [ms]':>12}  heavy deps")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        for module in LIGHT_MODULES:
+            samples = []
+            heavy: list[str] = []
+            for _ in range(args.repeat):
+                ms, heavy = _import_once(module, data_dir)
+                samples.append(ms)
+            best = min(samples)
+            over = best > args.budget_ms
+            failures += bool(heavy) + over
+            results[module] = {"import_ms": round(best, 2), "heavy_dependencies": heavy}
+            mark = "  <- 上限超過" if over else ""
+            print(f"{module:<26}{best:>12.2f}  {', '.join(heavy) or '-'}{mark}")
+
+        if data_dir.exists():
+            failures += 1
+            print(f"\nimport 時にデータディレクトリが作成されました: {data_dir}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if failures:
+        print(f"\n{failures}件の違反があります")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+HTML解析バックエンド比較ベンチマーク（bs4 版 vs lxml 高速版）
+bench/fixtures/ の保存済みページで両者の出力が一致することを確認し、1ページあたりの解析時間を比較する。
+
+実行: python -m bench.bench_parse_backends [--repeat N]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.crawl.fast_parse import parse_html_lxml
+from src.crawl.parse import parse_html_bs4
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_fixtures() -> list[tuple[str, str, str]]:
+    """(ファイル名, URL, HTML) のリストを返す"""
+    manifest = json.loads((FIXTURES_DIR / "manifest.json").read_text(encoding="utf-8"))
+    return [
+        (name, url, (FIXTURES_DIR / name).read_text(encoding="utf-8"))
+        for name, url in manifest.items()
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200, help="1ページあたりの解析回数")
+    args = parser.parse_args()
+
+    mismatches = 0
+    total_bs4 = total_lxml = 0.0
+    print(f"{'fixture':<28}{'bs4 [ms]':>10}{'lxml [ms]':>11}{'speedup':>9}  equal")
+    for name, url, html in load_fixtures():
+        equal = parse_html_bs4(url, html) == parse_html_lxml(url, html)
+        mismatches += not equal
+        t_bs4 = timeit.timeit(lambda: parse_html_bs4(url, html), number=args.repeat) / args.repeat
+        t_lxml = timeit.timeit(lambda: parse_html_lxml(url, html), number=args.repeat) / args.repeat
+        total_bs4 += t_bs4
+        total_lxml += t_lxml
+        print(
+            f"{name:<28}{t_bs4 * 1000:>10.3f}{t_lxml * 1000:>11.3f}"
+            f"{t_bs4 / t_lxml:>8.1f}x  {'ok' if equal else 'MISMATCH'}"
+        )
+
+    print(
+        f"{'total':<28}{total_bs4 * 1000:>10.3f}{total_lxml * 1000:>11.3f}"
+        f"{total_bs4 / total_lxml:>8.1f}x"
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+ローカル擬似 OpenRouter サーバー（オフラインのエンドツーエンド計測用）
+POST .../chat/completions に OpenRouter 互換の応答を返す。遅延・エラー率は引数で調整できる。
+  - 検索（user メッセージに「URL:」行が無い）: このサーバーが配信するフィクスチャページのURL配列
+  - 評価（「URL:」行がある）: ページごとの評価JSON（「=== ページ N ===」区切りならJSON配列）
+GET /pages/<ファイル名> で bench/fixtures/ のHTMLを配信するため、検索→フェッチ→評価まで外部通信なしで通る。
+
+実行例:
+    python -m bench.fake_openrouter --port 8765 --latency-ms 800 --jitter-ms 400 --error-rate 0.05
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/api/v1 EMAIL_DRY_RUN=1 \\
+        REVERSE_ACCEL_DATA_DIR=/tmp/ra-data python -m src.main
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+_URL_LINE = re.compile(r"^URL:\s*(\S+)", re.M)
+# 検索1クエリで返すURL数（クエリ間で重複させ、マージ処理も通るようにする）
+_URLS_PER_QUERY = 4
+
+
+class FakeOpenRouter(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency_ms: float,
+        jitter_ms: float,
+        error_rate: float,
+        error_status: int,
+        seed: int,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.pages = sorted(
+            p.name for p in FIXTURES_DIR.glob("*.html")
+        )
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> tuple[float, bool]:
+        """(遅延秒, エラーにするか) を決める（シード固定で再現可能）"""
+        with self._rng_lock:
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-1, 1) * self.jitter_ms) / 1000
+            fail = self._rng.random() < self.error_rate
+            self.requests += 1
+            self.errors += fail
+        return delay, fail
+
+
+def _search_content(server: FakeOpenRouter, query: str) -> str:
+    start = int(hashlib.sha256(query.encode("utf-8")).hexdigest(), 16) % len(server.pages)
+    names = [server.pages[(start + i) % len(server.pages)] for i in range(_URLS_PER_QUERY)]
+    return json.dumps([f"{server.base_url}/pages/{n}" for n in names])
+
+
+def _evaluate_content(user_content: str) -> str:
+    records = []
+    for url in _URL_LINE.findall(user_content):
+        digest = int(hashlib.sha256(url.encode("utf-8")).hexdigest(), 16)
+        records.append({
+            "タイトル": f"擬似評価 {url.rsplit('/', 1)[-1]}",
+            "参加お勧め度": digest % 5 + 1,
+            "参照URL": url,
+            "is_active": "closed" not in url,
+        })
+    if "=== ページ" in user_content:
+        return json.dumps(records, ensure_ascii=False)
+    return json.dumps(records[0] if records else {}, ensure_ascii=False)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeOpenRouter
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def do_GET(self) -> None:
+        name = self.path.rsplit("/", 1)[-1]
+        if not self.path.startswith("/pages/") or name not in self.server.pages:
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        self._send(200, (FIXTURES_DIR / name).read_bytes(), "text/html; charset=utf-8")
+
+    def do_POST(self) -> None:
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+
+        delay, fail = self.server.draw()
+        time.sleep(delay)
+        if fail:
+            self._send_json(
+                self.server.error_status,
+                {"error": {"code": self.server.error_status, "message": "injected failure"}},
+            )
+            return
+
+        messages = payload.get("messages") or []
+        user_content = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        if _URL_LINE.search(user_content):
+            content = _evaluate_content(user_content)
+        else:
+            content = _search_content(self.server, user_content)
+
+        self._send_json(200, {
+            "id": f"fake-{self.server.requests}",
+            "model": payload.get("model", ""),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            # 文字数からの概算（日本語は1文字≒1トークン）
+            "usage": {
+                "prompt_tokens": prompt_chars,
+                "completion_tokens": len(content),
+                "total_tokens": prompt_chars + len(content),
+            },
+        })
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500, help="chat/completions の平均遅延")
+    parser.add_argument("--jitter-ms", type=float, default=200, help="遅延の揺らぎ幅（±）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="エラー応答を返す割合（0〜1）")
+    parser.add_argument("--error-status", type=int, default=500, help="エラー時のステータス（429 など）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOpenRouter(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    print(f"擬似OpenRouter: {server.base_url}/api/v1（フィクスチャ{len(server.pages)}件を配信）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"リクエスト{server.requests}件 / 注入エラー{server.errors}件")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+オフライン・マイクロベンチマークスイート
+bench/fixtures/ の保存済みページだけを使い（ネットワーク・APIキー不要）、
+解析・日付抽出・フィルタの各段階の1回あたり所要時間を計測して JSON に書き出す。
+コミット間で結果ファイルを比較し、性能の退行を検出できる。
+
+実行:
+    python -m bench.run_suite                              # bench/results/<commit>.json に保存
+    python -m bench.run_suite --output base.json
+    python -m bench.run_suite --compare base.json          # 比較して退行があれば終了コード 1
+    python -m bench.run_suite --filter parse_html          # 名前に一致するものだけ実行
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.bench_parse_backends import load_fixtures
+from src.crawl import fast_parse
+from src.crawl import parse as bs4_parse
+from src.crawl.parse import ParsedPage, _extract_deadline, parse_html, parse_html_bs4
+from src.filter.deadline import apply_deadline_filter
+from src.filter.dedupe import dedupe_pages
+from src.filter.freshness import filter_stale_pages, sort_by_freshness
+from src.utils.dates import iter_label_dates, parse_japanese_date, today_jst
+from src.utils.logger import get_logger
+from src.utils.urls import canonicalize_url
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SCHEMA_VERSION = 1
+
+# フィルタ系ベンチマークに流すページ数・既知URL数
+_CORPUS_PAGES = 500
+_KNOWN_URLS = 5000
+
+# parse_japanese_date に与える表記のサンプル（1回の計測でまとめて処理する）
+_DATE_SAMPLES = [
+    "2026年11月30日",
+    "2026/11/30",
+    "2026-11-30T10:00:00+09:00",
+    "令和8年11月30日",
+    "11月30日",
+    "11/30",
+    "締切：2026年11月30日（月）17:00",
+    "未定",
+    "",
+]
+
+_SITE_HOSTS = {"eiicon": "eiicon.net", "peatix": "peatix.com", "creww": "creww.me"}
+
+
+# ── 計測 ──────────────────────────────────────────────────────────
+
+def _measure(fn: Callable[[], object], repeat: int, min_time: float) -> dict:
+    """fn を min_time 秒以上かかる回数ずつ repeat 回計測し、1回あたりの時間（µs）を返す"""
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    samples = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "best_us": round(min(samples), 3),
+        "median_us": round(statistics.median(samples), 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _site_of(url: str) -> str:
+    host = urlparse(url).hostname or ""
+    for site, domain in _SITE_HOSTS.items():
+        if domain in host:
+            return site
+    return "generic"
+
+
+# ── ベンチマーク定義 ──────────────────────────────────────────────
+
+def _build_corpus(pages: list[ParsedPage]) -> list[ParsedPage]:
+    """
+    フィクスチャの解析結果を複製し、URL・日付をずらしたフィルタ用コーパスを作る。
+    日付は実行日基準で割り当てるため、実行日が変わっても通過・除外の割合は一定に保たれる。
+    """
+    today = today_jst()
+    corpus: list[ParsedPage] = []
+    for i in range(_CORPUS_PAGES):
+        base = pages[i % len(pages)]
+        # 期限切れ・期限内・期限が遠い・期限不明 を混在させる
+        offset = (i * 7) % 150 - 30
+        corpus.append(
+            dataclasses.replace(
+                base,
+                url=f"{base.url.rstrip('/')}/bench-{i}",
+                deadline_date=None if i % 5 == 0 else today + timedelta(days=offset),
+                published_date=None if i % 4 == 0 else today - timedelta(days=(i * 3) % 120),
+                updated_date=None if i % 3 else today - timedelta(days=i % 20),
+            )
+        )
+    return corpus
+
+
+def _define_benchmarks() -> dict[str, Callable[[], object]]:
+    fixtures = load_fixtures()
+    benches: dict[str, Callable[[], object]] = {}
+
+    # 解析: ルーター（既定バックエンド）と bs4 版をフィクスチャごとに
+    for name, url, html in fixtures:
+        benches[f"parse_html/{name}"] = lambda u=url, h=html: parse_html(u, h)
+        benches[f"parse_html_bs4/{name}"] = lambda u=url, h=html: parse_html_bs4(u, h)
+
+    # サイト別パーサー: 該当サイトのフィクスチャ全件を1回として計測（木の構築を含む）
+    by_site: dict[str, list[tuple[str, str]]] = {}
+    for _, url, html in fixtures:
+        by_site.setdefault(_site_of(url), []).append((url, html))
+    for site, items in sorted(by_site.items()):
+        bs4_fn = getattr(bs4_parse, f"_parse_{site}")
+        lxml_fn = getattr(fast_parse, f"_parse_{site}")
+        benches[f"site_parser/bs4/{site}"] = lambda fn=bs4_fn, it=items: [
+            fn(bs4_parse._soup(h), u) for u, h in it
+        ]
+        benches[f"site_parser/lxml/{site}"] = lambda fn=lxml_fn, it=items: [
+            fn(fast_parse._document(h), u) for u, h in it
+        ]
+
+    # 日付・締め切り抽出
+    pages = [p for p in (parse_html_bs4(url, html) for _, url, html in fixtures) if p]
+    bodies = [p.body_text for p in pages]
+    benches["dates/parse_japanese_date"] = lambda: [parse_japanese_date(s) for s in _DATE_SAMPLES]
+    benches["dates/extract_deadline"] = lambda: [_extract_deadline(b, None) for b in bodies]
+    benches["dates/iter_label_dates"] = lambda: [list(iter_label_dates(b)) for b in bodies]
+
+    # フィルタ: 各関数は入力リストを変更しないため同じコーパスを使い回す
+    corpus = _build_corpus(pages)
+    # dedupe_pages は SeenUrlStore.lookup と同じく正規化済みの送信済みURLを受け取る
+    known = {f"https://known.example.com/item/{i}" for i in range(_KNOWN_URLS)}
+    known.update(canonicalize_url(p.url) for p in corpus[::10])
+    benches["filter/dedupe_pages"] = lambda: dedupe_pages(corpus, known)
+    benches["filter/apply_deadline_filter"] = lambda: apply_deadline_filter(corpus)
+    benches["filter/filter_stale_pages"] = lambda: filter_stale_pages(corpus)
+    benches["filter/sort_by_freshness"] = lambda: sort_by_freshness(corpus)
+
+    return benches
+
+
+# ── 入出力 ────────────────────────────────────────────────────────
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _compare(current: dict, baseline: dict, baseline_path: Path, threshold: float) -> int:
+    """baseline と比較して表を出力し、threshold 倍を超えて遅くなった件数を返す"""
+    base_results = baseline.get("results", {})
+    print(f"\n比較対象: {baseline_path}（commit {baseline.get('commit', '?')}）")
+    print(f"{'benchmark':<48}{'base [µs]':>12}{'now [µs]':>12}{'ratio':>8}")
+
+    regressions = 0
+    for name, result in current["results"].items():
+        base = base_results.get(name)
+        if base is None:
+            print(f"{name:<48}{'-':>12}{result['best_us']:>12.1f}{'new':>8}")
+            continue
+        ratio = result["best_us"] / base["best_us"] if base["best_us"] else float("inf")
+        mark = ""
+        if ratio > threshold:
+            regressions += 1
+            mark = "  <- 退行"
+        print(f"{name:<48}{base['best_us']:>12.1f}{result['best_us']:>12.1f}{ratio:>7.2f}x{mark}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="結果 JSON の出力先（既定: bench/results/<commit>.json）")
+    parser.add_argument("--compare", type=Path, help="比較対象とする過去の結果 JSON")
+    parser.add_argument("--threshold", type=float, default=1.25, help="退行とみなす best 比（既定 1.25）")
+    parser.add_argument("--filter", default="", help="名前にこの文字列を含むベンチマークだけ実行")
+    parser.add_argument("--repeat", type=int, default=5, help="各ベンチマークの計測回数")
+    parser.add_argument("--min-time", type=float, default=0.05, help="1計測あたりの最短時間（秒）")
+    args = parser.parse_args()
+
+    # 出力先が比較対象と同じファイルでも比較できるよう、計測前に読み込んでおく
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+
+    # フィルタ関数のログ出力（ファイル・stdout）を計測に含めない
+    get_logger().setLevel(logging.WARNING)
+
+    benches = {k: v for k, v in _define_benchmarks().items() if args.filter in k}
+    results: dict[str, dict] = {}
+    print(f"{'benchmark':<48}{'best [µs]':>12}{'median [µs]':>13}")
+    for name, fn in benches.items():
+        results[name] = _measure(fn, args.repeat, args.min_time)
+        print(f"{name:<48}{results[name]['best_us']:>12.1f}{results[name]['median_us']:>13.1f}")
+
+    commit = _git_commit()
+    report = {
+        "schema": SCHEMA_VERSION,
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output: Optional[Path] = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"\n結果を保存しました: {output}")
+
+    if baseline is not None:
+        regressions = _compare(report, baseline, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{regressions}件のベンチマークが {args.threshold}x を超えて遅くなっています")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,8 @@
 # リバース型アクセラ収集システム cron実行ラッパー
 # cron設定例（毎日10:00 JST）:
 #   0 10 * * * /Users/yoshinomukanou/docs/run.sh >> /Users/yoshinomukanou/docs/src/logs/cron.log 2>&1
+# cron の代わりに常駐させる場合（接続・プロセスを使い回し、スリープで逃した実行も取り戻す）:
+#   python -m src.cli daemon   （予定は DAEMON_SCHEDULE、手動実行は python -m src.cli trigger）
 
 set -e
 
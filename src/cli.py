@@ -0,0 +1,197 @@
+"""
+コマンドラインエントリーポイント
+サブコマンドごとに必要なモジュールだけを関数内で import する。
+収集処理（run）以外は httpx / bs4 / lxml を読み込まないため、数十ミリ秒で起動する。
+
+実行例:
+    python -m src.cli run            # 収集を1回実行（python -m src.main と同じ）
+    python -m src.cli run --resume   # 本日中断した実行を完了済みステップから再開
+    python -m src.cli seen-stats     # 送信済みURLの件数・最終送信日時
+    python -m src.cli resend         # 最後に送ったレポートを再送（--profile NAME で他のプロファイル）
+    python -m src.cli usage          # 本日のAPI費用と直近の実行ごとの集計
+    python -m src.cli queries        # 検索クエリごとの収量（新規URL・フィルタ通過・送信）とスコア
+    python -m src.cli daemon         # 常駐して DAEMON_SCHEDULE の時刻に実行（src/daemon.py）
+    python -m src.cli trigger        # 常駐中のデーモンに今すぐ実行させる（--resume / --status）
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+# cron実行時のimportパス対策
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    from src.main import main
+
+    main(resume=args.resume)
+    return 0
+
+
+def _load_profile(name: str):
+    from src.profiles import find_profile
+
+    try:
+        return find_profile(name)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return None
+
+
+def _cmd_seen_stats(args: argparse.Namespace) -> int:
+    profile = _load_profile(args.profile)
+    if profile is None:
+        return 2
+    if not profile.seen_db.exists():
+        print(f"送信済みURLはまだありません（{profile.seen_db}）")
+        return 0
+
+    from src.filter.seen_store import SeenUrlStore
+
+    with SeenUrlStore(profile.seen_db, legacy_json=profile.legacy_seen_json) as store:
+        stats = store.stats(recent_days=args.days)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+def _cmd_resend(args: argparse.Namespace) -> int:
+    from src.config import ensure_dirs
+    from src.notify.emailer import resend_last_report
+
+    profile = _load_profile(args.profile)
+    if profile is None:
+        return 2
+    ensure_dirs()
+    return 0 if resend_last_report(profile) else 1
+
+
+def _cmd_usage(args: argparse.Namespace) -> int:
+    import sqlite3
+
+    from src.config import DAILY_BUDGET_JPY, USAGE_DB, USD_JPY_RATE
+    from src.utils.dates import today_jst
+
+    if not USAGE_DB.exists():
+        print(f"API使用量の記録はまだありません（{USAGE_DB}）")
+        return 0
+
+    conn = sqlite3.connect(USAGE_DB)
+    try:
+        spent = conn.execute(
+            "SELECT COALESCE(SUM(cost_usd), 0) FROM calls WHERE day = ?",
+            (today_jst().isoformat(),),
+        ).fetchone()[0]
+        runs = conn.execute(
+            "SELECT run_id, calls, prompt_tokens, completion_tokens, cost_usd,"
+            " accepted_records, deferred_pages FROM runs ORDER BY run_id DESC LIMIT ?",
+            (args.runs,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    budget = f" / 上限 {DAILY_BUDGET_JPY:.2f}円" if DAILY_BUDGET_JPY > 0 else ""
+    print(f"本日のAPI費用: {spent * USD_JPY_RATE:.3f}円{budget}")
+    for run_id, calls, prompt, completion, cost, accepted, deferred in runs:
+        per_record = f"{cost * USD_JPY_RATE / accepted:.3f}円/件" if accepted else "-"
+        print(
+            f"  {run_id}: {calls}回 入力{prompt}・出力{completion}トークン "
+            f"{cost * USD_JPY_RATE:.3f}円 採用{accepted}件（{per_record}） 保留{deferred}件"
+        )
+    return 0
+
+
+def _cmd_queries(args: argparse.Namespace) -> int:
+    from src.config import QUERY_YIELD_DB
+
+    if not QUERY_YIELD_DB.exists():
+        print(f"クエリ収量の記録はまだありません（{QUERY_YIELD_DB}）")
+        return 0
+
+    from src.search.query_yield import QueryYieldStore
+
+    with QueryYieldStore(QUERY_YIELD_DB) as store:
+        scores = store.scores(window_days=args.days)
+    print(f"直近{args.days}日  スコア  回数  URL  新規  通過  送信  最終検索日  クエリ")
+    for s in sorted(scores.values(), key=lambda s: -s.score):
+        print(
+            f"  {s.score:>13.2f}  {s.runs:>4}  {s.urls:>3}  {s.new_urls:>4}  {s.passed:>4}"
+            f"  {s.sent:>4}  {s.last_day}  {s.query}"
+        )
+    return 0
+
+
+def _cmd_daemon(args: argparse.Namespace) -> int:
+    from src.daemon import Daemon
+
+    Daemon().serve_forever()
+    return 0
+
+
+def _cmd_trigger(args: argparse.Namespace) -> int:
+    import socket
+
+    from src.config import DAEMON_SOCKET
+
+    command = "status" if args.status else "resume" if args.resume else "run"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(str(DAEMON_SOCKET))
+            sock.sendall(f"{command}\n".encode("utf-8"))
+            reply = sock.makefile("r", encoding="utf-8").readline()
+    except OSError as e:
+        print(f"デーモンに接続できません（{DAEMON_SOCKET}）: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(json.loads(reply), ensure_ascii=False, indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="リバース型アクセラ自動収集システム",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="収集を1回実行してレポートを送信する")
+    p.add_argument("--resume", action="store_true", help="本日のチェックポイントから中断した実行を再開する")
+    p.set_defaults(func=_cmd_run)
+
+    p = sub.add_parser("seen-stats", help="送信済みURLの統計を表示する")
+    p.add_argument("--days", type=int, default=7, help="直近の送信件数を数える日数")
+    p.add_argument("--profile", default="default", help="対象のプロファイル名")
+    p.set_defaults(func=_cmd_seen_stats)
+
+    p = sub.add_parser("resend", help="最後に送信したレポートを再送する")
+    p.add_argument("--profile", default="default", help="対象のプロファイル名")
+    p.set_defaults(func=_cmd_resend)
+
+    p = sub.add_parser("usage", help="API費用と実行ごとの集計を表示する")
+    p.add_argument("--runs", type=int, default=10, help="表示する直近の実行数")
+    p.set_defaults(func=_cmd_usage)
+
+    p = sub.add_parser("queries", help="検索クエリごとの収量を表示する")
+    p.add_argument("--days", type=int, default=30, help="集計する日数")
+    p.set_defaults(func=_cmd_queries)
+
+    p = sub.add_parser("daemon", help="常駐して予定時刻に実行する（手動トリガー受付つき）")
+    p.set_defaults(func=_cmd_daemon)
+
+    p = sub.add_parser("trigger", help="常駐中のデーモンに今すぐ実行させる")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--resume", action="store_true", help="本日のチェックポイントから再開する")
+    group.add_argument("--status", action="store_true", help="実行せず状態だけ表示する")
+    p.set_defaults(func=_cmd_trigger)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
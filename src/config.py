@@ -1,32 +1,54 @@
 """
 環境変数・定数管理
 cronから実行されても確実に.envを読み込めるよう絶対パスで指定
+import 時の副作用は持たない: .env は読むだけで os.environ を書き換えず、
+ログ・データディレクトリは ensure_dirs() で書き込む直前に作成する
 """
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
 # cronはカレントディレクトリが不定のため、__file__基準で絶対パスを解決
 _BASE_DIR = Path(__file__).resolve().parent.parent  # /docs/
 _ENV_FILE = _BASE_DIR / ".env"
-load_dotenv(dotenv_path=_ENV_FILE)
+
+
+def _read_env_file(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+    from dotenv import dotenv_values  # .env が無ければ import しない
+
+    return {k: v for k, v in dotenv_values(path).items() if v is not None}
+
+
+_ENV_FILE_VALUES = _read_env_file(_ENV_FILE)
+
+
+def _env(key: str, default: str = "") -> str:
+    """環境変数 → .env → 既定値 の順に値を返す（load_dotenv と同じく環境変数を優先）"""
+    return os.environ.get(key, _ENV_FILE_VALUES.get(key, default))
+
 
 # ── OpenRouter ──────────────────────────────────────────────────
-OPENROUTER_API_KEY: str = os.environ.get("OPENROUTER_API_KEY", "")
-OPENROUTER_MODEL_SEARCH: str = os.environ.get(
+OPENROUTER_API_KEY: str = _env("OPENROUTER_API_KEY", "")
+OPENROUTER_MODEL_SEARCH: str = _env(
     "OPENROUTER_MODEL_SEARCH", "perplexity/sonar"
 )
-OPENROUTER_MODEL_EXTRACT: str = os.environ.get(
+OPENROUTER_MODEL_EXTRACT: str = _env(
     "OPENROUTER_MODEL_EXTRACT", "google/gemini-flash-1.5"
 )
-OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
+# ローカルの擬似サーバー（bench/fake_openrouter.py）に向ける場合は環境変数で上書きする
+OPENROUTER_BASE_URL: str = _env(
+    "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"
+)
 
 # ── Email (Gmail SMTP SSL) ────────────────────────────────────────
-EMAIL_FROM: str = os.environ.get("EMAIL_FROM", "")
-EMAIL_TO: str = os.environ.get("EMAIL_TO", "")
-EMAIL_APP_PASSWORD: str = os.environ.get("EMAIL_APP_PASSWORD", "")
+EMAIL_FROM: str = _env("EMAIL_FROM", "")
+EMAIL_TO: str = _env("EMAIL_TO", "")
+EMAIL_APP_PASSWORD: str = _env("EMAIL_APP_PASSWORD", "")
 SMTP_HOST: str = "smtp.gmail.com"
 SMTP_PORT: int = 465
+# 1 ならSMTP送信せず、本文をログディレクトリに書き出す（オフライン実行用）
+EMAIL_DRY_RUN: bool = _env("EMAIL_DRY_RUN", "") == "1"
 
 # ── 収集設定 ─────────────────────────────────────────────────────
 PRIORITY_SOURCES: list[str] = [
@@ -41,9 +63,17 @@ FRESHNESS_DAYS: int = 7     # 鮮度スコアの基準日数
 STALENESS_MAX_DAYS: int = 120  # 掲載日・更新日がこれより古く期限不明なら除外
 
 # ── クロール設定 ──────────────────────────────────────────────────
-FETCH_CONCURRENCY: int = 5
-FETCH_DELAY_SEC: float = 1.5
+FETCH_CONCURRENCY: int = 5           # 全体の同時接続数
+FETCH_PER_HOST_CONCURRENCY: int = 1  # 同一ホストへの同時接続数
+FETCH_DELAY_SEC: float = 1.5         # 同一ホストへのリクエスト開始間隔
 FETCH_TIMEOUT_SEC: int = 15
+FETCH_MAX_BYTES: int = 3_000_000     # これを超えるレスポンスは読み込みを打ち切ってスキップ
+FETCH_ALLOWED_CONTENT_TYPES: tuple[str, ...] = ("text/html", "application/xhtml+xml")
+FETCH_QUEUE_SIZE: int = 10           # ストリーミング時のフェッチ中＋解析待ちHTMLの最大件数（FETCH_CONCURRENCY 以上にする）
+# HTML解析バックエンド: "lxml"（高速版、失敗時はbs4へフォールバック）/ "bs4"
+PARSE_BACKEND: str = _env("PARSE_BACKEND", "lxml")
+# HTML解析のプロセス数（1ならプロセスを立てず順次解析）
+PARSE_WORKERS: int = max(1, min(4, os.cpu_count() or 1))
 USER_AGENT: str = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -53,13 +83,120 @@ USER_AGENT: str = (
 # ── LLM設定 ──────────────────────────────────────────────────────
 LLM_MAX_TOKENS: int = 1200
 LLM_TEMPERATURE: float = 0.1
+LLM_CONCURRENCY: int = 4        # LLM評価の同時実行数（1なら順次実行）
+LLM_TIMEOUT_SEC: int = 60
+LLM_BATCH_SIZE: int = 1         # 1リクエストで評価するページ数（2以上でバッチ評価）
 SEARCH_MAX_TOKENS: int = 1500
+SEARCH_CONCURRENCY: int = 5     # 検索クエリの同時実行数
+SEARCH_TIMEOUT_SEC: int = 60    # 検索1クエリあたりのタイムアウト
 BODY_EXCERPT_CHARS: int = 2000  # LLMに渡す本文の最大文字数
 
 # ── パス ─────────────────────────────────────────────────────────
 LOG_DIR: Path = Path(__file__).resolve().parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
 
-DATA_DIR: Path = Path(__file__).resolve().parent / "data"
-DATA_DIR.mkdir(exist_ok=True)
-SEEN_URLS_FILE: Path = DATA_DIR / "seen_urls.json"  # 送信済みURL管理ファイル
+# オフライン計測などで状態（送信済みURL・キャッシュ）を分離したい場合は環境変数で差し替える
+DATA_DIR: Path = Path(
+    _env("REVERSE_ACCEL_DATA_DIR") or Path(__file__).resolve().parent / "data"
+)
+SEEN_URLS_DB: Path = DATA_DIR / "seen_urls.db"      # 送信済みURL管理DB（SQLite）
+SEEN_URLS_FILE: Path = DATA_DIR / "seen_urls.json"  # 旧形式（初回のみDBへ取り込む）
+LAST_REPORT_FILE: Path = DATA_DIR / "last_report.json"  # 最後に送信したレポート（再送用）
+CHECKPOINT_DIR: Path = DATA_DIR / "checkpoints"  # 実行日ごとの各ステップ出力（中断からの再開用）
+CHECKPOINT_KEEP_DAYS: int = 3   # これより古い実行日のチェックポイントは削除
+# 評価プロファイル定義（src/profiles.py）。無ければ ONESTRUCTION の既定プロファイルのみ
+PROFILES_FILE: Path = Path(_env("PROFILES_FILE") or _BASE_DIR / "profiles.json")
+HTTP_CACHE_ENABLED: bool = True
+HTTP_CACHE_DIR: Path = DATA_DIR / "http_cache"  # ETag/Last-Modified と本文の保存先
+HTTP_CACHE_MAX_AGE_DAYS: int = 30  # この日数再検証されていないエントリは使わず削除する
+HTTP_CACHE_MAX_MB: int = 200       # キャッシュ全体の上限（超えたら最後に使った日時が古い順に削除）
+
+# ── HTTP記録・再生 ────────────────────────────────────────────────
+# "record": 検索・フェッチ・LLMの通信を HTTP_REPLAY_DIR に保存 / "replay": 保存済みの応答を返す（ネットワーク不使用）
+HTTP_REPLAY_MODE: str = _env("HTTP_REPLAY_MODE", "")
+HTTP_REPLAY_DIR: Path = Path(
+    _env("HTTP_REPLAY_DIR") or DATA_DIR / "replay"
+)
+
+# ── 近似重複排除 ─────────────────────────────────────────────────
+NEAR_DUP_ENABLED: bool = True
+NEAR_DUP_DB: Path = DATA_DIR / "fingerprints.db"  # 送信済みページのSimHash索引
+NEAR_DUP_MAX_HAMMING: int = 8   # 64bit SimHashのハミング距離がこれ以下なら重複とみなす（本文の差分5〜10%程度まで）
+NEAR_DUP_MIN_CHARS: int = 200   # 本文がこれより短いページは判定しない
+NEAR_DUP_SHINGLE: int = 3       # SimHashに使う文字n-gramの長さ
+NEAR_DUP_BANDS: int = 3         # 索引のバンド数（少ないほど1バンドが広く候補が絞れるが、近傍値の照合回数が増える）
+NEAR_DUP_MAX_AGE_DAYS: int = 180  # これより前に送信したページの指紋は削除する（0なら無期限）
+
+# ── トークン使用量・コスト ───────────────────────────────────────
+USAGE_DB: Path = DATA_DIR / "usage.db"  # API呼び出しごとのトークン数・コストと実行ごとの集計
+# 応答に usage.cost が無い場合の概算単価（USD / 100万トークン: 入力, 出力）
+MODEL_PRICES_USD_PER_MTOK: dict[str, tuple[float, float]] = {
+    "perplexity/sonar": (1.0, 1.0),
+    "google/gemini-flash-1.5": (0.075, 0.3),
+}
+USD_JPY_RATE: float = 150.0
+# 1日（JST）あたりのAPI費用の上限（円）。0以下なら無制限
+DAILY_BUDGET_JPY: float = float(_env("DAILY_BUDGET_JPY", "10"))
+
+# ── LLMキャッシュ ─────────────────────────────────────────────────
+LLM_CACHE_ENABLED: bool = True
+LLM_CACHE_FILE: Path = DATA_DIR / "llm_cache.json"
+LLM_CACHE_TTL_DAYS: int = 14        # この日数を過ぎた評価結果は再評価する
+LLM_CACHE_MAX_ENTRIES: int = 2000   # 超過分は古い順に削除
+
+# ── 検索結果キャッシュ ────────────────────────────────────────────
+SEARCH_CACHE_ENABLED: bool = True
+SEARCH_CACHE_FILE: Path = DATA_DIR / "search_cache.json"  # クエリ → 抽出URLリスト
+SEARCH_CACHE_DEFAULT_TTL_DAYS: int = 0  # 下記に該当しないクエリの再検索間隔（0なら毎回検索）
+# クエリの前方一致 → 再検索間隔（日）。結果が日々ほぼ変わらない固定クエリは数日に1回だけ検索する
+SEARCH_CACHE_TTL_DAYS: dict[str, int] = {
+    "site:auba.eiicon.net": 3,
+    "site:growth.creww.me": 3,
+}
+
+# ── 検索クエリの収量記録・スケジューリング ─────────────────────────────
+QUERY_YIELD_DB: Path = DATA_DIR / "query_yield.db"  # クエリごと・実行ごとの収量（新規URL・フィルタ通過・送信件数）
+SEARCH_QUERY_BUDGET: int = 10    # 1回の実行でAPI検索するクエリ数の上限（0なら全クエリ）。キャッシュ使用分は数えない
+SEARCH_EXPLORE_SLOTS: int = 2    # 予算のうち、収量の低いクエリを試す探索枠
+SEARCH_MIN_OBSERVATIONS: int = 5  # 記録がこの回数未満のクエリは収量に関わらず検索する（新規クエリの立ち上げ）
+SEARCH_MAX_SKIP_DAYS: int = 7    # これ以上検索していないクエリは予算に関わらず検索する（取りこぼし防止）
+SEARCH_YIELD_WINDOW_DAYS: int = 30  # 収量スコアの集計期間
+
+# ── 優先ソースの直接収集（サイトマップ・フィード）───────────────────────
+# 0 なら直接収集を行わず、検索結果だけを候補にする
+DISCOVERY_ENABLED: bool = _env("DISCOVERY_ENABLED", "1") == "1"
+# ホスト → 収集設定
+#   pattern : 候補にする記事URLの正規表現（一覧・タグページ等を除く）
+#   feeds   : サイトマップ・RSS/AtomのURL（省略時は robots.txt の Sitemap 行 → /sitemap.xml）
+#   sitemap : False なら feeds の省略時もサイトマップを探さない
+#   keywords: RSS/Atom の記事のうち、いずれかをタイトルに含むものだけ候補にする（サイトマップの記事には適用しない）
+DISCOVERY_SOURCES: dict[str, dict] = {
+    "auba.eiicon.net": {"pattern": r"^https://auba\.eiicon\.net/projects/\d+"},
+    "growth.creww.me": {"pattern": r"^https://growth\.creww\.me/challenges/\d+"},
+    # 全イベントのサイトマップは大きく対象外が大半のため読まない。
+    # キーワードで絞れる RSS/Atom フィードのURLを feeds に設定した場合だけ収集する
+    "peatix.com": {
+        "pattern": r"^https://peatix\.com/event/\d+",
+        "sitemap": False,
+        "keywords": ["アクセラ", "共創", "オープンイノベーション", "協業", "スタートアップ", "ピッチ", "PoC"],
+    },
+}
+DISCOVERY_STATE_FILE: Path = DATA_DIR / "discovery_state.json"  # ソースごとの lastmod カーソル・条件付きリクエスト用の検証子
+DISCOVERY_FIRST_RUN_DAYS: int = 14      # カーソルが無い初回は、この日数以内に更新された記事だけ候補にする
+DISCOVERY_MAX_URLS: int = 20            # 1ソースあたり1回の最大候補数（古い順、残りは次回）。検索結果の MAX_URLS とは別枠
+DISCOVERY_MAX_DOCUMENTS: int = 10       # 1ソースあたりに取得するサイトマップ・フィードの最大数
+DISCOVERY_MAX_BYTES: int = 20_000_000   # サイトマップ1ファイルの読み込み上限（展開後）
+DISCOVERY_SEEN_MAX: int = 5000          # lastmod の無いエントリの既出判定に保持するURL数
+DISCOVERY_MAX_RETRIES: int = 3          # 取得・解析の失敗や実行の失敗で処理できなかった記事を、次回以降に返し直す回数
+
+# ── 常駐（デーモン）モード ───────────────────────────────────────────
+DAEMON_SCHEDULE: str = _env("DAEMON_SCHEDULE", "0 10 * * *")  # cron形式（分 時 日 月 曜日、JST）
+DAEMON_CATCHUP_HOURS: int = 24  # 停止・スリープで逃した実行予定がこの時間以内なら、復帰時に1回だけ実行
+DAEMON_POLL_SEC: int = 30       # 予定時刻の確認間隔（スリープ復帰の検知もこの間隔）
+DAEMON_SOCKET: Path = DATA_DIR / "daemon.sock"  # 手動実行トリガー用のUNIXソケット
+DAEMON_STATE_FILE: Path = DATA_DIR / "daemon_state.json"  # 最後に処理した実行予定と直近の実行結果
+
+
+def ensure_dirs() -> None:
+    """ログ・データディレクトリを作成する（実行・書き込みを伴うコマンドの開始時に呼ぶ）"""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,240 @@
+"""
+lxml直接利用の高速HTMLパーサー
+BeautifulSoupの木を構築せず、lxml.html のネイティブ木とXPathで抽出する。
+出力は parse.py の bs4 版パーサーと同一の ParsedPage になるよう、
+get_text / find / decompose の挙動（script・style・template内の文字列除外など）を再現している。
+解析できない入力では例外を送出し、呼び出し側（parse_html）が bs4 版にフォールバックする。
+"""
+import re
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from src.crawl.parse import (
+    ParsedPage,
+    _extract_deadline,
+    _jsonld_from_strings,
+)
+from src.utils.dates import parse_japanese_date
+
+# bs4 の get_text が対象外とする文字列を含む要素（子孫も含めて除外）
+_NON_TEXT_TAGS = {"script", "style", "template"}
+# _body_text で本文から取り除く要素
+_BOILERPLATE_TAGS = ("script", "style", "nav", "footer", "header")
+_BODY_SKIP_TAGS = _NON_TEXT_TAGS | set(_BOILERPLATE_TAGS)
+
+_EIICON_MAIN = re.compile(r"detail|content|description", re.I)
+_PEATIX_DESC = re.compile(r"description|summary", re.I)
+_CREWW_MAIN = re.compile(r"challenge|detail|overview", re.I)
+
+
+# ── ヘルパー ──────────────────────────────────────────────────────
+
+def _document(html: str) -> lxml_html.HtmlElement:
+    return lxml_html.document_fromstring(html)
+
+
+def _iter_strings(
+    root: lxml_html.HtmlElement,
+    skip_tags: set[str] = _NON_TEXT_TAGS,
+) -> Iterator[str]:
+    """
+    root 配下のテキストノードを文書順に返す（bs4 の _all_strings 相当、skip_tags の子孫は除外）。
+    コメント・処理命令は start/end を生まないため個別のイベントで受け、本文は除いて直後のテキスト（tail）だけ返す。
+    """
+    skip_depth = 0
+    for event, el in etree.iterwalk(root, events=("start", "end", "comment", "pi")):
+        if event in ("comment", "pi"):
+            if el.tail and not skip_depth:
+                yield el.tail
+            continue
+
+        if event == "start":
+            if skip_depth or el.tag in skip_tags:
+                skip_depth += 1
+            elif el.text:
+                yield el.text
+            continue
+
+        if skip_depth:
+            skip_depth -= 1
+        if el is not root and el.tail and not skip_depth:
+            yield el.tail
+
+
+def _get_text(
+    root: lxml_html.HtmlElement,
+    separator: str = "",
+    strip: bool = False,
+    skip_tags: set[str] = _NON_TEXT_TAGS,
+) -> str:
+    """bs4 の Tag.get_text(separator, strip=strip) 相当"""
+    strings = _iter_strings(root, skip_tags)
+    if not strip:
+        return separator.join(strings)
+    return separator.join(s.strip() for s in strings if s.strip())
+
+
+def _og_meta(doc: lxml_html.HtmlElement, prop: str) -> str:
+    tags = doc.xpath("//meta[@property=$p]", p=prop) or doc.xpath(
+        "//meta[@name=$p]", p=prop
+    )
+    return (tags[0].get("content") or "") if tags else ""
+
+
+def _title_text(doc: lxml_html.HtmlElement) -> str:
+    tags = doc.xpath("//title")
+    return (tags[0].text or "") if tags else ""
+
+
+def _extract_jsonld(doc: lxml_html.HtmlElement) -> dict:
+    scripts = doc.xpath('//script[@type="application/ld+json"]')
+    return _jsonld_from_strings(el.text for el in scripts)
+
+
+def _find_by_class(doc: lxml_html.HtmlElement, pattern: re.Pattern) -> Optional[lxml_html.HtmlElement]:
+    for el in doc.iter("div"):
+        classes = (el.get("class") or "").split()
+        if any(pattern.search(c) for c in classes):
+            return el
+    return None
+
+
+def _find_by_id(doc: lxml_html.HtmlElement, pattern: re.Pattern) -> Optional[lxml_html.HtmlElement]:
+    for el in doc.iter("div"):
+        el_id = el.get("id")
+        if el_id is not None and pattern.search(el_id):
+            return el
+    return None
+
+
+def _first(doc: lxml_html.HtmlElement, tag: str) -> Optional[lxml_html.HtmlElement]:
+    return next(doc.iter(tag), None)
+
+
+def _body_text(doc: lxml_html.HtmlElement) -> str:
+    # drop_tree は前後のテキストノードを連結してしまうため、本文は除外タグを飛ばして先に抽出する
+    text = " ".join(_get_text(doc, " ", strip=True, skip_tags=_BODY_SKIP_TAGS).split())
+    # bs4 版の decompose と同様に要素を木から取り除く（以降の time 探索に影響する）
+    for el in list(doc.iter(*_BOILERPLATE_TAGS)):
+        el.drop_tree()
+    return text
+
+
+# ── サイト別パーサー ──────────────────────────────────────────────
+
+def _parse_eiicon(doc: lxml_html.HtmlElement, url: str) -> ParsedPage:
+    page = ParsedPage(url=url)
+    page.title = _og_meta(doc, "og:title") or _title_text(doc)
+    page.organizer = _og_meta(doc, "og:site_name") or "eiicon"
+
+    main = _find_by_class(doc, _EIICON_MAIN)
+    page.body_text = _get_text(main, " ", strip=True) if main is not None else _body_text(doc)
+
+    time_tag = _first(doc, "time")
+    if time_tag is not None:
+        dt_attr = time_tag.get("datetime", "")
+        page.published_date = parse_japanese_date(str(dt_attr)) or parse_japanese_date(
+            _get_text(time_tag)
+        )
+
+    page.raw_deadline_text, page.deadline_date = _extract_deadline(
+        page.body_text, page.published_date
+    )
+
+    return page
+
+
+def _parse_peatix(doc: lxml_html.HtmlElement, url: str) -> ParsedPage:
+    page = ParsedPage(url=url)
+    page.title = _og_meta(doc, "og:title") or _title_text(doc)
+    page.organizer = _og_meta(doc, "og:site_name") or "Peatix"
+
+    ld = _extract_jsonld(doc)
+    if ld.get("endDate"):
+        page.deadline_date = parse_japanese_date(str(ld["endDate"]))
+        page.raw_deadline_text = str(ld["endDate"])
+    if ld.get("startDate"):
+        page.published_date = parse_japanese_date(str(ld["startDate"]))
+
+    desc = _find_by_id(doc, _PEATIX_DESC)
+    page.body_text = _get_text(desc, " ", strip=True) if desc is not None else _body_text(doc)
+
+    return page
+
+
+def _parse_creww(doc: lxml_html.HtmlElement, url: str) -> ParsedPage:
+    page = ParsedPage(url=url)
+    page.title = _og_meta(doc, "og:title") or _title_text(doc)
+    page.organizer = _og_meta(doc, "og:site_name") or "creww"
+
+    main = _find_by_class(doc, _CREWW_MAIN)
+    page.body_text = _get_text(main, " ", strip=True) if main is not None else _body_text(doc)
+
+    time_tag = _first(doc, "time")
+    if time_tag is not None:
+        page.published_date = parse_japanese_date(
+            str(time_tag.get("datetime", "")) or _get_text(time_tag)
+        )
+
+    page.raw_deadline_text, page.deadline_date = _extract_deadline(
+        page.body_text, page.published_date
+    )
+
+    return page
+
+
+def _parse_generic(doc: lxml_html.HtmlElement, url: str) -> ParsedPage:
+    page = ParsedPage(url=url)
+
+    page.title = _og_meta(doc, "og:title") or _title_text(doc).strip()
+
+    ld = _extract_jsonld(doc)
+    organizer = ld.get("organizer") or ld.get("publisher") or {}
+    if isinstance(organizer, dict):
+        page.organizer = organizer.get("name", "")
+    elif isinstance(organizer, str):
+        page.organizer = organizer
+    page.organizer = page.organizer or _og_meta(doc, "og:site_name")
+
+    page.body_text = _body_text(doc)
+
+    pub = ld.get("datePublished") or ld.get("dateCreated") or ""
+    mod = ld.get("dateModified") or ""
+    page.published_date = parse_japanese_date(str(pub))
+    page.updated_date = parse_japanese_date(str(mod))
+
+    if not page.published_date:
+        for t in doc.iter("time"):
+            d = parse_japanese_date(str(t.get("datetime", "")) or _get_text(t))
+            if d:
+                page.published_date = d
+                break
+
+    page.raw_deadline_text, page.deadline_date = _extract_deadline(
+        page.body_text, page.published_date
+    )
+
+    return page
+
+
+# ── ルーター ──────────────────────────────────────────────────────
+
+def parse_html_lxml(url: str, html: str) -> ParsedPage:
+    """
+    lxml で解析して ParsedPage を返す。
+    失敗時は例外を送出する（フォールバック判断は呼び出し側で行う）。
+    """
+    doc = _document(html)
+    host = urlparse(url).hostname or ""
+
+    if "eiicon.net" in host:
+        return _parse_eiicon(doc, url)
+    elif "peatix.com" in host:
+        return _parse_peatix(doc, url)
+    elif "creww.me" in host:
+        return _parse_creww(doc, url)
+    else:
+        return _parse_generic(doc, url)
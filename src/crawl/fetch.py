@@ -1,61 +1,199 @@
 """
 httpxによる並行HTMLフェッチ
-concurrency=3、リクエスト間1.5秒遅延
+全体concurrency=5、同一ホストは1接続・リクエスト間1.5秒遅延（HostScheduler）
 失敗した場合はNoneを返し、全体を止めない
+ETag / Last-Modified による条件付きリクエストで、未更新ページは304+キャッシュ本文で済ませる
+レスポンスはストリームで受信し、非HTML・FETCH_MAX_BYTES超過のページは本文を読み切らずにスキップする
 """
 import asyncio
-from typing import Optional
+import time
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
 
 import httpx
 
 from src.config import (
-    FETCH_CONCURRENCY,
-    FETCH_DELAY_SEC,
+    FETCH_ALLOWED_CONTENT_TYPES,
+    FETCH_MAX_BYTES,
+    FETCH_QUEUE_SIZE,
     FETCH_TIMEOUT_SEC,
+    HTTP_CACHE_ENABLED,
     USER_AGENT,
 )
+from src.crawl.http_cache import HttpCache
+from src.crawl.scheduler import HostScheduler
+from src.utils.http_replay import create_async_transport
 from src.utils.logger import get_logger
+from src.utils.metrics import get_metrics
+from src.utils.pools import pooled_async, run_async
 
 logger = get_logger()
 
 
+class FetchSkipped(Exception):
+    """取得対象外と判断したレスポンス（メッセージがスキップ理由）"""
+
+
+def _check_content_type(resp: httpx.Response) -> None:
+    # Content-Type が無い場合はHTMLとみなして読み込む
+    content_type = resp.headers.get("content-type", "")
+    mime = content_type.split(";", 1)[0].strip().lower()
+    if mime and mime not in FETCH_ALLOWED_CONTENT_TYPES:
+        raise FetchSkipped(f"非HTML: {mime}")
+
+
+async def _read_limited(resp: httpx.Response, max_bytes: int) -> str:
+    """本文を max_bytes まで読み込んでデコードする。超過した時点で読み込みを打ち切る"""
+    length = resp.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise FetchSkipped(f"サイズ上限超過: {int(length)}バイト")
+
+    chunks: list[bytes] = []
+    received = 0
+    async for chunk in resp.aiter_bytes():
+        received += len(chunk)
+        if received > max_bytes:
+            raise FetchSkipped(f"サイズ上限超過: {max_bytes}バイト超")
+        chunks.append(chunk)
+    return b"".join(chunks).decode(resp.encoding or "utf-8", errors="replace")
+
+
 async def _fetch_one(
     client: httpx.AsyncClient,
     url: str,
-    semaphore: asyncio.Semaphore,
-) -> tuple[str, Optional[str]]:
+    scheduler: HostScheduler,
+    cache: Optional[HttpCache] = None,
+    max_bytes: int = FETCH_MAX_BYTES,
+) -> tuple[str, Optional[str], str]:
     """
-    1件のURLをフェッチしてHTMLテキストを返す。
-    失敗した場合は (url, None) を返す。
+    1件のURLをフェッチして (url, HTMLテキスト, "") を返す。
+    cache がある場合は条件付きリクエストを送り、304ならキャッシュ済み本文を返す。
+    非HTML・サイズ上限超過の場合は (url, None, スキップ理由) を、
+    それ以外の失敗は (url, None, "") を返す。
     """
-    async with semaphore:
+    async with scheduler.slot(url):
+        # レイテンシはホスト間隔の待ち時間を除き、リクエスト開始から本文受信までを計測する
+        started = time.perf_counter()
+        ok = False
+        nbytes = 0
         try:
-            resp = await client.get(url, follow_redirects=True)
-            resp.raise_for_status()
+            entry = await asyncio.to_thread(cache.get, url) if cache else None
+            async with client.stream(
+                "GET",
+                url,
+                headers=HttpCache.conditional_headers(entry),
+                follow_redirects=True,
+            ) as resp:
+                try:
+                    if resp.status_code == 304 and cache and entry:
+                        cache.revalidated += 1
+                        await asyncio.to_thread(cache.touch, url)
+                        ok = True
+                        logger.debug(f"Not modified: {url} (キャッシュ使用)")
+                        return url, entry["text"], ""
+                    resp.raise_for_status()
+                    _check_content_type(resp)
+                    text = await _read_limited(resp, max_bytes)
+                finally:
+                    nbytes = resp.num_bytes_downloaded
+            ok = True
             logger.debug(f"Fetched: {url} ({resp.status_code})")
-            return url, resp.text
+            if cache:
+                await asyncio.to_thread(cache.store, url, resp.headers, text)
+            return url, text, ""
+        except FetchSkipped as skip:
+            ok = True
+            logger.info(f"Fetch skipped [{url}]: {skip}")
+            return url, None, str(skip)
         except Exception as exc:
             logger.warning(f"Fetch failed [{url}]: {exc}")
-            return url, None
+            return url, None, ""
         finally:
-            await asyncio.sleep(FETCH_DELAY_SEC)
+            get_metrics().observe(
+                "fetch",
+                time.perf_counter() - started,
+                ok=ok,
+                host=urlparse(url).hostname or "",
+                nbytes=nbytes,
+            )
+
+
+def _create_client() -> httpx.AsyncClient:
+    headers = {"User-Agent": USER_AGENT}
+    timeout = httpx.Timeout(FETCH_TIMEOUT_SEC)
+    return httpx.AsyncClient(
+        headers=headers, timeout=timeout, transport=create_async_transport()
+    )
+
+
+async def _finish_cache(cache: Optional[HttpCache]) -> None:
+    """期限切れ・容量超過のエントリを削除して集計をログに出す"""
+    if cache:
+        await asyncio.to_thread(cache.prune)
+        logger.info(
+            f"HTTPキャッシュ: 304再利用{cache.revalidated}件 / 保存{cache.stored}件"
+            f" / 削除{cache.evicted}件"
+        )
 
 
-async def fetch_all(urls: list[str]) -> dict[str, Optional[str]]:
+async def fetch_all(
+    urls: list[str],
+    use_cache: bool = HTTP_CACHE_ENABLED,
+) -> dict[str, Optional[str]]:
     """
     URLリストを並行フェッチし、{url: html | None} を返す。
     """
-    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
-    headers = {"User-Agent": USER_AGENT}
-    timeout = httpx.Timeout(FETCH_TIMEOUT_SEC)
+    scheduler = HostScheduler()
+    cache = HttpCache() if use_cache else None
 
-    async with httpx.AsyncClient(headers=headers, timeout=timeout) as client:
-        tasks = [_fetch_one(client, url, semaphore) for url in urls]
+    async with pooled_async("fetch", _create_client) as client:
+        tasks = [_fetch_one(client, url, scheduler, cache) for url in urls]
         results = await asyncio.gather(*tasks)
 
-    return dict(results)
+    await _finish_cache(cache)
+    return {url: html for url, html, _ in results}
+
+
+async def iter_fetch(
+    urls: list[str],
+    use_cache: bool = HTTP_CACHE_ENABLED,
+    queue_size: int = FETCH_QUEUE_SIZE,
+) -> AsyncIterator[tuple[int, str, Optional[str], str]]:
+    """
+    URLリストを並行フェッチし、完了した順に (入力インデックス, url, html | None, スキップ理由) を返す。
+    フェッチ中と取得済み（未消費）の合計を queue_size 件までに抑え、
+    消費側が1件受け取るごとに次のフェッチを開始する。
+    """
+    if not urls:
+        return
+
+    scheduler = HostScheduler()
+    cache = HttpCache() if use_cache else None
+    # 枠はフェッチ開始前に確保し、消費側が結果を受け取った時点で返す
+    slots = asyncio.Semaphore(max(1, queue_size))
+    queue: asyncio.Queue[tuple[int, str, Optional[str], str]] = asyncio.Queue()
+
+    async with pooled_async("fetch", _create_client) as client:
+
+        async def _produce(index: int, url: str) -> None:
+            await slots.acquire()
+            _, html, reason = await _fetch_one(client, url, scheduler, cache)
+            queue.put_nowait((index, url, html, reason))
+
+        tasks = [asyncio.create_task(_produce(i, url)) for i, url in enumerate(urls)]
+        try:
+            for _ in range(len(urls)):
+                item = await queue.get()
+                slots.release()
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    await _finish_cache(cache)
 
 
 def fetch_all_sync(urls: list[str]) -> dict[str, Optional[str]]:
     """同期版ラッパー（main.pyから呼び出しやすいよう提供）"""
-    return asyncio.run(fetch_all(urls))
+    return run_async(fetch_all(urls))
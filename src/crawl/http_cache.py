@@ -0,0 +1,123 @@
+"""
+クローラー用HTTP条件付きリクエストキャッシュ
+ETag / Last-Modified とレスポンス本文をURLごとのJSONファイルに保存し、
+次回以降は If-None-Match / If-Modified-Since を付けて再検証する。
+304 Not Modified の場合はキャッシュ済み本文を返す。
+ファイルの更新日時を最終使用日時とし、HTTP_CACHE_MAX_AGE_DAYS を過ぎたエントリと
+HTTP_CACHE_MAX_MB を超えた分（古い順）を prune() で削除する。
+ファイル操作は同期のため、非同期コードからは asyncio.to_thread 経由で呼び出す。
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_AGE_DAYS, HTTP_CACHE_MAX_MB
+from src.utils.dates import now_jst
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class HttpCache:
+    def __init__(
+        self,
+        cache_dir: Path = HTTP_CACHE_DIR,
+        max_age_days: int = HTTP_CACHE_MAX_AGE_DAYS,
+        max_mb: int = HTTP_CACHE_MAX_MB,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age_sec = max_age_days * 86400
+        self.max_bytes = max_mb * 1024 * 1024
+        self.revalidated = 0   # 304で本文を使い回した件数
+        self.stored = 0
+        self.evicted = 0
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def get(self, url: str) -> Optional[dict]:
+        """保存済みエントリ {"url", "etag", "last_modified", "text", "saved_at"} を返す"""
+        path = self._path(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_sec:
+                return None
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"HTTPキャッシュ読み込み失敗 [{url}]: {e}")
+            return None
+        return entry if entry.get("url") == url else None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[dict]) -> dict[str, str]:
+        """エントリの検証子から条件付きリクエストヘッダーを組み立てる"""
+        if not entry:
+            return {}
+        headers: dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, headers: dict, text: str) -> None:
+        """検証子（ETag / Last-Modified）を持つレスポンスのみ保存する"""
+        etag = headers.get("etag", "")
+        last_modified = headers.get("last-modified", "")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "saved_at": now_jst().isoformat(),
+            "text": text,
+        }
+        path = self._path(url)
+        try:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+            self.stored += 1
+        except Exception as e:
+            logger.warning(f"HTTPキャッシュ保存失敗 [{url}]: {e}")
+
+    def touch(self, url: str) -> None:
+        """304で本文を使い回したエントリの最終使用日時を更新する"""
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def prune(self) -> int:
+        """期限切れのエントリと、容量上限を超えた分を最終使用日時の古い順に削除し、削除件数を返す"""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort(reverse=True)
+
+        now = time.time()
+        total = 0
+        removed = 0
+        for mtime, size, path in files:
+            total += size
+            if now - mtime <= self.max_age_sec and total <= self.max_bytes:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+            total -= size
+        self.evicted += removed
+        return removed
@@ -1,19 +1,32 @@
 """
 HTMLパーサー
 eiicon / peatix / creww 専用パーサー + 汎用パーサー（OGP/JSON-LD/正規表現）
+PARSE_BACKEND="lxml" の場合は fast_parse.py の高速版を先に試し、失敗時に本モジュールの bs4 版を使う
+bs4 は解析時に import する（ParsedPage だけを使うフィルタ・CLIの起動を軽くするため）
 """
+from __future__ import annotations
+
 import json
 import re
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
-
-from src.utils.dates import parse_japanese_date, today_jst
+from src.config import PARSE_BACKEND
+from src.utils.dates import (
+    LABEL_DEADLINE,
+    LABEL_PERIOD,
+    DateMention,
+    iter_label_dates,
+    parse_japanese_date,
+    today_jst,
+)
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
 logger = get_logger()
 
 
@@ -32,6 +45,8 @@ class ParsedPage:
 # ── ヘルパー ──────────────────────────────────────────────────────
 
 def _soup(html: str) -> BeautifulSoup:
+    from bs4 import BeautifulSoup
+
     return BeautifulSoup(html, "lxml")
 
 
@@ -42,10 +57,16 @@ def _og_meta(soup: BeautifulSoup, prop: str) -> str:
     return (tag.get("content") or "") if tag else ""  # type: ignore[union-attr]
 
 
-def _extract_jsonld(soup: BeautifulSoup) -> dict:
-    for tag in soup.find_all("script", type="application/ld+json"):
+def _title_text(soup: BeautifulSoup) -> str:
+    # NavigableString のままだと木全体への参照を保持し、プロセス間で受け渡す際に肥大化する
+    return str(soup.title.string) if soup.title and soup.title.string else ""
+
+
+def _jsonld_from_strings(strings: Iterable[Optional[str]]) -> dict:
+    """JSON-LDスクリプトの中身を順に試し、最初に解析できたものを返す"""
+    for raw in strings:
         try:
-            data = json.loads(tag.string or "")
+            data = json.loads(raw or "")
             if isinstance(data, list):
                 data = data[0]
             return data
@@ -54,43 +75,47 @@ def _extract_jsonld(soup: BeautifulSoup) -> dict:
     return {}
 
 
+def _extract_jsonld(soup: BeautifulSoup) -> dict:
+    return _jsonld_from_strings(
+        tag.string for tag in soup.find_all("script", type="application/ld+json")
+    )
+
+
 def _body_text(soup: BeautifulSoup) -> str:
     for tag in soup(["script", "style", "nav", "footer", "header"]):
         tag.decompose()
     return " ".join(soup.get_text(" ", strip=True).split())
 
 
-def _find_deadline_text(text: str) -> str:
-    """本文から応募締め切りっぽいテキストを抽出"""
-    patterns = [
-        r"応募.*?締[め切り]+[：:\s]*(.{5,30})",
-        r"締[め切り]+[：:\s]*(.{5,30})",
-        r"募集期間[：:\s]*(.{5,50})",
-        r"期限[：:\s]*(.{5,30})",
-        r"deadline[：:\s]*(.{5,30})",
-    ]
-    for p in patterns:
-        m = re.search(p, text, re.IGNORECASE)
-        if m:
-            return m.group(1).strip()
-    return ""
-
-
-def _parse_deadline(dl_text: str, reference_date: Optional[date]) -> Optional[date]:
+def _extract_deadline(text: str, reference_date: Optional[date]) -> tuple[str, Optional[date]]:
     """
-    締め切りテキストを日付に変換する。
-    年省略の場合は reference_date の年を基準にする。
-    reference_date が過去年なら、過去年で解釈することで期限切れとして検出できる。
+    本文から (締め切りテキスト, 締め切り日) を求める。
+    「締切」ラベル直後の日付、なければ「募集期間」直後の日付（範囲なら終了日）を採用する。
+    どちらもラベル範囲内に無い場合は、少し離れた位置（HINT_WINDOW 文字以内）の日付で推定する。
+    年省略の日付は reference_date（掲載日）の年で解釈するため、過去年の掲載なら期限切れとして検出できる。
+    締切ラベル直後の日付が見つかった時点で走査を打ち切る。
     """
     ref_year = reference_date.year if reference_date else None
-    return parse_japanese_date(dl_text, reference_year=ref_year)
+    period: Optional[DateMention] = None
+    fallback: Optional[DateMention] = None
+    for mention, in_window in iter_label_dates(
+        text, reference_year=ref_year, labels=(LABEL_DEADLINE, LABEL_PERIOD)
+    ):
+        if not in_window:
+            fallback = fallback or mention
+        elif mention.label == LABEL_DEADLINE:
+            return mention.text, mention.last
+        else:
+            period = period or mention
+    chosen = period or fallback
+    return (chosen.text, chosen.last) if chosen else ("", None)
 
 
 # ── eiicon 専用 ───────────────────────────────────────────────────
 
 def _parse_eiicon(soup: BeautifulSoup, url: str) -> ParsedPage:
     page = ParsedPage(url=url)
-    page.title = _og_meta(soup, "og:title") or (soup.title.string if soup.title else "")
+    page.title = _og_meta(soup, "og:title") or _title_text(soup)
     page.organizer = _og_meta(soup, "og:site_name") or "eiicon"
 
     # 本文
@@ -106,9 +131,9 @@ def _parse_eiicon(soup: BeautifulSoup, url: str) -> ParsedPage:
         )
 
     # 締め切り（掲載日の年を参照年として渡す）
-    dl_text = _find_deadline_text(page.body_text)
-    page.raw_deadline_text = dl_text
-    page.deadline_date = _parse_deadline(dl_text, page.published_date)
+    page.raw_deadline_text, page.deadline_date = _extract_deadline(
+        page.body_text, page.published_date
+    )
 
     return page
 
@@ -117,7 +142,7 @@ def _parse_eiicon(soup: BeautifulSoup, url: str) -> ParsedPage:
 
 def _parse_peatix(soup: BeautifulSoup, url: str) -> ParsedPage:
     page = ParsedPage(url=url)
-    page.title = _og_meta(soup, "og:title") or (soup.title.string if soup.title else "")
+    page.title = _og_meta(soup, "og:title") or _title_text(soup)
     page.organizer = _og_meta(soup, "og:site_name") or "Peatix"
 
     # JSON-LDからイベント日時を取得（年込みなので参照年不要）
@@ -139,7 +164,7 @@ def _parse_peatix(soup: BeautifulSoup, url: str) -> ParsedPage:
 
 def _parse_creww(soup: BeautifulSoup, url: str) -> ParsedPage:
     page = ParsedPage(url=url)
-    page.title = _og_meta(soup, "og:title") or (soup.title.string if soup.title else "")
+    page.title = _og_meta(soup, "og:title") or _title_text(soup)
     page.organizer = _og_meta(soup, "og:site_name") or "creww"
 
     # 本文
@@ -154,9 +179,9 @@ def _parse_creww(soup: BeautifulSoup, url: str) -> ParsedPage:
         )
 
     # 締め切り（掲載日の年を参照年として渡す）
-    dl_text = _find_deadline_text(page.body_text)
-    page.raw_deadline_text = dl_text
-    page.deadline_date = _parse_deadline(dl_text, page.published_date)
+    page.raw_deadline_text, page.deadline_date = _extract_deadline(
+        page.body_text, page.published_date
+    )
 
     return page
 
@@ -199,9 +224,9 @@ def _parse_generic(soup: BeautifulSoup, url: str) -> ParsedPage:
                 break
 
     # 締め切り（掲載日の年を参照年として渡す）
-    dl_text = _find_deadline_text(page.body_text)
-    page.raw_deadline_text = dl_text
-    page.deadline_date = _parse_deadline(dl_text, page.published_date)
+    page.raw_deadline_text, page.deadline_date = _extract_deadline(
+        page.body_text, page.published_date
+    )
 
     return page
 
@@ -213,6 +238,20 @@ def parse_html(url: str, html: str) -> Optional[ParsedPage]:
     URLとHTMLを受け取り、サイトに応じたパーサーで ParsedPage を返す。
     解析失敗時はNoneを返す。
     """
+    if PARSE_BACKEND == "lxml":
+        # fast_parse は本モジュールのヘルパーを参照するため遅延import
+        from src.crawl.fast_parse import parse_html_lxml
+
+        try:
+            return parse_html_lxml(url, html)
+        except Exception as exc:
+            logger.debug(f"lxml高速解析失敗、bs4で再解析 [{url}]: {exc}")
+
+    return parse_html_bs4(url, html)
+
+
+def parse_html_bs4(url: str, html: str) -> Optional[ParsedPage]:
+    """BeautifulSoup版パーサー。解析失敗時はNoneを返す。"""
     try:
         soup = _soup(html)
         host = urlparse(url).hostname or ""
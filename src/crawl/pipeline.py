@@ -0,0 +1,101 @@
+"""
+フェッチ→解析のストリーミングパイプライン
+フェッチが完了したページから順に解析し、生HTMLは解析直後に破棄する。
+解析は PARSE_WORKERS 個のプロセスで並列実行し（1なら別スレッドで順次実行）、
+解析中もイベントループ上のフェッチは進行する。
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+
+from src.config import PARSE_WORKERS
+from src.crawl.fetch import iter_fetch
+from src.crawl.parse import ParsedPage, parse_html
+from src.utils.logger import get_logger
+from src.utils.pools import pooled, run_async
+
+logger = get_logger()
+
+
+def _create_executor(workers: int) -> Executor:
+    if workers <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+async def iter_parsed_pages(
+    urls: list[str],
+    workers: int = PARSE_WORKERS,
+) -> AsyncIterator[tuple[int, Optional[ParsedPage], str]]:
+    """
+    URLリストをフェッチ・解析し、完了順に (入力インデックス, ParsedPage | None, エラー文) を返す。
+    成功時のエラー文は空文字列。
+    同時に解析へ回すHTMLは workers の2倍までに制限する。
+    """
+    loop = asyncio.get_running_loop()
+    max_in_flight = max(1, workers) * 2
+
+    with pooled(f"parse-{workers}", lambda: _create_executor(workers)) as executor:
+
+        async def _parse(index: int, url: str, html: str) -> tuple[int, Optional[ParsedPage], str]:
+            page = await loop.run_in_executor(executor, parse_html, url, html)
+            if page:
+                return index, page, ""
+            return index, None, f"解析失敗: {url}"
+
+        pending: set[asyncio.Task] = set()
+        async for index, url, html, reason in iter_fetch(urls):
+            if html is None:
+                if reason:
+                    yield index, None, f"取得スキップ（{reason}）: {url}"
+                else:
+                    yield index, None, f"取得失敗: {url}"
+                continue
+            pending.add(asyncio.create_task(_parse(index, url, html)))
+            del html
+            if len(pending) >= max_in_flight:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+
+
+async def fetch_and_parse(
+    urls: list[str],
+    workers: int = PARSE_WORKERS,
+) -> tuple[list[ParsedPage], list[str]]:
+    """
+    iter_parsed_pages の結果を集約し、入力順に並べ直して返す。
+
+    Returns:
+        (解析成功ページリスト, エラーメッセージリスト)
+    """
+    results: dict[int, tuple[Optional[ParsedPage], str]] = {}
+    async for index, page, error in iter_parsed_pages(urls, workers):
+        results[index] = (page, error)
+
+    pages: list[ParsedPage] = []
+    errors: list[str] = []
+    for index in sorted(results):
+        page, error = results[index]
+        if page:
+            pages.append(page)
+        else:
+            errors.append(error)
+    return pages, errors
+
+
+def fetch_and_parse_sync(
+    urls: list[str],
+    workers: int = PARSE_WORKERS,
+) -> tuple[list[ParsedPage], list[str]]:
+    """同期版ラッパー（main.pyから呼び出しやすいよう提供）"""
+    return run_async(fetch_and_parse(urls, workers))
@@ -0,0 +1,58 @@
+"""
+ホスト単位のpoliteness制御
+- 全体の同時接続数: FETCH_CONCURRENCY
+- ホストごとの同時接続数: FETCH_PER_HOST_CONCURRENCY
+- 同一ホストへのリクエスト開始間隔: FETCH_DELAY_SEC
+遅延待ちの間は全体スロットを保持しないため、別ホストへのリクエストは並行して進む
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+from urllib.parse import urlparse
+
+from src.config import FETCH_CONCURRENCY, FETCH_DELAY_SEC, FETCH_PER_HOST_CONCURRENCY
+
+
+@dataclass
+class _HostState:
+    semaphore: asyncio.Semaphore
+    next_start: float = 0.0  # 次のリクエストを開始してよい時刻（loop.time()基準）
+
+
+class HostScheduler:
+    def __init__(
+        self,
+        global_limit: int = FETCH_CONCURRENCY,
+        per_host_limit: int = FETCH_PER_HOST_CONCURRENCY,
+        delay_sec: float = FETCH_DELAY_SEC,
+    ) -> None:
+        self._global = asyncio.Semaphore(max(1, global_limit))
+        self._per_host_limit = max(1, per_host_limit)
+        self._delay = delay_sec
+        self._hosts: dict[str, _HostState] = {}
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(asyncio.Semaphore(self._per_host_limit))
+            self._hosts[host] = state
+        return state
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        url のホストに対してリクエストしてよくなるまで待ち、スロットを確保する。
+        ホストの遅延待ちを先に済ませてから全体スロットを取得する。
+        """
+        state = self._state(urlparse(url).hostname or "")
+        async with state.semaphore:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = state.next_start - now
+            # 待ち時間を含めた開始予定時刻から次の開始可能時刻を予約する
+            state.next_start = max(now, state.next_start) + self._delay
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._global:
+                yield
@@ -0,0 +1,231 @@
+"""
+常駐（デーモン）モード
+1プロセスに常駐し、DAEMON_SCHEDULE（cron形式・JST）の時刻に main() を実行する。
+  - import 済みのモジュール・httpx の接続プール・解析プロセス・LLMキャッシュを実行をまたいで使い回す（src/utils/pools.py）
+  - 停止中・スリープ中に逃した実行予定は、DAEMON_CATCHUP_HOURS 以内なら起動・復帰時に1回だけ実行する
+    （cron 等で同じ予定時刻以降に実行済みなら、チェックポイントの通知完了時刻を見て重複実行しない）
+  - 手動実行: UNIXソケット DAEMON_SOCKET に "run" / "resume" を1行で送る（python -m src.cli trigger）か、SIGUSR1 を送る
+    "status" を送ると次回予定・直近の実行結果をJSONで返す
+  - SIGTERM / SIGINT で実行中の処理が終わるのを待って終了する
+
+実行: python -m src.cli daemon
+"""
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from src.config import (
+    DAEMON_CATCHUP_HOURS,
+    DAEMON_POLL_SEC,
+    DAEMON_SCHEDULE,
+    DAEMON_SOCKET,
+    DAEMON_STATE_FILE,
+    ensure_dirs,
+)
+from src.main import main
+from src.utils.checkpoint import completed_at
+from src.utils.cron import CronSchedule
+from src.utils.dates import now_jst
+from src.utils.logger import get_logger
+from src.utils.pools import close_all, keep_warm
+
+logger = get_logger()
+
+_COMMANDS = ("run", "resume", "status")
+_STOP = "stop"
+
+
+class _TriggerHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        command = self.rfile.readline().decode("utf-8").strip()
+        daemon: "Daemon" = self.server.daemon  # type: ignore[attr-defined]
+        if command not in _COMMANDS:
+            reply = {"ok": False, "error": f"不明なコマンド: {command!r}（{' / '.join(_COMMANDS)}）"}
+        elif command == "status":
+            reply = {"ok": True, **daemon.status()}
+        else:
+            daemon.trigger(command)
+            reply = {"ok": True, "queued": command}
+        self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class _TriggerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Daemon:
+    def __init__(
+        self,
+        schedule: str = DAEMON_SCHEDULE,
+        catchup_hours: int = DAEMON_CATCHUP_HOURS,
+        poll_sec: int = DAEMON_POLL_SEC,
+        socket_path: Path = DAEMON_SOCKET,
+        state_file: Path = DAEMON_STATE_FILE,
+    ) -> None:
+        self.schedule = CronSchedule(schedule)
+        self.catchup = timedelta(hours=catchup_hours)
+        self.poll_sec = poll_sec
+        self.socket_path = socket_path
+        self.state_file = state_file
+        self._triggers: "queue.Queue[str]" = queue.Queue()
+        self._stopping = threading.Event()
+        self._server: Optional[_TriggerServer] = None
+        self._running: Optional[str] = None
+        self._state = self._load_state()
+
+    # ── 状態ファイル ──────────────────────────────────────────────
+
+    def _load_state(self) -> dict:
+        if not self.state_file.exists():
+            return {}
+        try:
+            return json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"デーモン状態の読み込み失敗: {e}")
+            return {}
+
+    def _save_state(self) -> None:
+        tmp = self.state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._state, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.state_file)
+
+    def status(self) -> dict:
+        next_fire = self.schedule.next_after(now_jst())
+        return {
+            "schedule": self.schedule.expr,
+            "running": self._running,
+            "next_run": next_fire.isoformat() if next_fire else None,
+            "queued": self._triggers.qsize(),
+            **self._state,
+        }
+
+    # ── トリガー ─────────────────────────────────────────────────
+
+    def trigger(self, command: str) -> None:
+        """手動実行を予約する（ソケット・シグナルのスレッドから呼ばれる）"""
+        logger.info(f"手動実行を受け付け: {command}")
+        self._triggers.put(command)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._triggers.put(_STOP)
+
+    def _install_signals(self) -> None:
+        # ハンドラはメインスレッドの任意の位置で割り込むため、ロックを取る処理は別スレッドに任せる
+        def _later(func, *args) -> None:
+            threading.Thread(target=func, args=args, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, lambda *_: _later(self.stop))
+        signal.signal(signal.SIGINT, lambda *_: _later(self.stop))
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *_: _later(self.trigger, "run"))
+
+    def _start_server(self) -> None:
+        if self.socket_path.exists():
+            # 前回の異常終了で残ったソケットなら消す（稼働中の別デーモンがいれば起動しない）
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()
+            else:
+                raise RuntimeError(f"デーモンは既に起動しています: {self.socket_path}")
+        self._server = _TriggerServer(str(self.socket_path), _TriggerHandler)
+        self._server.daemon = self  # type: ignore[attr-defined]
+        os.chmod(self.socket_path, 0o600)
+        threading.Thread(target=self._server.serve_forever, name="trigger", daemon=True).start()
+
+    def _stop_server(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    # ── 実行 ────────────────────────────────────────────────────
+
+    def _run(self, reason: str, resume: bool = False) -> None:
+        self._running = reason
+        started = now_jst()
+        ok = True
+        try:
+            main(resume=resume)
+        except Exception:
+            # main() の内側で通知まで済ませるため、ここに来るのは起動前の設定エラーなど
+            ok = False
+            logger.exception(f"実行に失敗しました（{reason}）")
+        finally:
+            self._running = None
+            self._state["last_run"] = {
+                "reason": reason,
+                "started_at": started.isoformat(timespec="seconds"),
+                "finished_at": now_jst().isoformat(timespec="seconds"),
+                "ok": ok,
+            }
+            self._save_state()
+
+    def _already_ran(self, due: datetime) -> bool:
+        last_fire = self._state.get("last_fire")
+        if last_fire and datetime.fromisoformat(last_fire) >= due:
+            return True
+        # cron・手動実行など、デーモン外で予定時刻以降に通知まで済んでいれば実行済みとみなす
+        notified = completed_at("notify", due.date())
+        return notified is not None and notified >= due
+
+    def _run_due(self) -> None:
+        """直近の実行予定が未処理なら実行する（通常の定時実行・起動時と復帰時の取りこぼし実行を兼ねる）"""
+        now = now_jst()
+        due = self.schedule.last_at_or_before(now, self.catchup)
+        if due is None or self._already_ran(due):
+            return
+        late = now - due
+        if late > timedelta(seconds=self.poll_sec * 2):
+            logger.info(f"実行予定 {due:%Y-%m-%d %H:%M} を取りこぼしていたため実行します（{late}遅れ）")
+        self._state["last_fire"] = due.isoformat()
+        self._save_state()
+        self._run(f"schedule {due:%Y-%m-%d %H:%M}")
+
+    def _drain_triggers(self, first: str) -> Optional[str]:
+        """溜まった手動トリガーを1回の実行にまとめる（resume を含めば resume）。停止要求なら None"""
+        commands = {first}
+        while True:
+            try:
+                commands.add(self._triggers.get_nowait())
+            except queue.Empty:
+                break
+        if _STOP in commands:
+            return None
+        return "resume" if "resume" in commands else "run"
+
+    def serve_forever(self) -> None:
+        ensure_dirs()
+        keep_warm()
+        self._install_signals()
+        self._start_server()
+        next_fire = self.schedule.next_after(now_jst())
+        logger.info(
+            f"デーモン起動: 予定 '{self.schedule.expr}'"
+            f"（次回 {f'{next_fire:%Y-%m-%d %H:%M}' if next_fire else 'なし'}）"
+            f" / トリガー {self.socket_path}（pid {os.getpid()}）"
+        )
+        try:
+            while not self._stopping.is_set():
+                self._run_due()
+                try:
+                    command = self._triggers.get(timeout=self.poll_sec)
+                except queue.Empty:
+                    continue
+                command = self._drain_triggers(command)
+                if command is None:
+                    break
+                self._run(f"manual {command}", resume=command == "resume")
+        finally:
+            self._stop_server()
+            close_all()
+            logger.info("デーモン終了")
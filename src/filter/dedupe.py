@@ -1,39 +1,63 @@
 """
 重複排除
-第一キー: URL完全一致（ローカルJSONファイルで管理）
+第一キー: 正規化URL一致（送信済みURLは seen_store.SeenUrlStore で管理）
 第二キー: タイトル + 期限日（同一セッション内）
+URLによる判定はフェッチ前（dedupe_urls）にも行い、送信済みページの再取得を避ける
 """
 import json
+from pathlib import Path
 
 from src.config import SEEN_URLS_FILE
 from src.crawl.parse import ParsedPage
 from src.utils.dates import format_date_iso
+from src.utils.urls import canonicalize_url
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
 
-def load_seen_urls() -> set[str]:
-    """送信済みURLをローカルファイルから読み込む"""
-    if not SEEN_URLS_FILE.exists():
+def load_seen_urls(path: Path = SEEN_URLS_FILE) -> set[str]:
+    """旧形式の送信済みURLファイル（JSON配列）を読み込む。SeenUrlStore の初回取り込みで使用"""
+    if not path.exists():
         return set()
     try:
-        data = json.loads(SEEN_URLS_FILE.read_text(encoding="utf-8"))
+        data = json.loads(path.read_text(encoding="utf-8"))
         return set(data) if isinstance(data, list) else set()
     except Exception as e:
         logger.warning(f"seen_urls読み込み失敗: {e}")
         return set()
 
 
-def save_seen_urls(urls: set[str]) -> None:
-    """送信済みURLをローカルファイルに保存する"""
-    try:
-        SEEN_URLS_FILE.write_text(
-            json.dumps(sorted(urls), ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
-    except Exception as e:
-        logger.warning(f"seen_urls保存失敗: {e}")
+def dedupe_urls(
+    urls: list[str],
+    existing_urls: set[str],
+) -> tuple[list[str], list[str]]:
+    """
+    フェッチ前の候補URLを、正規化したURLをキーとして送信済みURL・候補内の重複を除外する。
+    正規化はキーにだけ使い、通過したURLは各キーで最初に現れた元のURLのまま返す。
+    プロファイルごとの集計にも使うため、件数のログは呼び出し側で出す。
+
+    Args:
+        urls: 検索で得た候補URLリスト
+        existing_urls: 送信済みの正規化URLセット（SeenUrlStore.lookup で候補分のみ照会済み）
+
+    Returns:
+        (通過URLリスト（元のURL・入力順）, 除外されたURLリスト)
+    """
+    seen: set[str] = set(existing_urls)
+    passed: list[str] = []
+    duplicates: list[str] = []
+
+    for url in urls:
+        canonical = canonicalize_url(url)
+        if canonical in seen:
+            logger.debug(f"重複スキップ（URL・フェッチ前）: {url}")
+            duplicates.append(url)
+            continue
+        seen.add(canonical)
+        passed.append(url)
+
+    return passed, duplicates
 
 
 def dedupe_pages(
@@ -43,7 +67,7 @@ def dedupe_pages(
     """
     Args:
         pages: フィルタ後のページリスト
-        existing_urls: 送信済みURLセット（ローカルファイルから読み込み済み）
+        existing_urls: 送信済みの正規化URLセット（SeenUrlStore.lookup で候補分のみ照会済み）
 
     Returns:
         (重複除外後のページリスト, 除外されたURLリスト)
@@ -54,8 +78,9 @@ def dedupe_pages(
     duplicates: list[str] = []
 
     for page in pages:
-        # 第一キー: URL
-        if page.url in seen_urls:
+        # 第一キー: 正規化URL
+        canonical = canonicalize_url(page.url)
+        if canonical in seen_urls:
             logger.debug(f"重複スキップ（URL）: {page.url}")
             duplicates.append(page.url)
             continue
@@ -67,7 +92,7 @@ def dedupe_pages(
             duplicates.append(page.url)
             continue
 
-        seen_urls.add(page.url)
+        seen_urls.add(canonical)
         if page.title:
             seen_keys.add(key)
         passed.append(page)
@@ -0,0 +1,286 @@
+"""
+近似重複排除（SimHash + バンド分割LSH）
+同一プログラムが PR TIMES・eiicon・企業サイトなど別URLで掲載されているケースを、本文の類似度で検出する。
+
+- 指紋: 本文（空白除去）の文字3-gramから64bit SimHashを計算
+- 類似判定: ハミング距離が NEAR_DUP_MAX_HAMMING 以下なら重複
+- 索引: 64bitを NEAR_DUP_BANDS 個のバンドに分割し、各バンドで r = k // バンド数 ビット以内の近傍値を引いて候補だけを照合する
+  （鳩の巣原理により、距離k以下ならどれかのバンドの差は r ビット以内に収まる）
+- 永続化: 送信済みページの指紋をSQLiteに保存し、実行をまたいで検出する（NEAR_DUP_MAX_AGE_DAYS を過ぎた指紋は削除）
+"""
+import hashlib
+import sqlite3
+from datetime import timedelta
+from itertools import combinations
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.config import (
+    NEAR_DUP_BANDS,
+    NEAR_DUP_DB,
+    NEAR_DUP_MAX_AGE_DAYS,
+    NEAR_DUP_MAX_HAMMING,
+    NEAR_DUP_MIN_CHARS,
+    NEAR_DUP_SHINGLE,
+)
+from src.crawl.parse import ParsedPage
+from src.utils.dates import now_jst
+from src.utils.logger import get_logger
+from src.utils.urls import canonicalize_url
+
+logger = get_logger()
+
+_BITS = 64
+_MASK = (1 << _BITS) - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url      TEXT PRIMARY KEY,
+    simhash  INTEGER NOT NULL,
+    added_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bands (
+    band  INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    url   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bands ON bands (band, value);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# バイト値 → 各ビットを32bit幅のレーンに展開した整数。
+# 64bitハッシュを1ビットずつ数える代わりに、バイトごとにレーン加算で全ビットの出現数を一度に集計する
+_LANE = 32
+_SPREAD = [
+    sum(1 << (bit * _LANE) for bit in range(8) if value >> bit & 1)
+    for value in range(256)
+]
+
+
+def simhash(text: str, shingle: int = NEAR_DUP_SHINGLE) -> int:
+    """本文の64bit SimHashを返す（空白は無視、重複する n-gram は1回だけ数える）"""
+    chars = "".join(text.split())
+    grams = {chars[i:i + shingle] for i in range(max(1, len(chars) - shingle + 1))}
+
+    # totals[k]: ハッシュの第kバイト（リトルエンディアン）の各ビットが立っている件数
+    totals = [0] * 8
+    for gram in grams:
+        digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+        for k, byte in enumerate(digest):
+            totals[k] += _SPREAD[byte]
+
+    lane_mask = (1 << _LANE) - 1
+    half = len(grams) / 2
+    fp = 0
+    for k, total in enumerate(totals):
+        for bit in range(8):
+            if (total >> (bit * _LANE) & lane_mask) > half:
+                fp |= 1 << (k * 8 + bit)
+    return fp
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK).count("1")
+
+
+def _band_ranges(bands: int) -> list[tuple[int, int]]:
+    """64bitを bands 個に分割した (シフト量, ビット幅) のリスト"""
+    base, extra = divmod(_BITS, bands)
+    ranges = []
+    shift = 0
+    for i in range(bands):
+        width = base + (1 if i < extra else 0)
+        ranges.append((shift, width))
+        shift += width
+    return ranges
+
+
+def _flip_masks(width: int, flips: int) -> list[int]:
+    """width ビット中 flips ビット以内を反転させるマスク（0 = 完全一致を先頭に含む）"""
+    return [
+        sum(1 << bit for bit in bits)
+        for n in range(flips + 1)
+        for bits in combinations(range(width), n)
+    ]
+
+
+def _to_signed(value: int) -> int:
+    # SQLite の INTEGER は符号付き64bitのため変換して保存する
+    return value - (1 << _BITS) if value >= 1 << (_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & _MASK
+
+
+class NearDupIndex:
+    def __init__(
+        self,
+        db_path: Path = NEAR_DUP_DB,
+        max_hamming: int = NEAR_DUP_MAX_HAMMING,
+        bands: int = NEAR_DUP_BANDS,
+        max_age_days: int = NEAR_DUP_MAX_AGE_DAYS,
+    ) -> None:
+        self.max_hamming = max_hamming
+        self._ranges = _band_ranges(bands)
+        flips = max_hamming // bands
+        self._masks = [_flip_masks(width, flips) for _, width in self._ranges]
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._ensure_bands()
+        if max_age_days > 0:
+            self._prune(max_age_days)
+        # 同一実行内で追加した指紋（まだ送信していないページ同士の比較用）
+        self._session: dict[tuple[int, int], list[tuple[str, int]]] = {}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "NearDupIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _band_values(self, fp: int) -> list[tuple[int, int]]:
+        return [
+            (i, fp >> shift & ((1 << width) - 1))
+            for i, (shift, width) in enumerate(self._ranges)
+        ]
+
+    def _ensure_bands(self) -> None:
+        """閾値（=バンド数）が前回と異なる場合はバンド索引を作り直す"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'bands'").fetchone()
+        if row and int(row[0]) == len(self._ranges):
+            return
+        with self._conn:
+            self._conn.execute("DELETE FROM bands")
+            rows = self._conn.execute("SELECT url, simhash FROM fingerprints").fetchall()
+            self._conn.executemany(
+                "INSERT INTO bands (band, value, url) VALUES (?, ?, ?)",
+                (
+                    (band, value, url)
+                    for url, fp in rows
+                    for band, value in self._band_values(_to_unsigned(fp))
+                ),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('bands', ?)",
+                (str(len(self._ranges)),),
+            )
+        if rows:
+            logger.info(f"近似重複索引を再構築: {len(rows)}件（{len(self._ranges)}バンド）")
+
+    def _prune(self, max_age_days: int) -> None:
+        """max_age_days より前に保存した指紋を削除する"""
+        cutoff = (now_jst() - timedelta(days=max_age_days)).isoformat()
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM bands WHERE url IN (SELECT url FROM fingerprints WHERE added_at < ?)",
+                (cutoff,),
+            )
+            removed = self._conn.execute(
+                "DELETE FROM fingerprints WHERE added_at < ?", (cutoff,)
+            ).rowcount
+        if removed:
+            logger.info(f"近似重複索引: {max_age_days}日より古い指紋を{removed}件削除")
+
+    def find(self, fp: int, exclude_url: str = "") -> Optional[str]:
+        """fp と近似する指紋を持つURL（送信済み・同一実行内）を返す。exclude_url 自身は除く"""
+        for (band, value), masks in zip(self._band_values(fp), self._masks):
+            probes = [value ^ mask for mask in masks]
+            for probe in probes:
+                for url, other in self._session.get((band, probe), []):
+                    if url != exclude_url and hamming(fp, other) <= self.max_hamming:
+                        return url
+            rows = self._conn.execute(
+                "SELECT f.url, f.simhash FROM bands b JOIN fingerprints f ON f.url = b.url"
+                f" WHERE b.band = ? AND b.value IN ({','.join('?' * len(probes))})",
+                (band, *probes),
+            )
+            for url, other in rows:
+                if url != exclude_url and hamming(fp, _to_unsigned(other)) <= self.max_hamming:
+                    return url
+        return None
+
+    def add_session(self, url: str, fp: int) -> None:
+        for key in self._band_values(fp):
+            self._session.setdefault(key, []).append((url, fp))
+
+    def persist(self, items: Iterable[tuple[str, int]]) -> int:
+        """送信したページの指紋を保存し、新規保存件数を返す"""
+        now = now_jst().isoformat()
+        added = 0
+        with self._conn:
+            for url, fp in items:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO fingerprints (url, simhash, added_at) VALUES (?, ?, ?)",
+                    (url, _to_signed(fp), now),
+                )
+                if cur.rowcount:
+                    added += 1
+                    self._conn.executemany(
+                        "INSERT INTO bands (band, value, url) VALUES (?, ?, ?)",
+                        ((band, value, url) for band, value in self._band_values(fp)),
+                    )
+        return added
+
+
+def page_fingerprint(page: ParsedPage) -> Optional[int]:
+    """本文が NEAR_DUP_MIN_CHARS 未満のページは指紋を作らない（誤検出防止）"""
+    if len(page.body_text) < NEAR_DUP_MIN_CHARS:
+        return None
+    return simhash(page.body_text)
+
+
+def filter_near_duplicates(
+    pages: list[ParsedPage],
+    index: NearDupIndex,
+) -> tuple[list[ParsedPage], list[str]]:
+    """
+    送信済みページ・先行するページと本文が近似するページを除外する。
+    先頭ほど優先して残すため、鮮度ソート後・件数カット前に呼び出す。
+
+    Returns:
+        (通過ページリスト, 除外されたURLリスト)
+    """
+    passed: list[ParsedPage] = []
+    removed: list[str] = []
+
+    for page in pages:
+        fp = page_fingerprint(page)
+        if fp is None:
+            passed.append(page)
+            continue
+        url = canonicalize_url(page.url)
+        match = index.find(fp, exclude_url=url)
+        if match:
+            logger.debug(f"近似重複スキップ: {page.url} ≈ {match}")
+            removed.append(page.url)
+            continue
+        index.add_session(url, fp)
+        passed.append(page)
+
+    logger.info(
+        f"近似重複排除: {len(pages)}件 → {len(passed)}件残存 / {len(removed)}件除外"
+    )
+    return passed, removed
+
+
+def remember_sent_pages(pages: list[ParsedPage], sent_urls: set[str], index: NearDupIndex) -> int:
+    """送信したページの指紋を索引に保存し、次回以降の実行で重複検出できるようにする"""
+    sent = {canonicalize_url(u) for u in sent_urls}
+    items = []
+    for page in pages:
+        url = canonicalize_url(page.url)
+        if url not in sent:
+            continue
+        fp = page_fingerprint(page)
+        if fp is not None:
+            items.append((url, fp))
+    return index.persist(items)
@@ -0,0 +1,155 @@
+"""
+送信済みURLストア（SQLite / WALモード）
+正規化URLを主キーに first_seen（初回登録日時）と last_sent（最終送信日時）を保持する。
+照会は候補URLのみ、書き込みは新規送信URLのみのため、1回の実行コストは履歴件数に依存しない。
+API予算上限で評価を保留したURLは送信済みにせず deferred テーブルに残し、次回の候補に加える。
+旧形式の seen_urls.json は初回オープン時に一度だけ取り込む。
+"""
+import sqlite3
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.config import SEEN_URLS_DB, SEEN_URLS_FILE
+from src.filter.dedupe import load_seen_urls
+from src.utils.dates import now_jst
+from src.utils.logger import get_logger
+from src.utils.urls import canonicalize_url
+
+logger = get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_urls (
+    url        TEXT PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_sent  TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS deferred (
+    url         TEXT PRIMARY KEY,
+    deferred_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# IN句に渡すプレースホルダ数の上限（SQLiteの変数上限より十分小さく）
+_LOOKUP_CHUNK = 500
+
+
+class SeenUrlStore:
+    def __init__(
+        self,
+        db_path: Path = SEEN_URLS_DB,
+        legacy_json: Optional[Path] = SEEN_URLS_FILE,
+    ) -> None:
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if legacy_json is not None:
+            self._import_legacy_json(legacy_json)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SeenUrlStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _import_legacy_json(self, path: Path) -> None:
+        """seen_urls.json の内容を一度だけ取り込む（取り込み済みかは meta テーブルで管理）"""
+        done = self._conn.execute(
+            "SELECT 1 FROM meta WHERE key = 'legacy_json_imported'"
+        ).fetchone()
+        if done or not path.exists():
+            return
+
+        urls = load_seen_urls(path)
+        now = now_jst().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_urls (url, first_seen, last_sent) VALUES (?, ?, ?)",
+                ((canonicalize_url(u), now, now) for u in urls),
+            )
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_json_imported', ?)",
+                (now,),
+            )
+        logger.info(f"seen_urls.json を取り込み: {len(urls)}件")
+
+    def lookup(self, urls: Iterable[str]) -> set[str]:
+        """urls のうち送信済みのものを正規化URLの集合で返す"""
+        canonical = sorted({canonicalize_url(u) for u in urls})
+        found: set[str] = set()
+        for i in range(0, len(canonical), _LOOKUP_CHUNK):
+            chunk = canonical[i:i + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT url FROM seen_urls WHERE url IN ({placeholders})", chunk
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def mark_sent(self, urls: Iterable[str]) -> int:
+        """送信したURLを1トランザクションで登録・更新し、新規登録件数を返す"""
+        canonical = {canonicalize_url(u) for u in urls if u}
+        if not canonical:
+            return 0
+        now = now_jst().isoformat()
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_urls (url, first_seen, last_sent) VALUES (?, ?, ?)",
+                ((u, now, now) for u in canonical),
+            )
+            added = self._conn.total_changes - before
+            self._conn.executemany(
+                "UPDATE seen_urls SET last_sent = ? WHERE url = ?",
+                ((now, u) for u in canonical),
+            )
+        return added
+
+    def deferred_urls(self) -> list[str]:
+        """評価を保留中のURL（保留した順）"""
+        rows = self._conn.execute("SELECT url FROM deferred ORDER BY deferred_at, url")
+        return [row[0] for row in rows]
+
+    def set_deferred(self, urls: Iterable[str]) -> None:
+        """保留中のURLを今回の評価で保留したものに置き換える（継続して保留するURLは保留日時を保つ）"""
+        keep = list(dict.fromkeys(u for u in urls if u))
+        now = now_jst().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO deferred (url, deferred_at) VALUES (?, ?)",
+                ((u, now) for u in keep),
+            )
+            placeholders = ",".join("?" * len(keep))
+            self._conn.execute(
+                f"DELETE FROM deferred WHERE url NOT IN ({placeholders})" if keep
+                else "DELETE FROM deferred",
+                keep,
+            )
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM seen_urls").fetchone()[0]
+
+    def stats(self, recent_days: int = 7) -> dict:
+        """件数・最古の登録日時・最新の送信日時・直近 recent_days 日の送信件数を返す"""
+        count, first_seen, last_sent = self._conn.execute(
+            "SELECT COUNT(*), MIN(first_seen), MAX(last_sent) FROM seen_urls"
+        ).fetchone()
+        since = (now_jst() - timedelta(days=recent_days)).isoformat()
+        recent = self._conn.execute(
+            "SELECT COUNT(*) FROM seen_urls WHERE last_sent >= ?", (since,)
+        ).fetchone()[0]
+        return {
+            "count": count,
+            "first_seen": first_seen,
+            "last_sent": last_sent,
+            f"sent_last_{recent_days}_days": recent,
+        }
@@ -0,0 +1,116 @@
+"""
+LLM評価結果のディスクキャッシュ
+キー: モデル名 + プロンプトバージョン + LLM入力テキスト のSHA-256
+本文が変わらないページは再評価せず、前回の評価結果を使い回す
+TTL超過エントリは読み込み時に破棄し、上限件数を超えたら古い順に削除する
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from src.config import LLM_CACHE_FILE, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_DAYS
+from src.utils.dates import now_jst
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def make_cache_key(model: str, prompt_version: str, content: str) -> str:
+    raw = "\n".join([model, prompt_version, content])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    {key: {"saved_at": ISO日時, "record": dict}} をJSONファイルで保持する。
+    format_pages のスレッドプールから呼ばれるため get/put はロックで保護する。
+    """
+
+    def __init__(
+        self,
+        path: Path = LLM_CACHE_FILE,
+        ttl_days: int = LLM_CACHE_TTL_DAYS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.ttl = timedelta(days=ttl_days)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"LLMキャッシュ読み込み失敗: {e}")
+            return
+        if not isinstance(data, dict):
+            return
+
+        # TTL超過エントリを破棄
+        cutoff = now_jst() - self.ttl
+        for key, entry in data.items():
+            try:
+                saved_at = datetime.fromisoformat(entry["saved_at"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if saved_at >= cutoff and isinstance(entry.get("record"), dict):
+                self._entries[key] = entry
+        expired = len(data) - len(self._entries)
+        if expired:
+            self._dirty = True
+            logger.debug(f"LLMキャッシュ: 期限切れ{expired}件を破棄")
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            # 常駐モードでは読み込み後も使い続けるため、取得時にもTTLを確認する
+            if entry is not None and entry["saved_at"] < (now_jst() - self.ttl).isoformat():
+                del self._entries[key]
+                self._dirty = True
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(entry["record"])
+
+    def put(self, key: str, record: dict) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "saved_at": now_jst().isoformat(),
+                "record": dict(record),
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        """変更があればファイルへ書き出す（上限件数を超えた分は古い順に削除）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            if len(self._entries) > self.max_entries:
+                newest = sorted(
+                    self._entries.items(),
+                    key=lambda kv: kv[1]["saved_at"],
+                    reverse=True,
+                )[: self.max_entries]
+                self._entries = dict(newest)
+            try:
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(
+                    json.dumps(self._entries, ensure_ascii=False),
+                    encoding="utf-8",
+                )
+                tmp.replace(self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.warning(f"LLMキャッシュ保存失敗: {e}")
@@ -2,53 +2,107 @@
 LLMによる情報構造化
 ParsedPageの本文をdata-model.md定義のJSONスキーマに整形する
 コスト最適化: 本文2000文字制限、max_tokens=1200/件
+並行化: 共有httpx.Client（keep-alive）上でLLM_CONCURRENCY件ずつ同時評価
+バッチ化: LLM_BATCH_SIZE件を1リクエストにまとめ、システムプロンプトの重複送信を削減
 """
+import hashlib
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import httpx
 
 from src.config import (
     BODY_EXCERPT_CHARS,
+    LLM_BATCH_SIZE,
+    LLM_CACHE_ENABLED,
+    LLM_CONCURRENCY,
     LLM_MAX_TOKENS,
     LLM_TEMPERATURE,
+    LLM_TIMEOUT_SEC,
     OPENROUTER_API_KEY,
     OPENROUTER_BASE_URL,
     OPENROUTER_MODEL_EXTRACT,
 )
 from src.crawl.parse import ParsedPage
+from src.llm.cache import LLMCache, make_cache_key
+from src.llm.usage import get_ledger
+from src.profiles import DEFAULT_PROFILE, Profile
+from src.utils.checkpoint import RunCheckpoint
 from src.utils.dates import format_date_iso
+from src.utils.http_replay import create_transport
 from src.utils.logger import get_logger
+from src.utils.metrics import get_metrics
+from src.utils.pools import pooled, warm_resource
 
 logger = get_logger()
 
-_SYSTEM_PROMPT = """\
-あなたはONESTRUCTION（建設×BIM×AIのスタートアップ）の視点で、
+# _SYSTEM_PROMPT_TEMPLATE / 入力フォーマットを変更したら上げる（LLMキャッシュを無効化するため）
+_PROMPT_VERSION = "1"
+
+# {company} / {description} はプロファイルの値で置き換える（JSONの波括弧は二重にしてある）
+_SYSTEM_PROMPT_TEMPLATE = """\
+あなたは{company}（{description}）の視点で、
 リバース型アクセラレーター・共創プログラムを評価する専門家です。
 
 以下のJSONスキーマに従って情報を構造化し、JSONのみを出力してください。
 説明文・マークダウン・コードブロックは不要です。
 
-{
+{{
   "タイトル": "プログラム名（文字列）",
   "参加お勧め度": 3,
   "参照URL": "元ページURL（文字列）",
   "is_active": true
-}
+}}
 
-参加お勧め度は1（低）〜5（高）の整数で、ONESTRUCTIONとの親和性に基づいて設定してください。
+参加お勧め度は1（低）〜5（高）の整数で、{company}との親和性に基づいて設定してください。
 is_activeはページの内容から募集が現在進行中かを判定してください。
 期限切れ・終了済み・募集終了と読み取れる場合は false にしてください。
 現在応募受付中、または判断できない場合は true にしてください。
 """
 
 
+def build_system_prompt(profile: Profile = DEFAULT_PROFILE) -> str:
+    return _SYSTEM_PROMPT_TEMPLATE.format(
+        company=profile.company, description=profile.description
+    )
+
+
+_SYSTEM_PROMPT = build_system_prompt()
+
+# バッチ評価時に _SYSTEM_PROMPT の末尾へ追加する出力形式の指示
+_BATCH_INSTRUCTION = """
+【複数ページの一括評価】
+入力には「=== ページ N ===」で区切られた複数ページが含まれます。
+各ページにつき上記スキーマのオブジェクトを1つ作成し、入力順のJSON配列のみを出力してください。
+各オブジェクトの参照URLには、対応するページの「URL:」行の値をそのまま記載してください。
+"""
+
+
 def extract_body_excerpt(text: str, max_chars: int = BODY_EXCERPT_CHARS) -> str:
     """本文を最大文字数に切り詰める"""
     return text[:max_chars] if len(text) > max_chars else text
 
 
+def _parse_llm_json_array(text: str) -> Optional[list[dict]]:
+    """LLMの出力テキストからJSON配列を抽出・パース（バッチ評価用）"""
+    text = re.sub(r"```(?:json)?", "", text).strip()
+
+    try:
+        start = text.index("[")
+        end = text.rindex("]") + 1
+        arr = json.loads(text[start:end])
+    except (ValueError, json.JSONDecodeError) as e:
+        logger.warning(f"JSON配列解析失敗: {e} / テキスト先頭: {text[:100]}")
+        return None
+
+    if not isinstance(arr, list):
+        return None
+    return [item for item in arr if isinstance(item, dict)]
+
+
 def _parse_llm_json(text: str) -> Optional[dict]:
     """LLMの出力テキストからJSONを抽出・パース"""
     # コードブロック除去
@@ -64,14 +118,36 @@ def _parse_llm_json(text: str) -> Optional[dict]:
         return None
 
 
-def format_page(page: ParsedPage) -> Optional[dict]:
+def _build_headers() -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://github.com/reverse-accel-collector",
+        "X-Title": "Reverse Accel Collector",
+    }
+
+
+def create_client(concurrency: int = LLM_CONCURRENCY) -> httpx.Client:
     """
-    ParsedPageをLLMで整形してdata-model.md準拠のdictを返す。
-    失敗した場合はNoneを返す。
+    OpenRouter用の共有クライアントを作成する。
+    同時実行数ぶんのkeep-alive接続をプールし、TLSハンドシェイクを使い回す。
     """
-    body = extract_body_excerpt(page.body_text)
+    limits = httpx.Limits(
+        max_connections=max(1, concurrency),
+        max_keepalive_connections=max(1, concurrency),
+    )
+    return httpx.Client(
+        headers=_build_headers(),
+        timeout=LLM_TIMEOUT_SEC,
+        limits=limits,
+        transport=create_transport(limits),
+    )
 
-    user_content = f"""
+
+def _build_page_content(page: ParsedPage) -> str:
+    """1ページぶんのLLM入力テキストを組み立てる"""
+    body = extract_body_excerpt(page.body_text)
+    return f"""
 URL: {page.url}
 タイトル（仮）: {page.title}
 主催（仮）: {page.organizer}
@@ -84,83 +160,293 @@ URL: {page.url}
 {body}
 """
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://github.com/reverse-accel-collector",
-        "X-Title": "Reverse Accel Collector",
-    }
 
+def _chat(
+    client: httpx.Client,
+    system_prompt: str,
+    user_content: str,
+    max_tokens: int,
+) -> str:
+    """chat/completions を1回呼び出し、応答本文を返す（HTTPエラーは例外を送出）"""
+    started = time.perf_counter()
+    ok = False
     try:
-        with httpx.Client(timeout=60) as client:
-            resp = client.post(
-                f"{OPENROUTER_BASE_URL}/chat/completions",
-                headers=headers,
-                json={
-                    "model": OPENROUTER_MODEL_EXTRACT,
-                    "messages": [
-                        {"role": "system", "content": _SYSTEM_PROMPT},
-                        {"role": "user", "content": user_content},
-                    ],
-                    "max_tokens": LLM_MAX_TOKENS,
-                    "temperature": LLM_TEMPERATURE,
-                },
-            )
-            resp.raise_for_status()
-            content = (
-                resp.json()
-                .get("choices", [{}])[0]
-                .get("message", {})
-                .get("content", "")
-            )
+        resp = client.post(
+            f"{OPENROUTER_BASE_URL}/chat/completions",
+            json={
+                "model": OPENROUTER_MODEL_EXTRACT,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
+                ],
+                "max_tokens": max_tokens,
+                "temperature": LLM_TEMPERATURE,
+                "usage": {"include": True},
+            },
+        )
+        resp.raise_for_status()
+        ok = True
+    finally:
+        get_metrics().observe("llm", time.perf_counter() - started, ok=ok)
+    data = resp.json()
+    ledger = get_ledger()
+    if ledger:
+        ledger.record("llm", OPENROUTER_MODEL_EXTRACT, data.get("usage"))
+    return (
+        data
+        .get("choices", [{}])[0]
+        .get("message", {})
+        .get("content", "")
+    )
+
+
+def _normalize_record(result: dict, page: ParsedPage) -> dict:
+    """LLM出力に必須フィールドを補完し、型を保証する"""
+    # 必須フィールドの補完
+    result.setdefault("参照URL", page.url)
+    result.setdefault("タイトル", page.title or "（タイトル不明）")
+    result.setdefault("is_active", True)
+
+    # 参加お勧め度の型保証
+    try:
+        result["参加お勧め度"] = int(result.get("参加お勧め度", 3))
+        result["参加お勧め度"] = max(1, min(5, result["参加お勧め度"]))
+    except (TypeError, ValueError):
+        result["参加お勧め度"] = 3
+
+    # is_activeの型保証（文字列 "false" も考慮）
+    raw_active = result.get("is_active", True)
+    if isinstance(raw_active, str):
+        result["is_active"] = raw_active.lower() not in ("false", "0", "no")
+    else:
+        result["is_active"] = bool(raw_active)
+
+    logger.debug(f"LLM整形完了: {result.get('タイトル', '')[:30]} (is_active={result['is_active']})")
+    return result
 
+
+def format_page(
+    page: ParsedPage,
+    client: Optional[httpx.Client] = None,
+    system_prompt: str = _SYSTEM_PROMPT,
+) -> Optional[dict]:
+    """
+    ParsedPageをLLMで整形してdata-model.md準拠のdictを返す。
+    client を渡した場合はそのコネクションプールを使い回す。
+    system_prompt はプロファイルの視点で作ったもの（build_system_prompt）を渡す。
+    失敗した場合はNoneを返す。
+    """
+    owns_client = client is None
+    if client is None:
+        client = create_client(concurrency=1)
+
+    try:
+        content = _chat(
+            client, system_prompt, _build_page_content(page), LLM_MAX_TOKENS
+        )
         result = _parse_llm_json(content)
         if result is None:
             return None
-
-        # 必須フィールドの補完
-        result.setdefault("参照URL", page.url)
-        result.setdefault("タイトル", page.title or "（タイトル不明）")
-        result.setdefault("is_active", True)
-
-        # 参加お勧め度の型保証
-        try:
-            result["参加お勧め度"] = int(result.get("参加お勧め度", 3))
-            result["参加お勧め度"] = max(1, min(5, result["参加お勧め度"]))
-        except (TypeError, ValueError):
-            result["参加お勧め度"] = 3
-
-        # is_activeの型保証（文字列 "false" も考慮）
-        raw_active = result.get("is_active", True)
-        if isinstance(raw_active, str):
-            result["is_active"] = raw_active.lower() not in ("false", "0", "no")
-        else:
-            result["is_active"] = bool(raw_active)
-
-        logger.debug(f"LLM整形完了: {result.get('タイトル', '')[:30]} (is_active={result['is_active']})")
-        return result
+        return _normalize_record(result, page)
 
     except Exception as exc:
         logger.warning(f"LLM整形失敗 [{page.url}]: {exc}")
         return None
 
+    finally:
+        if owns_client:
+            client.close()
+
 
-def format_pages(pages: list[ParsedPage]) -> tuple[list[dict], list[str]]:
+def _url_key(url: str) -> str:
+    return url.strip().rstrip("/")
+
+
+def format_batch(
+    pages: list[ParsedPage],
+    client: httpx.Client,
+    system_prompt: str = _SYSTEM_PROMPT,
+    deferred: Optional[list[int]] = None,
+) -> list[Optional[dict]]:
+    """
+    複数ページを1リクエストで一括評価し、入力順の結果リストを返す。
+    応答は参照URLでページに対応付ける。
+    応答が不正な場合や対応するオブジェクトが無いページは format_page で個別評価する。
+    個別評価も当日のAPI予算を使い切った後は呼び出さず、結果を None としてその位置を deferred に追加する。
     """
-    複数ページを順次整形する。
+    if len(pages) == 1:
+        return [format_page(pages[0], client=client, system_prompt=system_prompt)]
+
+    user_content = "\n".join(
+        f"=== ページ {i} ===\n{_build_page_content(page)}"
+        for i, page in enumerate(pages, 1)
+    )
+
+    items: Optional[list[dict]] = None
+    try:
+        content = _chat(
+            client,
+            system_prompt + _BATCH_INSTRUCTION,
+            user_content,
+            LLM_MAX_TOKENS * len(pages),
+        )
+        items = _parse_llm_json_array(content)
+    except Exception as exc:
+        logger.warning(f"LLMバッチ整形失敗 ({len(pages)}件): {exc}")
+
+    by_url: dict[str, dict] = {}
+    for item in items or []:
+        url = item.get("参照URL")
+        if isinstance(url, str):
+            by_url.setdefault(_url_key(url), item)
+
+    ledger = get_ledger()
+    results: list[Optional[dict]] = []
+    fallback = 0
+    for pos, page in enumerate(pages):
+        item = by_url.get(_url_key(page.url))
+        if item is None and ledger and ledger.exhausted():
+            results.append(None)
+            if deferred is not None:
+                deferred.append(pos)
+        elif item is None:
+            fallback += 1
+            results.append(format_page(page, client=client, system_prompt=system_prompt))
+        else:
+            item["参照URL"] = page.url
+            results.append(_normalize_record(item, page))
+
+    if fallback:
+        logger.info(f"LLMバッチ整形: {fallback}/{len(pages)}件を個別評価にフォールバック")
+    return results
+
+
+def _prompt_version(profile: Profile) -> str:
+    """
+    キャッシュキー用のプロンプト版。視点の文面が既定と同じなら単一プロファイル時代のキャッシュをそのまま使い、
+    異なれば（名前が default でも会社・説明を変えたものを含め）文面ごとに別キーにする。
+    """
+    system_prompt = build_system_prompt(profile)
+    if system_prompt == _SYSTEM_PROMPT:
+        return _PROMPT_VERSION
+    digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+    return f"{_PROMPT_VERSION}:{profile.name}:{digest}"
+
+
+def _cache_key(page: ParsedPage, profile: Profile = DEFAULT_PROFILE) -> str:
+    return make_cache_key(
+        OPENROUTER_MODEL_EXTRACT, _prompt_version(profile), _build_page_content(page)
+    )
+
+
+def format_pages(
+    pages: list[ParsedPage],
+    concurrency: int = LLM_CONCURRENCY,
+    batch_size: int = LLM_BATCH_SIZE,
+    use_cache: bool = LLM_CACHE_ENABLED,
+    checkpoint: Optional[RunCheckpoint] = None,
+    profile: Profile = DEFAULT_PROFILE,
+) -> tuple[list[dict], list[str], list[str]]:
+    """
+    複数ページを共有クライアント上で、profile の視点で並行整形する。
+    concurrency が1以下の場合は順次実行する。
+    batch_size が2以上の場合は batch_size 件ずつ1リクエストにまとめて評価する。
+    use_cache が真の場合、本文が前回と同じページはキャッシュ済みの評価結果を使う。
+    checkpoint を渡した場合、同日中に評価済みのURLはその結果を使い、新たな評価結果はバッチ完了ごとに追記する
+    （キャッシュ・チェックポイントともプロファイルごとに別管理）。
+    当日のAPI予算を使い切った後のバッチは呼び出さずに保留とする
+    （実行中だったバッチは完了させるため、超過は最大で同時実行数ぶん）。
+    レコード・エラー・保留とも入力順で返す。
 
     Returns:
-        (整形成功レコードリスト, エラーメッセージリスト)
+        (整形成功レコードリスト, エラーメッセージリスト, 保留ページのURLリスト)
     """
     records: list[dict] = []
     errors: list[str] = []
+    deferred: list[str] = []
+
+    if not pages:
+        return records, errors, deferred
+
+    cache = warm_resource("llm_cache", LLMCache) if use_cache else None
+    hits_before, misses_before = (cache.hits, cache.misses) if cache else (0, 0)
+    system_prompt = build_system_prompt(profile)
+    done = checkpoint.llm_records(profile.name) if checkpoint else {}
+    results: dict[int, Optional[dict]] = {}
+    keys: dict[int, str] = {}
+    pending: list[int] = []
+    for i, page in enumerate(pages):
+        if page.url in done:
+            results[i] = dict(done[page.url])
+            continue
+        if cache is not None:
+            keys[i] = _cache_key(page, profile)
+            cached = cache.get(keys[i])
+            if cached is not None:
+                logger.debug(f"LLMキャッシュヒット: {page.url}")
+                results[i] = cached
+                continue
+        pending.append(i)
+
+    batch_size = max(1, batch_size)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    ledger = get_ledger()
+    deferred_idx: set[int] = set()
+
+    def _run(batch: list[int]) -> list[Optional[dict]]:
+        if ledger and ledger.exhausted():
+            deferred_idx.update(batch)
+            return [None] * len(batch)
+        for i in batch:
+            logger.info(f"{profile.log_prefix}LLM整形: {pages[i].url}")
+        skipped: list[int] = []
+        batch_result = format_batch([pages[i] for i in batch], client, system_prompt, skipped)
+        deferred_idx.update(batch[pos] for pos in skipped)
+        if checkpoint:
+            checkpoint.add_llm_records(
+                ((pages[i].url, r) for i, r in zip(batch, batch_result) if r),
+                profile.name,
+            )
+        return batch_result
+
+    if batches:
+        workers = max(1, min(concurrency, len(batches)))
+        # 接続は使う分だけ張られるため、常駐時に使い回す場合も上限は concurrency で作る
+        with pooled("llm", lambda: create_client(concurrency=concurrency)) as client:
+            if workers == 1:
+                batch_results = [_run(batch) for batch in batches]
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    batch_results = list(executor.map(_run, batches))
+
+        for batch, batch_result in zip(batches, batch_results):
+            for i, result in zip(batch, batch_result):
+                results[i] = result
+                if cache is not None and result:
+                    cache.put(keys[i], result)
+
+    if done:
+        resumed = sum(1 for page in pages if page.url in done)
+        logger.info(f"{profile.log_prefix}チェックポイントから評価済み{resumed}件を再利用")
+
+    if cache is not None:
+        cache.save()
+        hits, misses = cache.hits - hits_before, cache.misses - misses_before
+        logger.info(
+            f"LLMキャッシュ: ヒット{hits}件 / ミス{misses}件"
+            f"（API呼び出し{hits}件削減）"
+        )
 
-    for page in pages:
-        logger.info(f"LLM整形: {page.url}")
-        result = format_page(page)
+    for i, page in enumerate(pages):
+        result = results.get(i)
         if result:
             records.append(result)
+        elif i in deferred_idx:
+            deferred.append(page.url)
         else:
             errors.append(f"LLM整形失敗: {page.url}")
 
-    return records, errors
+    if deferred:
+        logger.warning(f"{profile.log_prefix}API予算上限のためLLM評価を保留: {len(deferred)}件")
+    return records, errors, deferred
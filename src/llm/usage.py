@@ -0,0 +1,186 @@
+"""
+OpenRouter のトークン使用量・コスト記録と日次予算
+応答の usage ブロック（prompt_tokens / completion_tokens / cost）を呼び出しごとに SQLite へ記録し、
+実行ごとの合計（採用件数・保留件数つき）を runs テーブルに残す。
+cost が返らないモデルは MODEL_PRICES_USD_PER_MTOK の単価で概算する。
+当日（JST）の累計が DAILY_BUDGET_JPY に達したら exhausted() が真になり、呼び出し側は以降のAPI呼び出しを止める。
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from src.config import (
+    DAILY_BUDGET_JPY,
+    MODEL_PRICES_USD_PER_MTOK,
+    USAGE_DB,
+    USD_JPY_RATE,
+)
+from src.utils.dates import now_jst, today_jst
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id                INTEGER PRIMARY KEY,
+    run_id            TEXT NOT NULL,
+    day               TEXT NOT NULL,
+    at                TEXT NOT NULL,
+    kind              TEXT NOT NULL,
+    model             TEXT NOT NULL,
+    prompt_tokens     INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cost_usd          REAL NOT NULL,
+    estimated         INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_day ON calls (day);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id            TEXT PRIMARY KEY,
+    day               TEXT NOT NULL,
+    started_at        TEXT NOT NULL,
+    calls             INTEGER NOT NULL,
+    prompt_tokens     INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cost_usd          REAL NOT NULL,
+    accepted_records  INTEGER NOT NULL,
+    deferred_pages    INTEGER NOT NULL
+);
+"""
+
+
+def estimate_cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES_USD_PER_MTOK.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+class UsageLedger:
+    def __init__(
+        self,
+        db_path: Path = USAGE_DB,
+        daily_budget_jpy: float = DAILY_BUDGET_JPY,
+    ) -> None:
+        self.db_path = db_path
+        self.daily_budget_usd = daily_budget_jpy / USD_JPY_RATE if daily_budget_jpy > 0 else 0.0
+        # LLM評価はスレッドから記録するため、接続を共有してロックで直列化する
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self.started_at = now_jst()
+        self.run_id = self.started_at.strftime("%Y%m%d-%H%M%S")
+        self.day = today_jst().isoformat()
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(cost_usd), 0) FROM calls WHERE day = ?", (self.day,)
+        ).fetchone()
+        self._spent_before_run = row[0]
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.deferred = 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "UsageLedger":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def record(self, kind: str, model: str, usage: Optional[dict]) -> float:
+        """1回の呼び出しの usage を記録し、その費用（USD）を返す"""
+        usage = usage or {}
+        prompt = int(usage.get("prompt_tokens") or 0)
+        completion = int(usage.get("completion_tokens") or 0)
+        estimated = usage.get("cost") is None
+        cost = estimate_cost_usd(model, prompt, completion) if estimated else float(usage["cost"])
+
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+            self.cost_usd += cost
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO calls (run_id, day, at, kind, model, prompt_tokens,"
+                    " completion_tokens, cost_usd, estimated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.run_id, self.day, now_jst().isoformat(), kind, model,
+                        prompt, completion, cost, int(estimated),
+                    ),
+                )
+        return cost
+
+    def spent_today_usd(self) -> float:
+        with self._lock:
+            return self._spent_before_run + self.cost_usd
+
+    def exhausted(self) -> bool:
+        """当日の予算を使い切ったか（予算0以下なら常に偽）"""
+        return bool(self.daily_budget_usd) and self.spent_today_usd() >= self.daily_budget_usd
+
+    def finish_run(self, accepted_records: int, deferred_pages: int) -> None:
+        """実行ごとの合計を runs テーブルに保存する"""
+        self.deferred = deferred_pages
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, day, started_at, calls, prompt_tokens,"
+                " completion_tokens, cost_usd, accepted_records, deferred_pages)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.run_id, self.day, self.started_at.isoformat(), self.calls,
+                    self.prompt_tokens, self.completion_tokens, self.cost_usd,
+                    accepted_records, deferred_pages,
+                ),
+            )
+        per_record = (
+            f" / 採用1件あたり{self.cost_usd * USD_JPY_RATE / accepted_records:.3f}円"
+            if accepted_records else ""
+        )
+        logger.info(
+            f"API使用量: {self.calls}回 / 入力{self.prompt_tokens}・出力{self.completion_tokens}トークン"
+            f" / {self.cost_usd * USD_JPY_RATE:.3f}円{per_record}"
+        )
+
+    def summary_line(self) -> str:
+        """メール本文用の1行サマリー"""
+        line = (
+            f"API費用: {self.cost_usd * USD_JPY_RATE:.3f}円（{self.calls}回 / "
+            f"本日累計 {self.spent_today_usd() * USD_JPY_RATE:.3f}円"
+        )
+        if self.daily_budget_usd:
+            line += f" / 上限 {self.daily_budget_usd * USD_JPY_RATE:.2f}円"
+        return line + "）"
+
+
+_ledger: Optional[UsageLedger] = None
+
+
+def open_ledger() -> UsageLedger:
+    """この実行の使用量記録を開始する（main() の先頭で呼ぶ）"""
+    global _ledger
+    if _ledger is not None:
+        _ledger.close()
+    _ledger = UsageLedger()
+    if _ledger.exhausted():
+        logger.warning(
+            f"本日のAPI予算を使い切っています（{_ledger.spent_today_usd() * USD_JPY_RATE:.3f}円）"
+        )
+    return _ledger
+
+
+def close_ledger() -> None:
+    """この実行の使用量記録を閉じる（main() の最後で呼ぶ。常駐時に閉じた接続を使い回さない）"""
+    global _ledger
+    if _ledger is not None:
+        _ledger.close()
+        _ledger = None
+
+
+def get_ledger() -> Optional[UsageLedger]:
+    """実行中の使用量記録を返す（open_ledger() 前・close_ledger() 後は None で、記録・予算判定を行わない）"""
+    return _ledger
@@ -4,148 +4,355 @@
 cronエントリーポイント: 8ステップを try/finally で統合
 
 どのステップで例外が発生しても finally でメール通知を保証する。
+各ステップの出力は実行日ごとのチェックポイントに保存し、--resume で中断した実行を再開できる。
+LLM評価結果は再開モードでなくても同日中は再利用する（同じページに2度課金しない）。
+
+複数プロファイル（src/profiles.py）の場合も、検索・取得・解析・期限/鮮度フィルタは1回だけ行い、
+送信済みURLによる重複排除・近似重複排除・LLM評価・送信済み保存・メール通知をプロファイルごとに行う。
+
+優先ソースは検索に加えてサイトマップ・フィードから前回以降の新着を直接収集する（src/search/discovery.py）。
 """
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Optional
 
 # cron実行時のimportパス対策
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from src.config import MAX_REGISTER
-from src.crawl.fetch import fetch_all_sync
-from src.crawl.parse import parse_html
+from src.config import DISCOVERY_ENABLED, MAX_REGISTER, NEAR_DUP_ENABLED, ensure_dirs
+from src.crawl.parse import ParsedPage
+from src.crawl.pipeline import fetch_and_parse_sync
 from src.filter.deadline import apply_deadline_filter
-from src.filter.dedupe import dedupe_pages, load_seen_urls, save_seen_urls
+from src.filter.dedupe import dedupe_pages, dedupe_urls
 from src.filter.freshness import filter_stale_pages, sort_by_freshness
+from src.filter.near_dupe import NearDupIndex, filter_near_duplicates, remember_sent_pages
+from src.filter.seen_store import SeenUrlStore
 from src.llm.formatter import format_pages
+from src.llm.usage import close_ledger, open_ledger
 from src.notify.emailer import send_report
+from src.profiles import Profile, load_profiles
+from src.search.discovery import SourceDiscovery
 from src.search.openrouter_search import fetch_candidate_urls
+from src.search.query_yield import QueryYieldTracker, finish_query_yield, start_query_yield
+from src.utils.checkpoint import RunCheckpoint, prune_checkpoints
 from src.utils.dates import today_jst
+from src.utils.http_replay import log_replay_stats
 from src.utils.logger import get_logger
+from src.utils.metrics import get_metrics, start_run
+from src.utils.urls import canonicalize_url
 
 logger = get_logger()
 
 
-def main() -> None:
+@dataclass
+class _ProfileRun:
+    """1プロファイルぶんの状態と集計（Step 2 以降）"""
+    profile: Profile
+    seen_store: Optional[SeenUrlStore] = None
+    near_dup_index: Optional[NearDupIndex] = None
+    existing_urls: set[str] = field(default_factory=set)
+    pages: list[ParsedPage] = field(default_factory=list)
+    registered: list[dict] = field(default_factory=list)
+    duplicate_count: int = 0
+    url_duplicates: set[str] = field(default_factory=set)  # フェッチ前に重複と数えた正規化URL
+    inactive_count: int = 0
+    errors: list[str] = field(default_factory=list)
+    deferred_urls: list[str] = field(default_factory=list)
+    failed: bool = False
+    notified: bool = False
+
+    @property
+    def log(self) -> str:
+        return self.profile.log_prefix
+
+    def close(self) -> None:
+        if self.seen_store:
+            self.seen_store.close()
+        if self.near_dup_index:
+            self.near_dup_index.close()
+
+
+def _evaluate_profile(
+    run: _ProfileRun,
+    pages: list[ParsedPage],
+    checkpoint: RunCheckpoint,
+    query_yield: QueryYieldTracker,
+) -> None:
+    """Step 5 の残り〜Step 6 を1プロファイルぶん実行する（pages は共通フィルタ済み）"""
+    metrics = get_metrics()
+    with metrics.stage("filter"):
+        pages, dups = dedupe_pages(pages, run.existing_urls)
+        # 他のプロファイル用に取得した送信済みURL・再開時に復元したページは、フェッチ前に数えたものを数え直さない
+        run.duplicate_count += sum(1 for u in dups if canonicalize_url(u) not in run.url_duplicates)
+        query_yield.mark_passed(p.url for p in pages)
+
+        # 件数カット前に別URLの同一案件を除外し、LLM評価枠を無駄にしない
+        run.near_dup_index = NearDupIndex(run.profile.near_dup_db) if NEAR_DUP_ENABLED else None
+        if run.near_dup_index:
+            pages, near_dups = filter_near_duplicates(pages, run.near_dup_index)
+            run.duplicate_count += len(near_dups)
+
+        pages = pages[:MAX_REGISTER]
+    run.pages = pages
+    logger.info(f"{run.log}フィルタ後: {len(pages)}件（最大{MAX_REGISTER}件）")
+
+    if not pages:
+        logger.info(f"{run.log}対象が0件。メール通知のみ実行します。")
+        return
+
+    # ── Step 6: LLMによる評価・整形 ──────────────────────────────
+    logger.info(f"{run.log}Step 6: LLM評価 ({len(pages)}件)")
+    with metrics.stage("llm"):
+        records, llm_errors, run.deferred_urls = format_pages(
+            pages, checkpoint=checkpoint, profile=run.profile
+        )
+    run.errors.extend(llm_errors)
+    logger.info(f"{run.log}評価成功: {len(records)}件")
+
+    # is_active=false の案件を除外
+    active_records = [r for r in records if r.get("is_active", True)]
+    run.inactive_count = len(records) - len(active_records)
+    if run.inactive_count:
+        logger.info(f"{run.log}is_active=false 除外: {run.inactive_count}件")
+    records = active_records
+
+    # 参加お勧め度の高い順にソート
+    records.sort(key=lambda r: r.get("参加お勧め度", 0), reverse=True)
+
+    run.registered = records
+
+
+def _save_sent(run: _ProfileRun, query_yield: QueryYieldTracker) -> None:
+    """
+    Step 7: 送信したレコードのURL・本文指紋を保存する。
+    メール送信に成功した後に呼ぶ（送信失敗時は保存せず、再開時に同じレコードを送り直す）。
+    """
+    if not run.registered:
+        return
+    with get_metrics().stage("save"):
+        new_urls = {r.get("参照URL", "") for r in run.registered if r.get("参照URL")}
+        added = run.seen_store.mark_sent(new_urls)
+        query_yield.mark_sent(new_urls)
+        logger.info(f"{run.log}送信済みURL保存: {added}件追加 → 累計{run.seen_store.count()}件")
+        if run.near_dup_index:
+            remember_sent_pages(run.pages, new_urls, run.near_dup_index)
+
+
+def main(resume: bool = False) -> None:
+    ensure_dirs()
     today = today_jst().isoformat()
-    logger.info(f"========== 実行開始: {today} ==========")
+    prune_checkpoints()
+    checkpoint = RunCheckpoint()
+    if resume and checkpoint.done("notify"):
+        logger.info(f"本日（{today}）の実行は完了済みのため、再開モードでは何もしません")
+        return
+
+    profiles = load_profiles()
+    runs = [_ProfileRun(p) for p in profiles]
+    if resume:
+        # 通知済みのプロファイルは再送しない
+        for run in runs:
+            run.notified = checkpoint.done(f"notify:{run.profile.name}")
+        runs = [run for run in runs if not run.notified]
+        if not runs:
+            logger.info(f"本日（{today}）の全プロファイルに通知済みのため、再開モードでは何もしません")
+            return
+
+    logger.info(f"========== 実行開始: {today}{'（再開）' if resume else ''} ==========")
+    if len(profiles) > 1:
+        logger.info(f"プロファイル: {', '.join(run.profile.name for run in runs)}")
+    metrics = start_run()
+    ledger = open_ledger()
+    query_yield = start_query_yield()
+    discovery = SourceDiscovery() if DISCOVERY_ENABLED else None
 
-    registered_records: list[dict] = []
     excluded_count: int = 0
-    duplicate_count: int = 0
     stale_count: int = 0
-    inactive_count: int = 0
-    errors: list[str] = []
+    errors: list[str] = []  # 全プロファイル共通のエラー（検索・取得）
+    failed = False
+    already_sent: list[str] = []  # 全プロファイルで送信済みのため取得しなかった候補
+    parsed_urls: list[str] = []
 
     try:
-        # ── Step 1: Perplexity Sonar検索 → 候補URL取得（最大80件）─────────
+        # ── Step 1: Perplexity Sonar検索（最大80件）＋ 優先ソースのサイトマップ・フィード → 候補URL取得 ──
         logger.info("Step 1: URL検索")
-        try:
-            candidate_urls = fetch_candidate_urls()
-        except Exception as e:
-            errors.append(f"Step1 検索エラー: {e}")
-            logger.error(f"Step1 失敗: {e}")
-            candidate_urls = []
+        for run in runs:
+            run.seen_store = SeenUrlStore(run.profile.seen_db, legacy_json=run.profile.legacy_seen_json)
+        candidate_urls = checkpoint.load_candidates() if resume else None
+        candidates_restored = candidate_urls is not None
+        if candidates_restored:
+            logger.info(f"チェックポイントから候補URLを復元: {len(candidate_urls)}件")
+        else:
+            # 失敗したクエリがあれば検索ステップを完了扱いにせず、再開時に検索し直す
+            search_ok = False
+            with metrics.stage("search"):
+                try:
+                    candidate_urls, failed_queries = fetch_candidate_urls(profiles)
+                    search_ok = failed_queries == 0
+                    if failed_queries:
+                        errors.append(f"Step1 検索エラー: {failed_queries}クエリが失敗・スキップ")
+                except Exception as e:
+                    errors.append(f"Step1 検索エラー: {e}")
+                    logger.error(f"Step1 失敗: {e}")
+                    candidate_urls = []
+            if discovery:
+                with metrics.stage("discovery"):
+                    try:
+                        discovered = discovery.discover()
+                    except Exception as e:
+                        errors.append(f"Step1 直接収集エラー: {e}")
+                        logger.error(f"Step1 直接収集失敗: {e}")
+                        discovered = []
+                # 優先ソースの新着は検索結果の MAX_URLS とは別枠で先頭に置く
+                known = set(discovered)
+                candidate_urls = discovered + [u for u in candidate_urls if u not in known]
+            # 前回API予算上限で評価を保留したURLは、検索結果に関わらず先頭に戻す
+            deferred = list(dict.fromkeys(u for run in runs for u in run.seen_store.deferred_urls()))
+            if deferred:
+                logger.info(f"前回保留したURLを候補に追加: {len(deferred)}件")
+                known = set(deferred)
+                candidate_urls = deferred + [u for u in candidate_urls if u not in known]
+            if search_ok:
+                checkpoint.save_candidates(candidate_urls)
 
         if not candidate_urls:
             logger.warning("候補URLが0件。処理を終了します。")
             return
 
-        # ── Step 2: 送信済みURL取得（重複チェック用）─────────────────────
+        # ── Step 2: 送信済みURL取得 → フェッチ前の重複排除 ────────────────
+        # 取得対象は「いずれかのプロファイルで未送信」のURL（全プロファイルで送信済みのものだけ除く）
         logger.info("Step 2: 送信済みURL取得")
-        existing_urls = load_seen_urls()
-        logger.info(f"送信済みURL: {len(existing_urls)}件")
+        with metrics.stage("seen_urls"):
+            seen_by_all: Optional[set[str]] = None
+            for run in runs:
+                run.existing_urls = run.seen_store.lookup(candidate_urls)
+                logger.info(
+                    f"{run.log}送信済みURL: 累計{run.seen_store.count()}件"
+                    f"（候補中{len(run.existing_urls)}件）"
+                )
+                _, url_dups = dedupe_urls(candidate_urls, run.existing_urls)
+                run.duplicate_count = len(url_dups)
+                run.url_duplicates = {canonicalize_url(u) for u in url_dups}
+                seen_by_all = (
+                    set(run.existing_urls) if seen_by_all is None
+                    else seen_by_all & run.existing_urls
+                )
+
+            already_sent = [u for u in candidate_urls if canonicalize_url(u) in (seen_by_all or set())]
+            candidate_urls, url_dups = dedupe_urls(candidate_urls, seen_by_all or set())
+            logger.info(
+                f"URL重複排除: {len(candidate_urls) + len(url_dups)}件 → {len(candidate_urls)}件残存"
+                f" / {len(url_dups)}件除外"
+            )
+            query_yield.mark_new(candidate_urls)
 
-        # ── Step 3: HTML並行取得 ───────────────────────────────────────
+        # ── Step 3-4: HTML並行取得 → 解析（取得完了順にストリーミング解析）──
         logger.info(f"Step 3: HTML取得 ({len(candidate_urls)}件)")
-        try:
-            html_map = fetch_all_sync(candidate_urls)
-        except Exception as e:
-            errors.append(f"Step3 HTML取得エラー: {e}")
-            logger.error(f"Step3 失敗: {e}")
-            html_map = {}
-
-        # ── Step 4: HTML解析 ──────────────────────────────────────────
-        logger.info("Step 4: HTML解析")
-        pages = []
-        for url, html in html_map.items():
-            if html is None:
-                errors.append(f"取得失敗: {url}")
-                continue
-            page = parse_html(url, html)
-            if page:
-                pages.append(page)
-            else:
-                errors.append(f"解析失敗: {url}")
+        logger.info("Step 4: HTML解析（取得と並行）")
+        # 候補URLを検索し直した場合は、前回の取得・解析結果と対象が異なるため使わない
+        restored = checkpoint.load_pages() if resume and candidates_restored else None
+        if restored is not None:
+            _, pages, fetch_errors = restored
+            errors.extend(fetch_errors)
+            logger.info(f"チェックポイントから解析結果を復元: {len(pages)}件")
+        else:
+            with metrics.stage("fetch_parse"):
+                try:
+                    pages, fetch_errors = fetch_and_parse_sync(candidate_urls)
+                    errors.extend(fetch_errors)
+                    checkpoint.save_pages(candidate_urls, pages, fetch_errors)
+                except Exception as e:
+                    errors.append(f"Step3 HTML取得エラー: {e}")
+                    logger.error(f"Step3 失敗: {e}")
+                    pages = []
 
+        parsed_urls = [page.url for page in pages]
+        metrics.incr("urls_fetched", len(candidate_urls))
+        metrics.incr("pages_parsed", len(pages))
         logger.info(f"解析成功: {len(pages)}件")
 
-        # ── Step 5: 重複排除 → 期限フィルタ → 鮮度フィルタ → 鮮度ソート ──
+        # ── Step 5: 期限フィルタ → 鮮度フィルタ → 鮮度ソート（共通）
+        #    → 重複排除 → 近似重複排除（プロファイルごと）──
+        # 送信済みURL・近似重複の索引はプロファイルごとに異なるため、共通フィルタの後で分岐する
         logger.info("Step 5: フィルタリング")
+        with metrics.stage("filter"):
+            pages, excluded = apply_deadline_filter(pages)
+            excluded_count = len(excluded)
 
-        pages, dups = dedupe_pages(pages, existing_urls)
-        duplicate_count = len(dups)
+            pages, stale = filter_stale_pages(pages)
+            stale_count = len(stale)
 
-        pages, excluded = apply_deadline_filter(pages)
-        excluded_count = len(excluded)
+            pages = sort_by_freshness(pages)
 
-        pages, stale = filter_stale_pages(pages)
-        stale_count = len(stale)
-
-        pages = sort_by_freshness(pages)
-        pages = pages[:MAX_REGISTER]
-        logger.info(f"フィルタ後: {len(pages)}件（最大{MAX_REGISTER}件）")
-
-        if not pages:
-            logger.info("対象が0件。メール通知のみ実行します。")
-            return
-
-        # ── Step 6: LLMによる評価・整形 ──────────────────────────────
-        logger.info(f"Step 6: LLM評価 ({len(pages)}件)")
-        records, llm_errors = format_pages(pages)
-        errors.extend(llm_errors)
-        logger.info(f"評価成功: {len(records)}件")
-
-        # is_active=false の案件を除外
-        active_records = [r for r in records if r.get("is_active", True)]
-        inactive_count = len(records) - len(active_records)
-        if inactive_count:
-            logger.info(f"is_active=false 除外: {inactive_count}件")
-        records = active_records
-
-        # 参加お勧め度の高い順にソート
-        records.sort(key=lambda r: r.get("参加お勧め度", 0), reverse=True)
-
-        registered_records = records
-
-        # ── Step 7: 送信済みURLを保存 ────────────────────────────────
-        if registered_records:
-            new_urls = {r.get("参照URL", "") for r in registered_records if r.get("参照URL")}
-            updated_seen = existing_urls | new_urls
-            save_seen_urls(updated_seen)
-            logger.info(f"送信済みURL保存: {len(new_urls)}件追加 → 累計{len(updated_seen)}件")
+        for run in runs:
+            try:
+                _evaluate_profile(run, pages, checkpoint, query_yield)
+                run.seen_store.set_deferred(run.deferred_urls)
+            except Exception as e:
+                # 1プロファイルの失敗で他のプロファイルの評価・通知を止めない
+                run.failed = True
+                err_msg = f"予期せぬエラー: {e}"
+                run.errors.append(err_msg)
+                logger.exception(f"{run.log}{err_msg}")
 
     except Exception as e:
+        failed = True
         err_msg = f"予期せぬエラー: {e}"
         errors.append(err_msg)
         logger.exception(err_msg)
 
     finally:
-        # ── Step 8: メール通知（必ず実行）───────────────────────────
-        logger.info(
-            f"Step 8: メール通知 "
-            f"(送信{len(registered_records)}件 / 期限除外{excluded_count}件 "
-            f"/ 鮮度除外{stale_count}件 / 非アクティブ除外{inactive_count}件 "
-            f"/ 重複{duplicate_count}件 / エラー{len(errors)}件)"
-        )
-        send_report(
-            registered=registered_records,
-            excluded_count=excluded_count,
-            duplicate_count=duplicate_count,
-            errors=errors,
-        )
+        # ── Step 8: メール通知（必ず実行・プロファイルごと）→ Step 7: 送信済みURLを保存 ──
+        registered_total = sum(len(run.registered) for run in runs)
+        deferred_total = sum(len(run.deferred_urls) for run in runs)
+        ledger.finish_run(registered_total, deferred_total)
+        timing = metrics.summary_lines() + [ledger.summary_line()]
+        for run in runs:
+            run_errors = errors + run.errors
+            logger.info(
+                f"{run.log}Step 8: メール通知 "
+                f"(送信{len(run.registered)}件 / 期限除外{excluded_count}件 "
+                f"/ 鮮度除外{stale_count}件 / 非アクティブ除外{run.inactive_count}件 "
+                f"/ 重複{run.duplicate_count}件 / 保留{len(run.deferred_urls)}件 "
+                f"/ エラー{len(run_errors)}件)"
+            )
+            with metrics.stage("notify"):
+                sent = send_report(
+                    registered=run.registered,
+                    excluded_count=excluded_count,
+                    duplicate_count=run.duplicate_count,
+                    errors=run_errors,
+                    timing=timing,
+                    deferred=run.deferred_urls,
+                    profile=run.profile,
+                )
+            # 送信できなかったプロファイルは送信済みURLを保存せず・完了扱いにせず、再開時に送り直す
+            if sent:
+                try:
+                    _save_sent(run, query_yield)
+                except Exception as e:
+                    run.failed = True
+                    logger.exception(f"{run.log}送信済みURL保存失敗: {e}")
+            run.notified = sent and not (failed or run.failed)
+            if run.notified:
+                checkpoint.mark_done(f"notify:{run.profile.name}")
+            run.close()
+        if all(run.notified for run in runs):
+            checkpoint.mark_done("notify")
+        if discovery:
+            # 直接収集の記事は、解析して全プロファイルに通知まで済んだものだけ処理済みにし、残りは次回も返す
+            done = already_sent + (parsed_urls if all(run.notified for run in runs) else [])
+            try:
+                discovery.commit(done)
+            except Exception as e:
+                logger.error(f"直接収集の状態の保存失敗: {e}")
+        finish_query_yield()
+        log_replay_stats()
+        metrics.write()
+        close_ledger()
         logger.info(f"========== 実行完了: {today_jst().isoformat()} ==========")
 
 
 if __name__ == "__main__":
-    main()
+    main(resume="--resume" in sys.argv[1:])
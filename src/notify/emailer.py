@@ -1,20 +1,24 @@
 """
 Gmail SMTP SSL によるメール通知
-件名: [ReverseAccel] YYYY-MM-DD N件
-0件でも必ず送信する
+件名: [ReverseAccel] YYYY-MM-DD N件（既定以外のプロファイルは [ReverseAccel:表示名]）
+0件でも必ず送信する。プロファイルごとに1通、profile.email_to（空なら EMAIL_TO）へ送る
+EMAIL_DRY_RUN=1 の場合は送信せず、本文をログディレクトリに書き出す
+送信した件名・本文はプロファイルごとの last_report_file に保存し、resend_last_report() で再送できる
 """
-import smtplib
-from email.mime.text import MIMEText
-from email.utils import formatdate
+import json
+from typing import Optional
 
 from src.config import (
     EMAIL_APP_PASSWORD,
+    EMAIL_DRY_RUN,
     EMAIL_FROM,
     EMAIL_TO,
+    LOG_DIR,
     SMTP_HOST,
     SMTP_PORT,
 )
-from src.utils.dates import today_jst
+from src.profiles import DEFAULT_PROFILE, Profile
+from src.utils.dates import now_jst, today_jst
 from src.utils.logger import get_logger
 
 logger = get_logger()
@@ -27,6 +31,8 @@ def build_body(
     excluded_count: int,
     duplicate_count: int,
     errors: list[str],
+    timing: Optional[list[str]] = None,
+    deferred: Optional[list[str]] = None,
 ) -> str:
     today = today_jst().isoformat()
 
@@ -48,39 +54,116 @@ def build_body(
 
     lines.append(f"除外: 期限切れ {excluded_count}件 / 重複 {duplicate_count}件")
 
+    if deferred:
+        lines.append("")
+        lines.append(f"【保留】API予算上限のため未評価（次回以降に評価）: {len(deferred)}件")
+        for url in deferred:
+            lines.append(f"  - {url}")
+
     if errors:
         lines.append("")
         lines.append("【エラー】")
         for e in errors:
             lines.append(f"  - {e}")
 
+    if timing:
+        lines.append("")
+        lines.append("【処理時間】")
+        for t in timing:
+            lines.append(f"  {t}")
+
     lines.append("")
     lines.append("---")
     lines.append("本メールは自動送信されました。")
     return "\n".join(lines)
 
 
-def send_report(
-    registered: list[dict],
-    excluded_count: int,
-    duplicate_count: int,
-    errors: list[str],
-) -> None:
-    today = today_jst().isoformat()
-    count = len(registered)
-    subject = f"[ReverseAccel] {today} {count}件"
-    body = build_body(registered, excluded_count, duplicate_count, errors)
+def _recipient(profile: Profile) -> str:
+    return profile.email_to or EMAIL_TO
+
+
+def _deliver(subject: str, body: str, profile: Profile = DEFAULT_PROFILE) -> bool:
+    """件名・本文を送信する（EMAIL_DRY_RUN ならファイルに書き出す）。成功したら True"""
+    to = _recipient(profile)
+    if EMAIL_DRY_RUN:
+        suffix = "" if profile.is_default else f"-{profile.name}"
+        out = LOG_DIR / f"report-{today_jst().isoformat()}{suffix}.txt"
+        out.write_text(f"To: {to}\nSubject: {subject}\n\n{body}", encoding="utf-8")
+        logger.info(f"メール送信スキップ（EMAIL_DRY_RUN）: {out}")
+        return True
+
+    # SMTP・MIME は送信時にだけ読み込む（CLIの起動を軽くするため）
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.utils import formatdate
 
     msg = MIMEText(body, "plain", "utf-8")
     msg["Subject"] = subject
     msg["From"] = EMAIL_FROM
-    msg["To"] = EMAIL_TO
+    msg["To"] = to
     msg["Date"] = formatdate()
 
     try:
         with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT) as smtp:
             smtp.login(EMAIL_FROM, EMAIL_APP_PASSWORD)
-            smtp.sendmail(EMAIL_FROM, [EMAIL_TO], msg.as_string())
+            smtp.sendmail(EMAIL_FROM, [to], msg.as_string())
         logger.info(f"メール送信完了: {subject}")
+        return True
     except Exception as exc:
         logger.error(f"メール送信失敗: {exc}")
+        return False
+
+
+def _save_last_report(subject: str, body: str, profile: Profile = DEFAULT_PROFILE) -> None:
+    try:
+        profile.last_report_file.write_text(
+            json.dumps(
+                {"subject": subject, "body": body, "saved_at": now_jst().isoformat()},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+    except OSError as e:
+        logger.warning(f"レポート保存失敗: {e}")
+
+
+def load_last_report(profile: Profile = DEFAULT_PROFILE) -> Optional[dict]:
+    """profile で最後に送信したレポート {"subject", "body", "saved_at"} を返す（無ければ None）"""
+    path = profile.last_report_file
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"レポート読み込み失敗: {e}")
+        return None
+
+
+def send_report(
+    registered: list[dict],
+    excluded_count: int,
+    duplicate_count: int,
+    errors: list[str],
+    timing: Optional[list[str]] = None,
+    deferred: Optional[list[str]] = None,
+    profile: Profile = DEFAULT_PROFILE,
+) -> bool:
+    """レポートを保存して送信する。送信（EMAIL_DRY_RUN なら書き出し）に成功したら True"""
+    today = today_jst().isoformat()
+    count = len(registered)
+    tag = "ReverseAccel" if profile.is_default else f"ReverseAccel:{profile.display_name}"
+    subject = f"[{tag}] {today} {count}件"
+    body = build_body(
+        registered, excluded_count, duplicate_count, errors, timing, deferred
+    )
+    _save_last_report(subject, body, profile)
+    return _deliver(subject, body, profile)
+
+
+def resend_last_report(profile: Profile = DEFAULT_PROFILE) -> bool:
+    """profile の保存済み最新レポートを再送する。レポートが無い・送信失敗なら False"""
+    report = load_last_report(profile)
+    if report is None:
+        logger.warning(f"{profile.log_prefix}再送するレポートがありません")
+        return False
+    return _deliver(report["subject"], report["body"], profile)
@@ -0,0 +1,137 @@
+"""
+評価プロファイル（誰の視点で案件を評価・通知するか）
+プロファイルごとに評価の視点（LLMシステムプロンプトの会社名・事業内容）、追加の検索クエリ、
+通知先、送信済みURL・近似重複・最終レポートの保存先を持つ。
+PROFILES_FILE（JSON配列）が無ければ従来どおり ONESTRUCTION の既定プロファイル1つで動く。
+検索・取得・解析はプロファイル数によらず1回だけ行い、評価以降をプロファイルごとに分岐する（main.py）。
+
+PROFILES_FILE の例:
+    [
+      {"name": "default"},
+      {"name": "energy", "label": "エネルギー", "company": "Example Energy",
+       "description": "再エネ×蓄電池のスタートアップ",
+       "queries": ["オープンイノベーション エネルギー 蓄電池 {year} 募集"],
+       "email_to": "energy@example.com"}
+    ]
+省略した項目は既定プロファイルの値を使う。name はファイル名に使うため英小文字・数字・-_ のみ。
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from src.config import (
+    DATA_DIR,
+    LAST_REPORT_FILE,
+    NEAR_DUP_DB,
+    PROFILES_FILE,
+    SEEN_URLS_DB,
+    SEEN_URLS_FILE,
+)
+
+DEFAULT_PROFILE_NAME = "default"
+
+_NAME_PATTERN = re.compile(r"^[a-z0-9_-]+$")
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str = DEFAULT_PROFILE_NAME
+    label: str = ""                     # 件名・ログに出す表示名（空なら name）
+    company: str = "ONESTRUCTION"
+    description: str = "建設×BIM×AIのスタートアップ"
+    queries: tuple[str, ...] = field(default=())  # 共通クエリに追加する検索クエリ（{year} は今年に置換）
+    email_to: str = ""                  # 空なら EMAIL_TO
+
+    @property
+    def is_default(self) -> bool:
+        return self.name == DEFAULT_PROFILE_NAME
+
+    @property
+    def display_name(self) -> str:
+        return self.label or self.name
+
+    @property
+    def log_prefix(self) -> str:
+        """ログ行の接頭辞（既定プロファイルは従来のログと同じにするため空）"""
+        return "" if self.is_default else f"[{self.name}] "
+
+    def _data_path(self, default: Path, stem: str, suffix: str) -> Path:
+        # 既定プロファイルは従来のファイルをそのまま使い、単一プロファイル時の状態を引き継ぐ
+        return default if self.is_default else DATA_DIR / f"{stem}-{self.name}{suffix}"
+
+    @property
+    def seen_db(self) -> Path:
+        return self._data_path(SEEN_URLS_DB, "seen_urls", ".db")
+
+    @property
+    def legacy_seen_json(self) -> Optional[Path]:
+        """旧形式の seen_urls.json は既定プロファイルの履歴のため、他のプロファイルには取り込まない"""
+        return SEEN_URLS_FILE if self.is_default else None
+
+    @property
+    def near_dup_db(self) -> Path:
+        return self._data_path(NEAR_DUP_DB, "fingerprints", ".db")
+
+    @property
+    def last_report_file(self) -> Path:
+        return self._data_path(LAST_REPORT_FILE, "last_report", ".json")
+
+    def search_queries(self, year: int) -> list[str]:
+        return [q.replace("{year}", str(year)) for q in self.queries]
+
+
+DEFAULT_PROFILE = Profile()
+
+
+def _profile_from_dict(data: dict) -> Profile:
+    if not isinstance(data, dict):
+        raise ValueError(f"プロファイルはオブジェクトで指定してください: {data!r}")
+    unknown = set(data) - {"name", "label", "company", "description", "queries", "email_to"}
+    if unknown:
+        raise ValueError(f"不明なプロファイル項目: {', '.join(sorted(unknown))}")
+    name = data.get("name", "")
+    if not isinstance(name, str) or not _NAME_PATTERN.match(name):
+        raise ValueError(f"プロファイル名が不正です（英小文字・数字・-_ のみ）: {name!r}")
+    queries = data.get("queries", [])
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        raise ValueError(f"queries は文字列の配列で指定してください [{name}]")
+    return Profile(
+        name=name,
+        label=str(data.get("label", "")),
+        company=str(data.get("company", DEFAULT_PROFILE.company)),
+        description=str(data.get("description", DEFAULT_PROFILE.description)),
+        queries=tuple(queries),
+        email_to=str(data.get("email_to", "")),
+    )
+
+
+def load_profiles(path: Path = PROFILES_FILE) -> list[Profile]:
+    """
+    PROFILES_FILE からプロファイル一覧を読み込む。ファイルが無ければ既定プロファイルのみ。
+    内容が不正な場合は ValueError（誤った視点・通知先で送信しないよう、実行前に止める）。
+    """
+    if not path.exists():
+        return [DEFAULT_PROFILE]
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"プロファイル読み込み失敗 [{path}]: {e}") from e
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"プロファイルは1件以上の配列で指定してください [{path}]")
+
+    profiles = [_profile_from_dict(item) for item in data]
+    names = [p.name for p in profiles]
+    duplicated = sorted({n for n in names if names.count(n) > 1})
+    if duplicated:
+        raise ValueError(f"プロファイル名が重複しています: {', '.join(duplicated)}")
+    return profiles
+
+
+def find_profile(name: str, path: Path = PROFILES_FILE) -> Profile:
+    """名前でプロファイルを返す（CLI用）。見つからなければ ValueError"""
+    for profile in load_profiles(path):
+        if profile.name == name:
+            return profile
+    raise ValueError(f"プロファイルが見つかりません: {name}")
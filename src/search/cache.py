@@ -0,0 +1,124 @@
+"""
+検索クエリ結果のディスクキャッシュ
+キー: 検索クエリ文字列（保存時のモデル名が異なるエントリは使わない）
+TTL はクエリごとに SEARCH_CACHE_TTL_DAYS（前方一致）→ SEARCH_CACHE_DEFAULT_TTL_DAYS の順で決まり、
+TTL 0 のクエリは保存せず毎回検索する。TTL を過ぎたエントリ・クエリ一覧から外れたエントリは読み込み時に破棄する。
+"""
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.config import (
+    SEARCH_CACHE_DEFAULT_TTL_DAYS,
+    SEARCH_CACHE_FILE,
+    SEARCH_CACHE_TTL_DAYS,
+)
+from src.utils.dates import now_jst
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def query_ttl(
+    query: str,
+    ttl_days: dict[str, int] = SEARCH_CACHE_TTL_DAYS,
+    default_ttl_days: int = SEARCH_CACHE_DEFAULT_TTL_DAYS,
+) -> timedelta:
+    """クエリの再検索間隔（最も長く一致した前方一致の設定を使う）"""
+    matches = [prefix for prefix in ttl_days if query.startswith(prefix)]
+    days = ttl_days[max(matches, key=len)] if matches else default_ttl_days
+    return timedelta(days=max(0, days))
+
+
+class SearchCache:
+    """
+    {query: {"saved_at": ISO日時, "model": モデル名, "urls": [...]}} をJSONファイルで保持する。
+    queries を渡した場合、それ以外のクエリ（設定から外した・年が変わったもの）のエントリは読み込み時に破棄する。
+    検索はイベントループ上で実行し、get/put は同じスレッドから呼ぶためロックは持たない。
+    """
+
+    def __init__(
+        self,
+        model: str,
+        queries: Optional[Iterable[str]] = None,
+        path: Path = SEARCH_CACHE_FILE,
+        ttl_days: dict[str, int] = SEARCH_CACHE_TTL_DAYS,
+        default_ttl_days: int = SEARCH_CACHE_DEFAULT_TTL_DAYS,
+    ) -> None:
+        self.model = model
+        self.path = path
+        self.ttl_days = ttl_days
+        self.default_ttl_days = default_ttl_days
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        self._load(set(queries) if queries is not None else None)
+
+    def ttl(self, query: str) -> timedelta:
+        return query_ttl(query, self.ttl_days, self.default_ttl_days)
+
+    def _expired(self, query: str, entry: dict, now: datetime) -> bool:
+        try:
+            saved_at = datetime.fromisoformat(entry["saved_at"])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return now - saved_at >= self.ttl(query)
+
+    def _load(self, queries: Optional[set[str]]) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"検索キャッシュ読み込み失敗: {e}")
+            return
+        if not isinstance(data, dict):
+            return
+
+        now = now_jst()
+        unused = 0
+        for query, entry in data.items():
+            if queries is not None and query not in queries:
+                unused += 1
+            elif isinstance(entry, dict) and isinstance(entry.get("urls"), list) \
+                    and not self._expired(query, entry, now):
+                self._entries[query] = entry
+        evicted = len(data) - len(self._entries)
+        if evicted:
+            self._dirty = True
+            logger.debug(f"検索キャッシュ: 期限切れ{evicted - unused}件・クエリ一覧外{unused}件を破棄")
+
+    def get(self, query: str) -> Optional[tuple[list[str], timedelta]]:
+        """有効なキャッシュがあれば (URLリスト, 保存からの経過時間) を返す"""
+        entry = self._entries.get(query)
+        now = now_jst()
+        if entry is None or entry.get("model") != self.model or self._expired(query, entry, now):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return list(entry["urls"]), now - datetime.fromisoformat(entry["saved_at"])
+
+    def put(self, query: str, urls: list[str]) -> None:
+        """検索結果を保存する（TTL 0 のクエリは保存しない）"""
+        if not self.ttl(query):
+            return
+        self._entries[query] = {
+            "saved_at": now_jst().isoformat(),
+            "model": self.model,
+            "urls": list(urls),
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """変更があればファイルへ書き出す"""
+        if not self._dirty:
+            return
+        try:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.path)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"検索キャッシュ保存失敗: {e}")
@@ -0,0 +1,482 @@
+"""
+優先ソース（PRIORITY_SOURCES）のサイトマップ・RSS/Atom フィードからの直接収集
+LLM検索を経由せず、DISCOVERY_SOURCES の各ホストで前回の実行以降に追加・更新された記事URLだけを返す。
+  - サイトマップインデックスは、lastmod がカーソル以前の子サイトマップを取得しない
+  - 記事は lastmod / pubDate / updated がカーソルより新しいものだけ候補にする
+    （日時の無いエントリは、既出URL一覧に無いものだけ候補にする）
+  - 記事を列挙するサイトマップ・フィードは ETag / Last-Modified で条件付き取得し、304なら読み込まない
+カーソル・検証子は実行の最後に commit() で保存する。途中で止まった実行は、次回同じ範囲を読み直す。
+  - 返した記事のうち処理できなかったもの（取得・解析の失敗、評価・通知の失敗）は、カーソルと関係なく
+    次回以降も返す（DISCOVERY_MAX_RETRIES 回まで）
+  - 1ソースあたり DISCOVERY_MAX_URLS 件を古い順に返し、残りは次回に回す（カーソルは返した記事までしか進めない）
+  - DISCOVERY_MAX_DOCUMENTS 件で読み残した文書は次回先に読む。読み残しがある間はカーソルを進めず、
+    返却済みの記事・読み切った子サイトマップを記録して重複と再取得を避ける
+  - 取得に失敗したサイトマップがあれば、そのソースのカーソルは進めない
+"""
+import asyncio
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from src.config import (
+    DISCOVERY_FIRST_RUN_DAYS,
+    DISCOVERY_MAX_BYTES,
+    DISCOVERY_MAX_DOCUMENTS,
+    DISCOVERY_MAX_RETRIES,
+    DISCOVERY_MAX_URLS,
+    DISCOVERY_SEEN_MAX,
+    DISCOVERY_SOURCES,
+    DISCOVERY_STATE_FILE,
+    FETCH_DELAY_SEC,
+    FETCH_TIMEOUT_SEC,
+    USER_AGENT,
+)
+from src.search.query_yield import get_query_yield
+from src.utils.dates import JST, now_jst
+from src.utils.http_replay import create_async_transport
+from src.utils.logger import get_logger
+from src.utils.metrics import get_metrics
+from src.utils.pools import pooled_async, run_async
+from src.utils.urls import canonicalize_url
+
+logger = get_logger()
+
+_MAX_INDEX_DEPTH = 2  # サイトマップインデックスの入れ子の上限
+
+
+@dataclass
+class Entry:
+    url: str
+    lastmod: Optional[datetime] = None
+    title: str = ""
+
+
+def parse_datetime(text: Optional[str]) -> Optional[datetime]:
+    """W3C Datetime（サイトマップ・Atom）/ RFC 822（RSS）を解釈する。タイムゾーンの無い値はJSTとみなす"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    return dt.replace(tzinfo=JST) if dt.tzinfo is None else dt
+
+
+def _local(tag: str) -> str:
+    """名前空間を除いたタグ名"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, *names: str) -> str:
+    """直下の子要素のうち、names の順で最初に見つかったもののテキスト"""
+    for name in names:
+        for child in element:
+            if _local(child.tag) == name and child.text and child.text.strip():
+                return child.text.strip()
+    return ""
+
+
+def _descendant_text(element: ET.Element, name: str) -> str:
+    """子孫要素のうち最初の name のテキスト（news:title・image:title 用）"""
+    for child in element.iter():
+        if child is not element and _local(child.tag) == name and child.text and child.text.strip():
+            return child.text.strip()
+    return ""
+
+
+def _atom_link(entry: ET.Element) -> str:
+    for child in entry:
+        if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+            return child.get("href", "")
+    return _child_text(entry, "id")
+
+
+def parse_document(content: bytes, base_url: str = "") -> tuple[str, list[Entry]]:
+    """
+    サイトマップ・フィードを解析して (種類, エントリ) を返す。
+    種類が "index" ならエントリは子サイトマップ、"sitemap"（urlset）・"feed"（RSS/Atom）なら記事。
+    対応しない形式は ValueError。
+    """
+    if content[:2] == b"\x1f\x8b":
+        # .xml.gz のサイトマップ。展開後のサイズにも上限をかける
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        content = decompressor.decompress(content, DISCOVERY_MAX_BYTES)
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"展開後のサイズ上限超過: {DISCOVERY_MAX_BYTES}バイト超")
+    root = ET.fromstring(content)
+    kind = _local(root.tag)
+
+    entries: list[Entry] = []
+    if kind == "sitemapindex":
+        for node in root:
+            if _local(node.tag) == "sitemap":
+                loc = _child_text(node, "loc")
+                if loc:
+                    entries.append(Entry(urljoin(base_url, loc), parse_datetime(_child_text(node, "lastmod"))))
+        return "index", entries
+
+    if kind == "urlset":
+        for node in root:
+            if _local(node.tag) == "url":
+                loc = _child_text(node, "loc")
+                if loc:
+                    entries.append(Entry(
+                        urljoin(base_url, loc),
+                        parse_datetime(_child_text(node, "lastmod")),
+                        _descendant_text(node, "title"),
+                    ))
+    elif kind in ("rss", "RDF"):
+        for node in root.iter():
+            if _local(node.tag) == "item":
+                link = _child_text(node, "link", "guid")
+                if link:
+                    entries.append(Entry(
+                        urljoin(base_url, link),
+                        parse_datetime(_child_text(node, "pubDate", "date", "updated")),
+                        _child_text(node, "title"),
+                    ))
+    elif kind == "feed":
+        for node in root:
+            if _local(node.tag) == "entry":
+                link = _atom_link(node)
+                if link:
+                    entries.append(Entry(
+                        urljoin(base_url, link),
+                        parse_datetime(_child_text(node, "updated", "published")),
+                        _child_text(node, "title"),
+                    ))
+    else:
+        raise ValueError(f"未対応の形式: <{kind}>")
+    return ("sitemap" if kind == "urlset" else "feed"), entries
+
+
+def parse_robots_sitemaps(text: str, base_url: str) -> list[str]:
+    """robots.txt の Sitemap 行"""
+    sitemaps = []
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(urljoin(base_url, value.strip()))
+    return sitemaps
+
+
+class _NotModified(Exception):
+    pass
+
+
+class SourceDiscovery:
+    """
+    ソースごとの状態を DISCOVERY_STATE_FILE に保持する。
+      cursor: この日時以前の記事は返却済み / validators: {URL: {"etag", "last_modified"}}
+      seen: 返却済みの日時の無い記事 / returned: カーソルより新しい返却済みの記事 {URL: lastmod}
+      read: 記事を返し切った子サイトマップ {URL: lastmod} / backlog: 読み残した文書 [URL, 深さ, lastmod]
+      retry: 返したが処理できなかった記事 {URL: 失敗回数}
+    discover() で新着URLを集め、実行の最後に commit() で状態を保存する。
+    """
+
+    def __init__(
+        self,
+        sources: dict[str, dict] = DISCOVERY_SOURCES,
+        state_file: Path = DISCOVERY_STATE_FILE,
+        max_urls: int = DISCOVERY_MAX_URLS,
+    ) -> None:
+        self.sources = sources
+        self.state_file = state_file
+        self.max_urls = max_urls
+        self._state = self._load()
+        self._pending: dict[str, dict] = {}
+        self._handed_out: dict[str, list[str]] = {}  # ホスト → 今回返した記事URL
+
+    def _load(self) -> dict:
+        if not self.state_file.exists():
+            return {}
+        try:
+            return json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"直接収集の状態の読み込み失敗（初回扱い）: {e}")
+            return {}
+
+    def commit(self, done: Iterable[str] = ()) -> None:
+        """
+        discover() で進めたカーソル・検証子を保存する（実行の最後に呼ぶ）。
+        今回返した記事のうち done（取得・解析して通知まで済んだURL）に無いものは、次回以降も返す。
+        """
+        if not self._pending:
+            return
+        done_keys = {canonicalize_url(u) for u in done}
+        for host, state in self._pending.items():
+            previous: dict[str, int] = state["retry"]
+            retry: dict[str, int] = {}
+            for url in self._handed_out.get(host, []):
+                if canonicalize_url(url) in done_keys:
+                    continue
+                attempts = previous.get(url, 0) + 1
+                if attempts <= DISCOVERY_MAX_RETRIES:
+                    retry[url] = attempts
+                else:
+                    logger.warning(f"直接収集 [{host}]: {attempts}回処理できなかったため候補から外します: {url}")
+            state["retry"] = retry
+        self._state.update(self._pending)
+        self._pending = {}
+        self._handed_out = {}
+        tmp = self.state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._state, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.state_file)
+
+    # ── 取得 ────────────────────────────────────────────────────
+
+    async def _get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        validators: Optional[dict] = None,
+    ) -> tuple[httpx.Headers, bytes]:
+        """(レスポンスヘッダー, 本文) を返す。本文は DISCOVERY_MAX_BYTES まで読み込み、304なら _NotModified"""
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        started = time.perf_counter()
+        ok = False
+        nbytes = 0
+        try:
+            async with client.stream("GET", url, headers=headers, follow_redirects=True) as resp:
+                try:
+                    if resp.status_code == 304:
+                        ok = True
+                        raise _NotModified()
+                    resp.raise_for_status()
+                    chunks: list[bytes] = []
+                    async for chunk in resp.aiter_bytes():
+                        nbytes += len(chunk)
+                        if nbytes > DISCOVERY_MAX_BYTES:
+                            raise ValueError(f"サイズ上限超過: {DISCOVERY_MAX_BYTES}バイト超")
+                        chunks.append(chunk)
+                finally:
+                    nbytes = resp.num_bytes_downloaded
+            ok = True
+            return resp.headers, b"".join(chunks)
+        finally:
+            get_metrics().observe(
+                "discovery",
+                time.perf_counter() - started,
+                ok=ok,
+                host=urlparse(url).hostname or "",
+                nbytes=nbytes,
+            )
+
+    async def _feed_urls(self, client: httpx.AsyncClient, host: str, spec: dict) -> list[str]:
+        feeds = list(spec.get("feeds") or [])
+        if feeds or not spec.get("sitemap", True):
+            return feeds
+        base = f"https://{host}/"
+        try:
+            _, content = await self._get(client, urljoin(base, "/robots.txt"))
+            sitemaps = parse_robots_sitemaps(content.decode("utf-8", errors="replace"), base)
+        except Exception as e:
+            logger.debug(f"robots.txt 取得失敗 [{host}]: {e}")
+            sitemaps = []
+        return sitemaps or [urljoin(base, "/sitemap.xml")]
+
+    async def _discover_source(self, client: httpx.AsyncClient, host: str, spec: dict) -> list[str]:
+        state = self._state.get(host, {})
+        now = now_jst()
+        cursor = parse_datetime(state.get("cursor")) or now - timedelta(days=DISCOVERY_FIRST_RUN_DAYS)
+        validators: dict[str, dict] = dict(state.get("validators", {}))
+        seen: list[str] = list(state.get("seen", []))
+        returned: dict[str, str] = dict(state.get("returned", {}))
+        read: dict[str, str] = dict(state.get("read", {}))
+        retry: dict[str, int] = dict(state.get("retry", {}))
+
+        roots = await self._feed_urls(client, host, spec)
+        if not roots:
+            logger.debug(f"直接収集 [{host}]: 取得するフィードが無いためスキップ")
+            if retry:
+                self._pending[host] = {**state, "retry": retry}
+                self._handed_out[host] = list(retry)
+            return list(retry)
+        # 前回読み残した文書を先に読む（毎回同じ文書だけが上限で読み残されないように）
+        queue: list[tuple[str, int, Optional[str]]] = [tuple(item) for item in state.get("backlog", [])]
+        queue.extend((url, 0, None) for url in roots)
+        queued: set[str] = set()
+        queue = [item for item in queue if not (item[0] in queued or queued.add(item[0]))]
+        items: list[tuple[Entry, str, bool]] = []  # (記事, 文書URL, フィード由来か)
+        read_docs: dict[str, Optional[str]] = {}  # 今回読んだ記事の文書 → インデックス上の lastmod
+        documents = not_modified = 0
+        failed = False
+        while queue and documents < DISCOVERY_MAX_DOCUMENTS:
+            doc_url, depth, doc_lastmod = queue.pop(0)
+            if documents:
+                await asyncio.sleep(FETCH_DELAY_SEC)  # 同一ホストへの間隔は通常のフェッチと揃える
+            documents += 1
+            try:
+                headers, content = await self._get(client, doc_url, validators.get(doc_url))
+                kind, entries = parse_document(content, doc_url)
+            except _NotModified:
+                not_modified += 1
+                continue
+            except Exception as e:
+                failed = True
+                logger.warning(f"直接収集失敗 [{doc_url}]: {e}")
+                continue
+
+            if kind == "index":
+                # 更新の無い子サイトマップ・前回読み切ってから更新の無いものは読まない（lastmod の無いものは読む）
+                children = [
+                    c for c in entries
+                    if c.lastmod is None
+                    or (c.lastmod > cursor and read.get(c.url) != c.lastmod.isoformat(timespec="seconds"))
+                ]
+                children.sort(key=lambda c: c.lastmod or now, reverse=True)
+                if depth < _MAX_INDEX_DEPTH:
+                    for c in children:
+                        if c.url not in queued:
+                            queued.add(c.url)
+                            queue.append((c.url, depth + 1, c.lastmod.isoformat(timespec="seconds") if c.lastmod else None))
+                continue
+
+            items.extend((entry, doc_url, kind == "feed") for entry in entries)
+            read_docs[doc_url] = doc_lastmod
+            # インデックスは子の更新を見落とさないよう毎回読み、検証子は記事を列挙する文書だけ持つ
+            etag = headers.get("etag")
+            last_modified = headers.get("last-modified")
+            if etag or last_modified:
+                validators[doc_url] = {"etag": etag, "last_modified": last_modified}
+
+        pattern = re.compile(spec["pattern"]) if spec.get("pattern") else None
+        keywords = spec.get("keywords") or []
+        seen_set = set(seen)
+        fresh: dict[str, tuple[Entry, str]] = {}
+        for entry, doc_url, from_feed in items:
+            if (urlparse(entry.url).hostname or "") != host:
+                continue
+            if pattern and not pattern.search(entry.url):
+                continue
+            # タイトルで絞るのはフィードの記事だけ（サイトマップの <url> は通常タイトルを持たない）
+            if from_feed and keywords and not any(k in entry.title for k in keywords):
+                continue
+            if entry.lastmod is not None:
+                previous = parse_datetime(returned.get(entry.url))
+                if entry.lastmod <= cursor or (previous and entry.lastmod <= previous):
+                    continue
+            elif entry.url in seen_set:
+                continue
+            current = fresh.get(entry.url)
+            if current is None or (entry.lastmod and (current[0].lastmod is None or entry.lastmod > current[0].lastmod)):
+                fresh[entry.url] = (entry, doc_url)
+
+        # 古い順に返し、上限で残った記事は次回に回す（同じ日時の記事は分けない）
+        ordered = sorted(fresh.values(), key=lambda item: (item[0].lastmod is None, item[0].lastmod or now))
+        count = min(self.max_urls, len(ordered))
+        while 0 < count < len(ordered) and ordered[count][0].lastmod and ordered[count][0].lastmod == ordered[count - 1][0].lastmod:
+            count += 1
+        found = [entry for entry, _ in ordered[:count]]
+        leftover_docs = {doc_url for _, doc_url in ordered[count:]}
+
+        # カーソルは返した記事までしか進めない。
+        # 未読の文書が残っている・取得に失敗した場合は、中の記事の日時が分からないため進めない
+        # （その間に返した記事は returned で重複を除く）
+        returned_dates = [e.lastmod for e in found if e.lastmod]
+        newest = cursor
+        if not (queue or failed):
+            dated_left = any(entry.lastmod for entry, _ in ordered[count:])
+            newest = returned_dates[-1] if dated_left else max(returned_dates, default=cursor)
+            newest = max(cursor, min(newest, now))  # 未来日付の lastmod でカーソルを進めすぎない
+
+        for entry in found:
+            if entry.lastmod is None:
+                seen.append(entry.url)
+            else:
+                returned[entry.url] = entry.lastmod.isoformat(timespec="seconds")
+        returned = {url: ts for url, ts in returned.items() if parse_datetime(ts) > newest}
+        for doc_url, doc_lastmod in read_docs.items():
+            if doc_url in leftover_docs:
+                # 残した記事を次回も読めるよう、検証子・読み切りの記録を残さない
+                validators.pop(doc_url, None)
+                read.pop(doc_url, None)
+            elif doc_lastmod:
+                read[doc_url] = doc_lastmod
+        read = {url: ts for url, ts in read.items() if parse_datetime(ts) > newest}
+
+        self._pending[host] = {
+            "cursor": newest.isoformat(timespec="seconds"),
+            "validators": validators,
+            "seen": seen[-DISCOVERY_SEEN_MAX:],
+            "returned": returned,
+            "read": read,
+            "backlog": [list(item) for item in queue],
+            "retry": retry,
+            "updated_at": now.isoformat(timespec="seconds"),
+        }
+        # 前回処理できなかった記事を先に返す
+        urls = list(retry) + [entry.url for entry in found if entry.url not in retry]
+        self._handed_out[host] = urls
+        notes = []
+        if retry:
+            notes.append(f"再試行{len(retry)}件")
+        if len(ordered) > count:
+            notes.append(f"上限超過の{len(ordered) - count}件は次回")
+        if queue:
+            notes.append(f"未読の文書{len(queue)}件は次回")
+        if failed:
+            notes.append("失敗ありのためカーソル据え置き")
+        logger.info(
+            f"直接収集 [{host}]: 新着{len(found)}件"
+            f"（{cursor:%Y-%m-%d %H:%M}以降 / 取得{documents}件・未更新{not_modified}件"
+            f"{''.join(f' / {n}' for n in notes)}）"
+        )
+        return urls
+
+    async def discover_async(self) -> list[str]:
+        """各ソースの再試行・新着記事URLを、ソース順で返す（1ソースの失敗で他を止めない）"""
+        if not self.sources:
+            return []
+        started = time.perf_counter()
+        async with pooled_async("discovery", _create_client) as client:
+            results = await asyncio.gather(
+                *(self._discover_source(client, host, spec) for host, spec in self.sources.items()),
+                return_exceptions=True,
+            )
+
+        tracker = get_query_yield()
+        urls: list[str] = []
+        for host, result in zip(self.sources, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"直接収集失敗 [{host}]: {result}")
+                continue
+            found = [url for url in result if url not in urls]
+            urls.extend(found)
+            if tracker:
+                # 検索クエリと並べて収量を比べられるよう、ソースごとに擬似クエリとして記録する
+                tracker.record_search(f"sitemap:{host}", found, cached=False)
+
+        logger.info(f"直接収集完了: {len(urls)}件（{len(self.sources)}ソース / {time.perf_counter() - started:.2f}秒）")
+        return urls
+
+    def discover(self) -> list[str]:
+        """同期版ラッパー（main.pyから呼び出しやすいよう提供）"""
+        return run_async(self.discover_async())
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=httpx.Timeout(FETCH_TIMEOUT_SEC),
+        transport=create_async_transport(),
+    )
@@ -1,10 +1,16 @@
 """
 OpenRouter API を使った検索
-15クエリ実行、優先ソース(eiicon/peatix/creww)URLを先頭に配置、最大35件返却
+15クエリを httpx.AsyncClient で並行実行（同時実行数=SEARCH_CONCURRENCY）
+優先ソース(eiicon/peatix/creww)URLを先頭に配置、最大35件返却
 コスト最適化: max_tokens=800, temperature=0.1
+結果が日々ほぼ変わらない固定クエリは検索結果キャッシュ（search/cache.py）で数日に1回だけ検索する
 """
+import asyncio
 import json
 import re
+import time
+from collections import Counter
+from typing import Optional, Sequence
 from urllib.parse import urlparse
 
 import httpx
@@ -15,17 +21,28 @@ from src.config import (
     OPENROUTER_BASE_URL,
     OPENROUTER_MODEL_SEARCH,
     PRIORITY_SOURCES,
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CONCURRENCY,
     SEARCH_MAX_TOKENS,
+    SEARCH_TIMEOUT_SEC,
 )
+from src.llm.usage import get_ledger
+from src.profiles import Profile
+from src.search.cache import SearchCache
+from src.search.query_yield import get_query_yield, plan_queries
 from src.utils.dates import today_jst
+from src.utils.http_replay import create_async_transport
 from src.utils.logger import get_logger
+from src.utils.metrics import get_metrics
+from src.utils.pools import pooled_async, run_async
 
 logger = get_logger()
 
 
-def _build_search_queries() -> list[str]:
+def _build_search_queries(profiles: Sequence[Profile] = ()) -> list[str]:
+    """共通クエリに各プロファイルの追加クエリを重複なく加える（検索は全プロファイルで1回）"""
     year = today_jst().year
-    return [
+    queries = [
         # アクセラレーター系
         f"リバース型アクセラレーター 日本 {year} 応募受付中",
         f"コーポレートアクセラレーター 日本 {year} 応募 締切",
@@ -47,6 +64,9 @@ def _build_search_queries() -> list[str]:
         "site:auba.eiicon.net 建設 DX 共同開発 協業",
         "site:growth.creww.me アクセラ 共創 参加企業 募集",
     ]
+    for profile in profiles:
+        queries.extend(q for q in profile.search_queries(year) if q not in queries)
+    return queries
 
 
 def _build_system_prompt() -> str:
@@ -84,62 +104,169 @@ def _is_priority(url: str) -> bool:
     return any(src in host for src in PRIORITY_SOURCES)
 
 
-def fetch_candidate_urls() -> list[str]:
-    """
-    15クエリを実行してURLを収集し、優先ソースを先頭に配置して最大35件返す。
-    """
-    all_urls: list[str] = []
-    seen: set[str] = set()
-
-    headers = {
+def _build_headers() -> dict[str, str]:
+    return {
         "Authorization": f"Bearer {OPENROUTER_API_KEY}",
         "Content-Type": "application/json",
         "HTTP-Referer": "https://github.com/reverse-accel-collector",
         "X-Title": "Reverse Accel Collector",
     }
 
-    queries = _build_search_queries()
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers=_build_headers(),
+        timeout=SEARCH_TIMEOUT_SEC,
+        transport=create_async_transport(),
+    )
+
+
+async def _search_one(
+    client: httpx.AsyncClient,
+    index: int,
+    total: int,
+    query: str,
+    system_prompt: str,
+    semaphore: asyncio.Semaphore,
+) -> Optional[list[str]]:
+    """
+    1クエリを実行して抽出したURLリストを返す。
+    失敗・予算上限でスキップした場合は None を返し（キャッシュしない）、他のクエリを止めない。
+    """
+    async with semaphore:
+        ledger = get_ledger()
+        if ledger and ledger.exhausted():
+            logger.warning(f"検索クエリ {index+1}/{total}: 本日のAPI予算上限のためスキップ")
+            return None
+        logger.info(f"検索クエリ {index+1}/{total}: {query[:50]}...")
+        started = time.perf_counter()
+        try:
+            resp = await client.post(
+                f"{OPENROUTER_BASE_URL}/chat/completions",
+                json={
+                    "model": OPENROUTER_MODEL_SEARCH,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": query},
+                    ],
+                    "max_tokens": SEARCH_MAX_TOKENS,
+                    "temperature": 0.1,
+                    "usage": {"include": True},
+                },
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            if ledger:
+                ledger.record("search", OPENROUTER_MODEL_SEARCH, data.get("usage"))
+            content = (
+                data
+                .get("choices", [{}])[0]
+                .get("message", {})
+                .get("content", "")
+            )
+            urls = _extract_urls_from_text(content)
+            elapsed = time.perf_counter() - started
+            get_metrics().observe("search", elapsed)
+            logger.debug(f"  → クエリ{index+1}: {len(urls)}件取得（{elapsed:.2f}秒）")
+            return urls
+
+        except Exception as exc:
+            elapsed = time.perf_counter() - started
+            get_metrics().observe("search", elapsed, ok=False)
+            logger.warning(f"検索クエリ失敗 [{query[:30]}] ({elapsed:.2f}秒): {exc}")
+            return None
+
+
+async def fetch_candidate_urls_async(
+    profiles: Sequence[Profile] = (),
+    use_cache: bool = SEARCH_CACHE_ENABLED,
+) -> tuple[list[str], int]:
+    """
+    15クエリ（＋プロファイルの追加クエリ）を並行実行してURLを収集し、優先ソースを先頭に配置して最大MAX_URLS件返す。
+    戻り値は (URLリスト, 失敗・予算上限でスキップしたクエリ数)。収量による見送りは失敗に数えない。
+    同時実行数は SEARCH_CONCURRENCY で制限する。
+    use_cache が真の場合、再検索間隔（SEARCH_CACHE_TTL_DAYS）内のクエリは前回の結果を使い、API を呼ばない。
+    結果のマージはクエリ順で行うため、完了順・キャッシュの有無に関わらず出力順は安定する。
+    """
+    queries = _build_search_queries(profiles)
     system_prompt = _build_system_prompt()
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    cache = SearchCache(OPENROUTER_MODEL_SEARCH, queries) if use_cache else None
+
+    results: list[Optional[list[str]]] = [None] * len(queries)
+    pending: list[int] = []
+    for i, query in enumerate(queries):
+        cached = cache.get(query) if cache else None
+        if cached is None:
+            pending.append(i)
+            continue
+        results[i], age = cached
+        logger.info(
+            f"検索クエリ {i+1}/{len(queries)}: キャッシュ使用"
+            f"（{age.days}日前・{len(results[i])}件）: {query[:50]}"
+        )
+
+    # 収量の記録があれば、API検索するクエリを予算内に絞る（キャッシュ使用分は予算に数えない）
+    tracker = get_query_yield()
+    if tracker and pending:
+        planned, reasons = plan_queries([queries[i] for i in pending], tracker.store.scores())
+        if len(planned) < len(pending):
+            for j, i in enumerate(pending):
+                if j not in reasons:
+                    logger.info(f"検索クエリ {i+1}/{len(queries)}: 収量が低いため今回は見送り: {queries[i][:50]}")
+            kinds = Counter(r.split("（")[0] for r in reasons.values())
+            logger.info(
+                f"クエリ選択: {len(pending)}件中{len(planned)}件を検索"
+                f"（{' / '.join(f'{k}{n}件' for k, n in kinds.items())}）"
+            )
+            pending = [pending[j] for j in planned]
+
+    started = time.perf_counter()
+    if pending:
+        async with pooled_async("search", _create_client) as client:
+            tasks = [
+                _search_one(client, i, len(queries), queries[i], system_prompt, semaphore)
+                for i in pending
+            ]
+            fetched = await asyncio.gather(*tasks)
+        for i, urls in zip(pending, fetched):
+            results[i] = urls
+            if cache and urls is not None:
+                cache.put(queries[i], urls)
+    elapsed = time.perf_counter() - started
 
-    with httpx.Client(timeout=60) as client:
+    if tracker:
         for i, query in enumerate(queries):
-            logger.info(f"検索クエリ {i+1}/{len(queries)}: {query[:50]}...")
-            try:
-                resp = client.post(
-                    f"{OPENROUTER_BASE_URL}/chat/completions",
-                    headers=headers,
-                    json={
-                        "model": OPENROUTER_MODEL_SEARCH,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": query},
-                        ],
-                        "max_tokens": SEARCH_MAX_TOKENS,
-                        "temperature": 0.1,
-                    },
-                )
-                resp.raise_for_status()
-                content = (
-                    resp.json()
-                    .get("choices", [{}])[0]
-                    .get("message", {})
-                    .get("content", "")
-                )
-                urls = _extract_urls_from_text(content)
-                new_urls = [u for u in urls if u not in seen]
-                seen.update(new_urls)
-                all_urls.extend(new_urls)
-                logger.debug(f"  → {len(new_urls)}件取得（累計{len(all_urls)}件）")
-
-            except Exception as exc:
-                logger.warning(f"検索クエリ失敗 [{query[:30]}]: {exc}")
+            if results[i] is not None:
+                tracker.record_search(query, results[i], cached=i not in pending)
+
+    cached_count = sum(1 for i, urls in enumerate(results) if urls is not None and i not in pending)
+    if cache:
+        cache.save()
+        get_metrics().incr("search_cache_hits", cached_count)
+
+    # クエリ順に重複を除いてマージ
+    all_urls: list[str] = []
+    seen: set[str] = set()
+    for urls in results:
+        new_urls = [u for u in urls or [] if u not in seen]
+        seen.update(new_urls)
+        all_urls.extend(new_urls)
 
     # 優先ソースを先頭へ
     priority = [u for u in all_urls if _is_priority(u)]
     others = [u for u in all_urls if not _is_priority(u)]
     result = (priority + others)[:MAX_URLS]
+    failed_count = sum(1 for i in pending if results[i] is None)
 
     logger.info(
         f"URL収集完了: 優先{len(priority)}件 + その他{len(others)}件 → {len(result)}件"
+        f"（{len(queries)}クエリ うちキャッシュ{cached_count}件"
+        f"{f' / 失敗{failed_count}件' if failed_count else ''} / {elapsed:.2f}秒）"
     )
-    return result
+    return result, failed_count
+
+
+def fetch_candidate_urls(profiles: Sequence[Profile] = ()) -> tuple[list[str], int]:
+    """同期版ラッパー（main.pyから呼び出しやすいよう提供）"""
+    return run_async(fetch_candidate_urls_async(profiles))
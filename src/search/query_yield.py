@@ -0,0 +1,244 @@
+"""
+検索クエリごとの収量記録と、収量に基づくクエリの選択
+実行ごと・クエリごとに次の件数を QUERY_YIELD_DB（SQLite）へ記録する。
+  - urls      : クエリが返したURL数
+  - new_urls  : そのうち送信済みでなく取得対象になったURL数
+  - passed    : そのうち重複排除・期限/鮮度フィルタを通過したページ数
+  - sent      : そのうちメールで送信したレコード数
+同じURLを複数のクエリが返した場合は、それぞれのクエリに数える。
+検索キャッシュから返した実行も cached=1 として記録するが、前回と同じURLを数え直すため
+スコア・回数・最終検索日の集計（scores()）には含めない。
+
+plan_queries() は直近 SEARCH_YIELD_WINDOW_DAYS 日の収量スコアで、API検索するクエリを
+SEARCH_QUERY_BUDGET 件に絞る。次のクエリは予算の外で必ず検索する。
+  - 記録が SEARCH_MIN_OBSERVATIONS 回未満のクエリ（新規クエリの立ち上げ）
+  - SEARCH_MAX_SKIP_DAYS 日以上検索していないクエリ（取りこぼし防止）
+残りの予算のうち SEARCH_EXPLORE_SLOTS 件は、スコア上位以外から最後の検索が古いものほど選ばれやすい抽選で選ぶ。
+"""
+import random
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.config import (
+    QUERY_YIELD_DB,
+    SEARCH_EXPLORE_SLOTS,
+    SEARCH_MAX_SKIP_DAYS,
+    SEARCH_MIN_OBSERVATIONS,
+    SEARCH_QUERY_BUDGET,
+    SEARCH_YIELD_WINDOW_DAYS,
+)
+from src.utils.dates import now_jst, today_jst
+from src.utils.logger import get_logger
+from src.utils.urls import canonicalize_url
+
+logger = get_logger()
+
+# 収量スコアの重み（新規URL / フィルタ通過 / 送信）。送信に至ったURLを最も重く見る
+_WEIGHT_NEW = 0.1
+_WEIGHT_PASSED = 0.3
+_WEIGHT_SENT = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_yield (
+    run_id   TEXT NOT NULL,
+    day      TEXT NOT NULL,
+    query    TEXT NOT NULL,
+    cached   INTEGER NOT NULL,
+    urls     INTEGER NOT NULL,
+    new_urls INTEGER NOT NULL,
+    passed   INTEGER NOT NULL,
+    sent     INTEGER NOT NULL,
+    PRIMARY KEY (run_id, query)
+);
+CREATE INDEX IF NOT EXISTS query_yield_day ON query_yield (day);
+"""
+
+
+@dataclass
+class QueryScore:
+    query: str
+    runs: int
+    urls: int
+    new_urls: int
+    passed: int
+    sent: int
+    last_day: date
+
+    @property
+    def score(self) -> float:
+        """1回あたりの重み付き収量"""
+        total = self.new_urls * _WEIGHT_NEW + self.passed * _WEIGHT_PASSED + self.sent * _WEIGHT_SENT
+        return total / self.runs if self.runs else 0.0
+
+
+class QueryYieldStore:
+    def __init__(self, db_path: Path = QUERY_YIELD_DB) -> None:
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "QueryYieldStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def save_run(self, run_id: str, day: str, rows: list[tuple]) -> None:
+        """rows: (query, cached, urls, new_urls, passed, sent) のリスト"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO query_yield"
+                " (run_id, day, query, cached, urls, new_urls, passed, sent)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, day, *row) for row in rows],
+            )
+
+    def scores(self, window_days: int = SEARCH_YIELD_WINDOW_DAYS) -> dict[str, QueryScore]:
+        """直近 window_days 日のクエリごとの集計（APIで検索した実行のみ）"""
+        since = (today_jst() - timedelta(days=window_days)).isoformat()
+        rows = self._conn.execute(
+            "SELECT query, COUNT(*), SUM(urls), SUM(new_urls), SUM(passed), SUM(sent), MAX(day)"
+            " FROM query_yield WHERE day >= ? AND cached = 0 GROUP BY query",
+            (since,),
+        ).fetchall()
+        return {
+            query: QueryScore(query, runs, urls, new_urls, passed, sent, date.fromisoformat(last_day))
+            for query, runs, urls, new_urls, passed, sent, last_day in rows
+        }
+
+
+class QueryYieldTracker:
+    """
+    1回の実行ぶんの URL → クエリ の対応と各段階の通過URLを保持し、save() で記録する。
+    main() の各ステップから mark_*() を呼ぶ（複数プロファイルの場合はいずれかで通過・送信したURLを数える）。
+    """
+
+    def __init__(self, store: QueryYieldStore) -> None:
+        self.store = store
+        self.run_id = now_jst().strftime("%Y%m%d-%H%M%S")
+        self._lock = threading.Lock()
+        self._searched: dict[str, tuple[bool, set[str]]] = {}  # query -> (キャッシュ使用, URL集合)
+        self._new: set[str] = set()
+        self._passed: set[str] = set()
+        self._sent: set[str] = set()
+
+    def record_search(self, query: str, urls: Iterable[str], cached: bool) -> None:
+        with self._lock:
+            self._searched[query] = (cached, {canonicalize_url(u) for u in urls})
+
+    def _mark(self, target: set[str], urls: Iterable[str]) -> None:
+        with self._lock:
+            target.update(canonicalize_url(u) for u in urls)
+
+    def mark_new(self, urls: Iterable[str]) -> None:
+        self._mark(self._new, urls)
+
+    def mark_passed(self, urls: Iterable[str]) -> None:
+        self._mark(self._passed, urls)
+
+    def mark_sent(self, urls: Iterable[str]) -> None:
+        self._mark(self._sent, urls)
+
+    def rows(self) -> list[tuple]:
+        with self._lock:
+            return [
+                (
+                    query, int(cached), len(urls), len(urls & self._new),
+                    len(urls & self._passed), len(urls & self._sent),
+                )
+                for query, (cached, urls) in self._searched.items()
+            ]
+
+    def save(self) -> None:
+        """この実行の収量を保存する（検索を行わなかった再開実行では何もしない）"""
+        rows = self.rows()
+        if rows:
+            self.store.save_run(self.run_id, today_jst().isoformat(), rows)
+            productive = sum(1 for row in rows if row[5])
+            logger.info(f"クエリ収量を記録: {len(rows)}クエリ（送信につながったクエリ{productive}件）")
+
+
+def plan_queries(
+    queries: list[str],
+    scores: dict[str, QueryScore],
+    budget: int = SEARCH_QUERY_BUDGET,
+    explore_slots: int = SEARCH_EXPLORE_SLOTS,
+    min_observations: int = SEARCH_MIN_OBSERVATIONS,
+    max_skip_days: int = SEARCH_MAX_SKIP_DAYS,
+    rng: Optional[random.Random] = None,
+) -> tuple[list[int], dict[int, str]]:
+    """
+    API検索するクエリを選ぶ。
+
+    Returns:
+        (選んだクエリのインデックス（入力順）, {選んだインデックス: 選択理由})
+    """
+    if budget <= 0 or len(queries) <= budget:
+        return list(range(len(queries))), {}
+
+    today = today_jst()
+    rng = rng or random.Random(today.isoformat())  # 同じ日の再実行・再生では同じ選択になるよう日付で固定
+    reasons: dict[int, str] = {}
+    candidates: list[int] = []
+    for i, query in enumerate(queries):
+        stat = scores.get(query)
+        if stat is None or stat.runs < min_observations:
+            reasons[i] = "立ち上げ"
+        elif (today - stat.last_day).days >= max_skip_days:
+            reasons[i] = f"{(today - stat.last_day).days}日未検索"
+        else:
+            candidates.append(i)
+
+    remaining = max(0, budget - len(reasons))
+    exploit = max(0, remaining - explore_slots)
+    ranked = sorted(candidates, key=lambda i: (-scores[queries[i]].score, scores[queries[i]].last_day))
+    for i in ranked[:exploit]:
+        reasons[i] = f"収量上位（スコア{scores[queries[i]].score:.2f}）"
+
+    # 探索: 最後の検索から日が経っているものほど選ばれやすくする
+    rest = ranked[exploit:]
+    for _ in range(min(remaining - exploit, len(rest))):
+        weights = [(today - scores[queries[i]].last_day).days + 1 for i in rest]
+        i = rng.choices(rest, weights=weights)[0]
+        rest.remove(i)
+        reasons[i] = f"探索（スコア{scores[queries[i]].score:.2f}）"
+
+    return sorted(reasons), reasons
+
+
+_tracker: Optional[QueryYieldTracker] = None
+
+
+def start_query_yield() -> QueryYieldTracker:
+    """この実行のクエリ収量の記録を開始する（main() の先頭で呼ぶ）"""
+    global _tracker
+    if _tracker is not None:
+        _tracker.store.close()
+    _tracker = QueryYieldTracker(QueryYieldStore())
+    return _tracker
+
+
+def finish_query_yield() -> None:
+    """この実行の収量を保存して記録を終える（main() の終了時に呼ぶ）"""
+    global _tracker
+    if _tracker is None:
+        return
+    try:
+        _tracker.save()
+    finally:
+        _tracker.store.close()
+        _tracker = None
+
+
+def get_query_yield() -> Optional[QueryYieldTracker]:
+    """実行中のクエリ収量の記録を返す（start_query_yield() 前は None で、記録・クエリの絞り込みを行わない）"""
+    return _tracker
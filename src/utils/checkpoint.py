@@ -0,0 +1,175 @@
+"""
+実行チェックポイント（中断からの再開用）
+CHECKPOINT_DIR/YYYY-MM-DD/ に実行日ごとの各ステップ出力を保存する。
+  - candidates.json   : Step 1 の候補URL
+  - pages.json        : Step 3-4 の取得結果（取得・解析したURL、ParsedPage、取得エラー）
+  - llm_records.jsonl : Step 6 の評価結果（バッチ完了ごとに追記。URLをキーに同日中は再課金しない）
+                        既定以外のプロファイルは llm_records-<name>.jsonl
+  - state.json        : 完了したステップと完了日時（通知はプロファイルごとに notify:<name>）
+再開モードでは完了済みステップを読み込んでスキップする。
+"""
+import dataclasses
+import json
+import shutil
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.config import CHECKPOINT_DIR, CHECKPOINT_KEEP_DAYS
+from src.crawl.parse import ParsedPage
+from src.profiles import DEFAULT_PROFILE_NAME
+from src.utils.dates import now_jst, today_jst
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+_DATE_FIELDS = ("published_date", "updated_date", "deadline_date")
+
+
+def _page_to_dict(page: ParsedPage) -> dict:
+    data = dataclasses.asdict(page)
+    for name in _DATE_FIELDS:
+        if data[name] is not None:
+            data[name] = data[name].isoformat()
+    return data
+
+
+def _page_from_dict(data: dict) -> ParsedPage:
+    data = dict(data)
+    for name in _DATE_FIELDS:
+        if data.get(name):
+            data[name] = date.fromisoformat(data[name])
+    return ParsedPage(**data)
+
+
+def _write_json(path: Path, data: object) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+class RunCheckpoint:
+    def __init__(self, day: Optional[date] = None, root: Path = CHECKPOINT_DIR) -> None:
+        self.day = day or today_jst()
+        self.dir = root / self.day.isoformat()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._state = self._read("state.json") or {"stages": {}}
+        self._llm_records: dict[str, dict[str, dict]] = {}  # {プロファイル名: {URL: レコード}}
+
+    def _read(self, name: str) -> Optional[dict]:
+        path = self.dir / name
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"チェックポイント読み込み失敗 [{name}]: {e}")
+            return None
+
+    # ── ステップ完了の管理 ─────────────────────────────────────────
+
+    def done(self, stage: str) -> bool:
+        return stage in self._state["stages"]
+
+    def mark_done(self, stage: str) -> None:
+        with self._lock:
+            self._state["stages"][stage] = now_jst().isoformat()
+            _write_json(self.dir / "state.json", self._state)
+
+    # ── 各ステップの出力 ──────────────────────────────────────────
+
+    def save_candidates(self, urls: list[str]) -> None:
+        _write_json(self.dir / "candidates.json", {"urls": urls})
+        self.mark_done("search")
+
+    def load_candidates(self) -> Optional[list[str]]:
+        data = self._read("candidates.json") if self.done("search") else None
+        return data["urls"] if data else None
+
+    def save_pages(self, fetched_urls: list[str], pages: list[ParsedPage], errors: list[str]) -> None:
+        _write_json(
+            self.dir / "pages.json",
+            {
+                "fetched_urls": fetched_urls,
+                "pages": [_page_to_dict(p) for p in pages],
+                "errors": errors,
+            },
+        )
+        self.mark_done("fetch_parse")
+
+    def load_pages(self) -> Optional[tuple[list[str], list[ParsedPage], list[str]]]:
+        data = self._read("pages.json") if self.done("fetch_parse") else None
+        if data is None:
+            return None
+        pages = [_page_from_dict(p) for p in data["pages"]]
+        return data["fetched_urls"], pages, data["errors"]
+
+    def _llm_file(self, profile: str) -> Path:
+        if profile == DEFAULT_PROFILE_NAME:
+            return self.dir / "llm_records.jsonl"
+        return self.dir / f"llm_records-{profile}.jsonl"
+
+    def llm_records(self, profile: str = DEFAULT_PROFILE_NAME) -> dict[str, dict]:
+        """同日中に profile の視点で評価済みの {URL: レコード} を返す"""
+        with self._lock:
+            if profile not in self._llm_records:
+                records: dict[str, dict] = {}
+                path = self._llm_file(profile)
+                if path.exists():
+                    for line in path.read_text(encoding="utf-8").splitlines():
+                        try:
+                            item = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # 書き込み途中で中断した最終行
+                        records[item["url"]] = item["record"]
+                self._llm_records[profile] = records
+            return dict(self._llm_records[profile])
+
+    def add_llm_records(
+        self, items: Iterable[tuple[str, dict]], profile: str = DEFAULT_PROFILE_NAME
+    ) -> None:
+        """評価結果を追記する（format_pages のスレッドから呼ばれる）"""
+        items = list(items)
+        lines = [
+            json.dumps({"url": url, "record": record}, ensure_ascii=False)
+            for url, record in items
+        ]
+        if not lines:
+            return
+        self.llm_records(profile)  # 既存分を読み込んでから追記する
+        with self._lock:
+            with open(self._llm_file(profile), "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            for url, record in items:
+                self._llm_records[profile][url] = record
+
+
+def completed_at(stage: str, day: date, root: Path = CHECKPOINT_DIR) -> Optional[datetime]:
+    """day の実行で stage が完了した日時（未完了・チェックポイント無しなら None）。ディレクトリは作らない"""
+    path = root / day.isoformat() / "state.json"
+    if not path.exists():
+        return None
+    try:
+        done = json.loads(path.read_text(encoding="utf-8"))["stages"].get(stage)
+        return datetime.fromisoformat(done) if done else None
+    except (OSError, json.JSONDecodeError, KeyError, ValueError):
+        return None
+
+
+def prune_checkpoints(root: Path = CHECKPOINT_DIR, keep_days: int = CHECKPOINT_KEEP_DAYS) -> int:
+    """keep_days より古い実行日のチェックポイントを削除し、削除件数を返す"""
+    if not root.exists():
+        return 0
+    cutoff = today_jst() - timedelta(days=keep_days)
+    removed = 0
+    for path in root.iterdir():
+        try:
+            day = date.fromisoformat(path.name)
+        except ValueError:
+            continue
+        if day < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
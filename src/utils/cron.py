@@ -0,0 +1,94 @@
+"""
+cron形式（分 時 日 月 曜日）の実行予定（JST）
+各フィールドは * / 数値 / 範囲 a-b / リスト a,b / 間隔 */n・a-b/n に対応する。
+曜日は 0（日）〜6（土）、7 も日曜日として扱う。
+日と曜日の両方を指定した場合は cron と同じくどちらかに一致すれば実行する。
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+_FIELDS = (
+    ("分", 0, 59),
+    ("時", 0, 23),
+    ("日", 1, 31),
+    ("月", 1, 12),
+    ("曜日", 0, 7),
+)
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> set[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        body, _, step_text = part.partition("/")
+        try:
+            step = int(step_text) if step_text else 1
+            if body == "*":
+                start, end = low, high
+            elif "-" in body:
+                start_text, end_text = body.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(body)
+                end = high if step_text else start
+        except ValueError:
+            raise ValueError(f"cron の{name}フィールドが不正です: {text!r}") from None
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"cron の{name}フィールドが範囲外です: {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    def __init__(self, expr: str) -> None:
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 形式は「分 時 日 月 曜日」の5項目です: {expr!r}")
+        self.expr = expr
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)
+        )
+        self.minutes = sorted(minutes)
+        self.hours = sorted(hours)
+        self.days = days
+        self.months = months
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        if dt.month not in self.months:
+            return False
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays  # Python は月曜=0、cron は日曜=0
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, dt: datetime, max_days: int = 366 * 5) -> Optional[datetime]:
+        """dt より後の最初の実行予定（秒以下は切り捨て）。max_days 以内に無ければ None"""
+        start = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(max_days):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        return None
+
+    def last_at_or_before(self, dt: datetime, window: timedelta) -> Optional[datetime]:
+        """dt 以前 window 以内で最も新しい実行予定。無ければ None"""
+        end = dt.replace(second=0, microsecond=0)
+        earliest = dt - window
+        day = end.replace(hour=0, minute=0)
+        while day + timedelta(days=1) > earliest:
+            if self._day_matches(day):
+                for hour in reversed(self.hours):
+                    for minute in reversed(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if earliest <= candidate <= end:
+                            return candidate
+            day -= timedelta(days=1)
+        return None
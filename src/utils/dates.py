@@ -2,8 +2,9 @@
 JST日付処理ユーティリティ
 """
 import re
+from dataclasses import dataclass
 from datetime import datetime, date, timedelta, timezone
-from typing import Optional
+from typing import Iterator, Optional
 
 JST = timezone(timedelta(hours=9), name="JST")
 
@@ -81,6 +82,146 @@ def parse_japanese_date(
     return None
 
 
+# ── 本文中の日付スキャナ ───────────────────────────────────────────
+# ラベルと日付（範囲を含む）を1本の正規表現にまとめ、本文を1回走査するだけで全件を拾う
+
+LABEL_DEADLINE = "締切"
+LABEL_PERIOD = "募集期間"
+LABEL_EVENT = "開催日"
+LABEL_PUBLISHED = "掲載日"
+
+_LABEL_WORDS = {
+    LABEL_DEADLINE: r"(?:応募|申込|申し込み|エントリー)?(?:締め?切り?|〆切)|期限|[Dd]eadline|DEADLINE",
+    LABEL_PERIOD: r"(?:募集|応募|受付|エントリー)期間",
+    LABEL_EVENT: r"開催(?:日時?|期間)|イベント日",
+    LABEL_PUBLISHED: r"掲載日|公開日|投稿日",
+}
+_LABEL_GROUPS = {f"l{i}": label for i, label in enumerate(_LABEL_WORDS)}
+_LABEL_PATTERN = "|".join(
+    f"(?P<{group}>{_LABEL_WORDS[label]})" for group, label in _LABEL_GROUPS.items()
+)
+
+
+def _date_pattern(p: str) -> str:
+    """年あり（西暦・令和）/ 年なし（M月D日・M/D）の日付パターン。p はグループ名の接頭辞"""
+    return (
+        rf"(?<!\d)(?:"
+        rf"(?:令和\s*(?P<{p}era>\d{{1,2}}|元)\s*年|(?P<{p}y>\d{{4}})\s*[年/\-.])"
+        rf"\s*(?P<{p}m>\d{{1,2}})\s*[月/\-.]\s*(?P<{p}d>\d{{1,2}})(?!\d)\s*日?"
+        rf"|(?P<{p}sm>\d{{1,2}})\s*(?:月\s*(?P<{p}sd>\d{{1,2}})\s*日|/(?P<{p}sd2>\d{{1,2}})(?!\d))"
+        rf")"
+    )
+
+
+# 日付の後ろの曜日・時刻（例: "（月）23:59"）は範囲の区切り判定の前に読み飛ばす
+_DATE_SUFFIX = r"(?:\s*[（(][月火水木金土日祝・]{1,3}[）)])?(?:\s*\d{1,2}:\d{2})?"
+_RANGE_SEP = r"\s*[〜~～\-–—]\s*"
+
+# ラベルの直後この文字数以内に現れた最初の日付をそのラベルの日付とみなす
+_LABEL_WINDOW = 30
+
+
+@dataclass
+class DateMention:
+    label: str             # LABEL_* のいずれか。ラベルなしは空文字列
+    start: date
+    end: Optional[date]    # 範囲（X〜Y）の場合の終了日
+    text: str              # 日付部分の原文
+    pos: int               # 本文中の開始位置
+
+    @property
+    def last(self) -> date:
+        """範囲なら終了日、単日ならその日"""
+        return self.end or self.start
+
+
+def _resolve_date(
+    m: re.Match,
+    p: str,
+    reference_year: int,
+    base: Optional[date] = None,
+) -> Optional[date]:
+    """
+    _date_pattern のマッチを date に変換する。
+    年省略時は base（範囲の開始日）の年、なければ reference_year を使う。
+    """
+    try:
+        if m.group(f"{p}era"):
+            era = m.group(f"{p}era")
+            year = 2018 + (1 if era == "元" else int(era))
+            return date(year, int(m.group(f"{p}m")), int(m.group(f"{p}d")))
+        if m.group(f"{p}y"):
+            return date(int(m.group(f"{p}y")), int(m.group(f"{p}m")), int(m.group(f"{p}d")))
+        month = int(m.group(f"{p}sm"))
+        day = int(m.group(f"{p}sd") or m.group(f"{p}sd2"))
+        if base is not None:
+            d = date(base.year, month, day)
+            # 年をまたぐ範囲（12月〜1月）
+            return d if d >= base else date(base.year + 1, month, day)
+        return date(reference_year, month, day)
+    except (TypeError, ValueError):
+        return None
+
+
+# 締め切りの推定用: ラベルだけ・日付だけの正規表現（ラベルの直後だけを日付として調べる）
+# ラベルの先読みで、ラベルの先頭になり得ない文字の位置では分岐を試さずに進める
+_LABEL_ONLY_RE = re.compile(rf"(?=[締〆期募応申エ受開イ掲公投Dd])(?:{_LABEL_PATTERN})")
+_DATE_ONLY_RE = re.compile(
+    rf"(?P<date>{_date_pattern('a')}{_DATE_SUFFIX}(?:{_RANGE_SEP}{_date_pattern('b')}{_DATE_SUFFIX})?)"
+)
+# ラベルの範囲外でも、この文字数以内の最初の日付は直前のラベルの日付の候補（フォールバック）にする
+HINT_WINDOW = 80
+
+
+def iter_label_dates(
+    text: Optional[str],
+    reference_year: Optional[int] = None,
+    labels: Optional[tuple[str, ...]] = None,
+) -> Iterator[tuple[DateMention, bool]]:
+    """
+    本文のラベルを先頭から順に探し、それぞれの直後の最初の日付を (DateMention, ラベル範囲内か) で返す。
+    labels を指定した場合はそのラベルの日付だけを解釈する（他のラベルは範囲の区切りとしてのみ使う）。
+    ラベル範囲内（_LABEL_WINDOW 文字以内）の日付は True、HINT_WINDOW 文字以内の日付は False 付きで返す。
+    次のラベルより後ろの日付は対象外。
+    対応フォーマット: parse_japanese_date と同じもの + 令和N年M月D日 + 2026.10.5
+    X〜Y 形式の範囲は1件の DateMention（start/end）として返す。年省略の日付は reference_year（省略時は今年）で解釈する。
+    日付はラベルの後ろだけを調べるため、日付の多い本文でも全日付は解釈しない。
+    必要な日付が見つかった時点で打ち切れるよう、ジェネレータで返す。
+    """
+    if not text:
+        return
+    # ラベルの探索も遅延させ、次のラベルの位置（日付を探す範囲の終わり）だけを先読みする
+    matches = _LABEL_ONLY_RE.finditer(text)
+    label_match = next(matches, None)
+    ref_year: Optional[int] = reference_year
+    while label_match is not None:
+        current, label_match = label_match, next(matches, None)
+        label = _LABEL_GROUPS[current.lastgroup]  # type: ignore[index]
+        if labels is not None and label not in labels:
+            continue
+        label_end = current.end()
+        limit = label_match.start() if label_match is not None else len(text)
+        m = _DATE_ONLY_RE.search(text, label_end, limit)
+        if m is None or m.start() - label_end > HINT_WINDOW:
+            continue
+        if ref_year is None:
+            ref_year = today_jst().year  # 年省略の日付を解釈するときだけ求める
+        start = _resolve_date(m, "a", ref_year)
+        if start is None:
+            continue
+        end = _resolve_date(m, "b", ref_year, base=start) if m.group("bm") or m.group("bsm") else None
+        yield (
+            DateMention(
+                label=label,
+                start=start,
+                end=end,
+                text=m.group("date").strip(),
+                pos=m.start(),
+            ),
+            m.start() - label_end <= _LABEL_WINDOW,
+        )
+
+
 def format_date_iso(d: Optional[date]) -> str:
     """date → "YYYY-MM-DD" 文字列。Noneなら空文字列を返す。"""
     return d.isoformat() if d else ""
@@ -0,0 +1,239 @@
+"""
+HTTP通信の記録・再生
+httpx のトランスポートを差し替え、検索・フェッチ・LLMの通信を HTTP_REPLAY_DIR に保存（record）、
+または保存済みの応答をネットワークを使わずに返す（replay）。
+本番の OpenRouter・Webサイトに依存しない、決定的なオフライン実行・性能計測のために使う。
+
+キーは メソッド + URL + リクエスト本文。chat/completions はモデルと user メッセージのみをキーにする
+（システムプロンプトに実行日が含まれるため、日付が変わっても同じ記録を再生できるようにする）。
+同じキーへの複数回の応答は順番に再生し、使い切った後は最後の応答を返し続ける。
+"""
+import base64
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from src.config import HTTP_REPLAY_DIR, HTTP_REPLAY_MODE
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 記録時に落とすヘッダ（本文は展開済みで保存するため、長さ・圧縮の情報は再生時に食い違う）
+_DROP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+# 記録時は条件付きリクエストを外し、常に本文付きの応答を保存する
+_CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+
+
+class ReplayStore:
+    def __init__(self, root: Path = HTTP_REPLAY_DIR) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._cursors: dict[str, int] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        body = request.content
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict) and "messages" in payload:
+            user_messages = [
+                m.get("content", "") for m in payload["messages"] if m.get("role") == "user"
+            ]
+            body = json.dumps(
+                {"model": payload.get("model"), "user": user_messages},
+                ensure_ascii=False,
+                sort_keys=True,
+            ).encode("utf-8")
+        digest = hashlib.sha256()
+        digest.update(f"{request.method} {request.url}\n".encode("utf-8"))
+        digest.update(body or b"")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def save(self, request: httpx.Request, status: int, headers: httpx.Headers, content: bytes) -> None:
+        exchange = {
+            "method": request.method,
+            "url": str(request.url),
+            "status": status,
+            "headers": [
+                [k, v] for k, v in headers.multi_items() if k.lower() not in _DROP_RESPONSE_HEADERS
+            ],
+        }
+        try:
+            exchange["text"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            exchange["base64"] = base64.b64encode(content).decode("ascii")
+
+        key = self.key(request)
+        path = self._path(key)
+        with self._lock:
+            exchanges = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+            exchanges.append(exchange)
+            path.write_text(json.dumps(exchanges, ensure_ascii=False, indent=1), encoding="utf-8")
+            self.recorded += 1
+
+    def load(self, request: httpx.Request) -> httpx.Response:
+        key = self.key(request)
+        path = self._path(key)
+        with self._lock:
+            if not path.exists():
+                self.missed += 1
+                logger.warning(f"再生データなし: {request.method} {request.url}")
+                raise httpx.ConnectError(f"再生データなし: {request.url}", request=request)
+            exchanges = json.loads(path.read_text(encoding="utf-8"))
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.replayed += 1
+        exchange = exchanges[min(cursor, len(exchanges) - 1)]
+
+        if "base64" in exchange:
+            content = base64.b64decode(exchange["base64"])
+        else:
+            content = exchange.get("text", "").encode("utf-8")
+        return httpx.Response(
+            exchange["status"],
+            headers=[tuple(h) for h in exchange["headers"]],
+            content=content,
+            request=request,
+        )
+
+
+def _strip_conditional(request: httpx.Request) -> None:
+    for name in _CONDITIONAL_HEADERS:
+        if name in request.headers:
+            del request.headers[name]
+
+
+def _copy_response(request: httpx.Request, response: httpx.Response, content: bytes) -> httpx.Response:
+    """展開済み本文で応答を作り直す（記録した内容と呼び出し側が受け取る内容を一致させる）"""
+    headers = [
+        (k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROP_RESPONSE_HEADERS
+    ]
+    return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """実通信を行い、応答を ReplayStore に保存する（LLMの同期クライアント用）"""
+
+    def __init__(self, store: ReplayStore, inner: httpx.BaseTransport) -> None:
+        self.store = store
+        self.inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        _strip_conditional(request)
+        response = self.inner.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        self.store.save(request, response.status_code, response.headers, content)
+        return _copy_response(request, response, content)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """RecordingTransport の非同期版（検索・フェッチ用）"""
+
+    def __init__(self, store: ReplayStore, inner: httpx.AsyncBaseTransport) -> None:
+        self.store = store
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        _strip_conditional(request)
+        response = await self.inner.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        self.store.save(request, response.status_code, response.headers, content)
+        return _copy_response(request, response, content)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """保存済みの応答を返す。記録が無いリクエストは接続エラーとして扱う"""
+
+    def __init__(self, store: ReplayStore) -> None:
+        self.store = store
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        return self.store.load(request)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, store: ReplayStore) -> None:
+        self.store = store
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return self.store.load(request)
+
+
+# ── クライアント生成側から使う入口 ─────────────────────────────────
+
+_store: Optional[ReplayStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[ReplayStore]:
+    """記録・再生モードなら共有の ReplayStore を返す（無効時は None）"""
+    global _store
+    if HTTP_REPLAY_MODE not in ("record", "replay"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ReplayStore()
+            logger.info(f"HTTP{'記録' if HTTP_REPLAY_MODE == 'record' else '再生'}モード: {_store.root}")
+        return _store
+
+
+def create_transport(limits: Optional[httpx.Limits] = None) -> Optional[httpx.BaseTransport]:
+    """
+    同期クライアント用のトランスポートを返す。通常モードでは None（httpx の既定を使う）。
+    transport を渡すとクライアントの limits は効かないため、記録時は内側のトランスポートに渡す。
+    """
+    store = get_store()
+    if store is None:
+        return None
+    if HTTP_REPLAY_MODE == "replay":
+        return ReplayTransport(store)
+    inner = httpx.HTTPTransport(limits=limits) if limits else httpx.HTTPTransport()
+    return RecordingTransport(store, inner)
+
+
+def create_async_transport(limits: Optional[httpx.Limits] = None) -> Optional[httpx.AsyncBaseTransport]:
+    """非同期クライアント用のトランスポートを返す。通常モードでは None"""
+    store = get_store()
+    if store is None:
+        return None
+    if HTTP_REPLAY_MODE == "replay":
+        return AsyncReplayTransport(store)
+    inner = httpx.AsyncHTTPTransport(limits=limits) if limits else httpx.AsyncHTTPTransport()
+    return AsyncRecordingTransport(store, inner)
+
+
+def log_replay_stats() -> None:
+    if _store is None:
+        return
+    logger.info(
+        f"HTTP記録・再生: 記録{_store.recorded}件 / 再生{_store.replayed}件 / 再生データなし{_store.missed}件"
+    )
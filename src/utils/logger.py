@@ -1,8 +1,11 @@
 """
 ロガー設定
 logs/YYYY-MM-DD.log ファイル + stdout の二重出力
+ログファイル（とログディレクトリ）は最初の出力時に作成し、import・get_logger() だけでは作らない
+常駐モードで日付をまたいだら、次の出力から新しい日付のファイルへ切り替える
 """
 import logging
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -10,6 +13,32 @@ from pathlib import Path
 from src.config import LOG_DIR
 
 
+def _log_path() -> Path:
+    return LOG_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.log"
+
+
+class _LazyFileHandler(logging.FileHandler):
+    """最初の emit でディレクトリごとファイルを開き、日付が変わったらファイルを切り替える FileHandler"""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path, encoding="utf-8", delay=True)
+
+    def _open(self):  # type: ignore[override]
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        path = os.path.abspath(_log_path())
+        if path != self.baseFilename:
+            self.acquire()
+            try:
+                self.close()
+                self.baseFilename = path
+            finally:
+                self.release()
+        super().emit(record)
+
+
 def get_logger(name: str = "reverse_accel") -> logging.Logger:
     """モジュール共通ロガーを返す（初回呼び出し時にハンドラをセットアップ）"""
     logger = logging.getLogger(name)
@@ -24,9 +53,7 @@ def get_logger(name: str = "reverse_accel") -> logging.Logger:
     )
 
     # ── ファイルハンドラ（YYYY-MM-DD.log） ───────────────────────
-    today = datetime.now().strftime("%Y-%m-%d")
-    log_file: Path = LOG_DIR / f"{today}.log"
-    fh = logging.FileHandler(log_file, encoding="utf-8")
+    fh = _LazyFileHandler(_log_path())
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(fmt)
 
@@ -0,0 +1,165 @@
+"""
+実行メトリクス（ステップ別の所要時間・リクエストレイテンシ・転送量）
+1回の実行ぶんをプロセス内に集計し、終了時に LOG_DIR/metrics-YYYY-MM-DD_HHMMSS.json へ書き出す。
+検索・フェッチ・LLMの各リクエストは observe() で記録する（スレッド・asyncio いずれからも呼べる）。
+"""
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.config import LOG_DIR
+from src.utils.dates import now_jst
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# レイテンシヒストグラムのバケット上限（ミリ秒）。最後のバケットはそれ以上すべて
+_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _summarize(values: list[float]) -> dict:
+    """秒単位の値リストから件数・分位点・ヒストグラム（ミリ秒）を作る"""
+    ms = sorted(v * 1000 for v in values)
+    histogram = {f"<={b}ms": 0 for b in _BUCKETS_MS}
+    histogram[f">{_BUCKETS_MS[-1]}ms"] = 0
+    for v in ms:
+        bucket = next((f"<={b}ms" for b in _BUCKETS_MS if v <= b), f">{_BUCKETS_MS[-1]}ms")
+        histogram[bucket] += 1
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 1) if ms else 0.0,
+        "p50_ms": round(_percentile(ms, 0.5), 1),
+        "p90_ms": round(_percentile(ms, 0.9), 1),
+        "p99_ms": round(_percentile(ms, 0.99), 1),
+        "max_ms": round(ms[-1], 1) if ms else 0.0,
+        "histogram": histogram,
+    }
+
+
+class RunMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at = now_jst()
+        self._started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.latencies: dict[str, list[float]] = {}
+        self.failures: dict[str, int] = {}
+        self.host_latencies: dict[str, list[float]] = {}
+        self.host_bytes: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """with ブロックの経過時間をステップ名で記録する（例外時も記録）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def observe(
+        self,
+        kind: str,
+        seconds: float,
+        ok: bool = True,
+        host: Optional[str] = None,
+        nbytes: int = 0,
+    ) -> None:
+        """1リクエストのレイテンシを記録する（kind: "search" / "fetch" / "llm"）"""
+        with self._lock:
+            self.latencies.setdefault(kind, []).append(seconds)
+            if not ok:
+                self.failures[kind] = self.failures.get(kind, 0) + 1
+            if host:
+                self.host_latencies.setdefault(host, []).append(seconds)
+                self.host_bytes[host] = self.host_bytes.get(host, 0) + nbytes
+            if nbytes:
+                self.counters["bytes_downloaded"] = self.counters.get("bytes_downloaded", 0) + nbytes
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _pages_per_sec(self) -> float:
+        seconds = self.stages.get("fetch_parse", 0.0)
+        pages = self.counters.get("pages_parsed", 0)
+        return round(pages / seconds, 2) if seconds else 0.0
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "total_sec": round(time.perf_counter() - self._started, 3),
+                "stages_sec": {k: round(v, 3) for k, v in self.stages.items()},
+                "requests": {
+                    kind: {**_summarize(values), "failures": self.failures.get(kind, 0)}
+                    for kind, values in self.latencies.items()
+                },
+                "hosts": {
+                    host: {
+                        "count": len(values),
+                        "mean_ms": round(sum(values) / len(values) * 1000, 1),
+                        "max_ms": round(max(values) * 1000, 1),
+                        "bytes": self.host_bytes.get(host, 0),
+                    }
+                    for host, values in sorted(self.host_latencies.items())
+                },
+                "counters": dict(self.counters),
+                "pages_per_sec": self._pages_per_sec(),
+            }
+
+    def summary_lines(self) -> list[str]:
+        """メール本文用の短い処理時間サマリー"""
+        data = self.to_dict()
+        stages = " / ".join(f"{k} {v:.1f}秒" for k, v in data["stages_sec"].items())
+        lines = [f"合計 {data['total_sec']:.1f}秒（{stages}）" if stages else f"合計 {data['total_sec']:.1f}秒"]
+        for kind, req in data["requests"].items():
+            lines.append(
+                f"{kind}: {req['count']}件 p50 {req['p50_ms']:.0f}ms / p90 {req['p90_ms']:.0f}ms"
+                f" / 最大 {req['max_ms']:.0f}ms（失敗{req['failures']}件）"
+            )
+        downloaded = data["counters"].get("bytes_downloaded", 0)
+        if downloaded or data["pages_per_sec"]:
+            lines.append(f"取得 {downloaded / 1_000_000:.2f}MB / 解析 {data['pages_per_sec']}ページ/秒")
+        return lines
+
+    def write(self, log_dir: Path = LOG_DIR) -> Optional[Path]:
+        """メトリクスJSONを書き出してパスを返す（失敗しても実行は止めない）"""
+        path = log_dir / f"metrics-{self.started_at.strftime('%Y-%m-%d_%H%M%S')}.json"
+        try:
+            path.write_text(
+                json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+        except OSError as e:
+            logger.warning(f"メトリクス書き出し失敗: {e}")
+            return None
+        logger.info(f"メトリクス保存: {path}")
+        return path
+
+
+_current = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    """現在の実行のメトリクスを返す"""
+    return _current
+
+
+def start_run() -> RunMetrics:
+    """新しい実行のメトリクスを開始する（main() の先頭で呼ぶ）"""
+    global _current
+    _current = RunMetrics()
+    return _current
@@ -0,0 +1,128 @@
+"""
+常駐モード用のウォームプール（httpx クライアント・解析プロセス・読み込み済みストア）
+通常の1回実行では従来どおり、呼び出しごとに作成して閉じる。
+keep_warm() の後（src/daemon.py）は名前ごとに1つだけ作成して実行をまたいで使い回し、
+close_all() でまとめて閉じる。使用中に例外が出たリソースは破棄し、次回作り直す。
+
+同期関数からのコルーチン実行は run_async() を通す。常駐中は同じイベントループを使い続ける
+（httpx.AsyncClient の接続プールは作成したイベントループでしか使えないため）。
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+_warm = False
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_resources: dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def keep_warm() -> None:
+    """以降のリソースを実行をまたいで保持する（デーモン起動時に1回呼ぶ）"""
+    global _warm
+    _warm = True
+
+
+def is_warm() -> bool:
+    return _warm
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """asyncio.run の代わり。常駐中は保持しているイベントループで実行する"""
+    global _loop
+    if not _warm:
+        return asyncio.run(coro)  # type: ignore[arg-type]
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+def _get_or_create(name: str, factory: Callable[[], T]) -> T:
+    with _lock:
+        resource = _resources.get(name)
+        if resource is None:
+            resource = factory()
+            _resources[name] = resource
+            logger.debug(f"ウォームプール作成: {name}")
+        return resource  # type: ignore[return-value]
+
+
+def _discard(name: str) -> None:
+    with _lock:
+        resource = _resources.pop(name, None)
+    if resource is not None:
+        _close(name, resource)
+
+
+def _close(name: str, resource: object) -> None:
+    try:
+        aclose = getattr(resource, "aclose", None)
+        if aclose is not None:
+            if _loop is not None and not _loop.is_closed():
+                _loop.run_until_complete(aclose())
+        elif hasattr(resource, "close"):
+            resource.close()  # type: ignore[attr-defined]
+        elif hasattr(resource, "shutdown"):
+            resource.shutdown()  # type: ignore[attr-defined]
+    except Exception as e:
+        logger.warning(f"ウォームプール終了失敗 [{name}]: {e}")
+
+
+@contextmanager
+def pooled(name: str, factory: Callable[[], T]) -> Iterator[T]:
+    """
+    with 文で使える同期リソース（httpx.Client・Executor）を返す。
+    常駐中でなければ factory() を with で開いて閉じる。
+    """
+    if not _warm:
+        with factory() as resource:  # type: ignore[attr-defined]
+            yield resource
+        return
+    resource = _get_or_create(name, factory)
+    try:
+        yield resource
+    except BaseException:
+        _discard(name)
+        raise
+
+
+@asynccontextmanager
+async def pooled_async(name: str, factory: Callable[[], T]) -> AsyncIterator[T]:
+    """async with 文で使える非同期リソース（httpx.AsyncClient）を返す"""
+    if not _warm:
+        async with factory() as resource:  # type: ignore[attr-defined]
+            yield resource
+        return
+    resource = _get_or_create(name, factory)
+    try:
+        yield resource
+    except BaseException:
+        with _lock:
+            _resources.pop(name, None)
+        await resource.aclose()  # type: ignore[attr-defined]
+        raise
+
+
+def warm_resource(name: str, factory: Callable[[], T]) -> T:
+    """閉じる必要のない読み込み済みオブジェクト（LLMCache など）を返す。常駐中でなければ毎回作る"""
+    return _get_or_create(name, factory) if _warm else factory()
+
+
+def close_all() -> None:
+    """保持しているリソースとイベントループを閉じる（デーモン終了時）"""
+    global _loop
+    with _lock:
+        resources = list(_resources.items())
+        _resources.clear()
+    for name, resource in resources:
+        _close(name, resource)
+    if _loop is not None and not _loop.is_closed():
+        _loop.close()
+    _loop = None
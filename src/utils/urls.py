@@ -0,0 +1,59 @@
+"""
+URL正規化ユーティリティ
+重複判定用に、同一ページを指すURLの表記ゆれを吸収する
+"""
+from urllib.parse import urlsplit, urlunsplit
+
+# 除去するトラッキング用クエリパラメータ（utm_* は接頭辞で判定）
+_TRACKING_PARAMS = {
+    "gclid",
+    "fbclid",
+    "yclid",
+    "msclkid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name.startswith("utm_") or name in _TRACKING_PARAMS
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    URLを正規化する。
+      - スキーム・ホスト名を小文字化、既定ポートを除去
+      - フラグメント（#...）を除去
+      - utm_* などのトラッキングパラメータを除去（その他のクエリは順序を維持）
+      - 末尾スラッシュを除去（ルートパスは "/" に統一）
+    解析できないURLは前後の空白を除いてそのまま返す。
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower()
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+
+    path = parts.path.rstrip("/") or "/"
+    # パーセントエンコーディングを崩さないよう、クエリは文字列のまま分割・結合する
+    query = "&".join(
+        pair
+        for pair in parts.query.split("&")
+        if pair and not _is_tracking_param(pair.split("=", 1)[0])
+    )
+    return urlunsplit((scheme, host, path, query, ""))
@@ -0,0 +1,34 @@
+"""
+テスト共通設定
+src.config は import 時にデータディレクトリ等を決めるため、src を読み込む前に環境変数で
+一時ディレクトリ・オフライン設定へ差し替える（.env より環境変数が優先される）。
+"""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_ROOT = Path(__file__).resolve().parent.parent
+_DATA_DIR = Path(tempfile.mkdtemp(prefix="reverse-accel-test-"))
+
+os.environ["REVERSE_ACCEL_DATA_DIR"] = str(_DATA_DIR)
+os.environ["PROFILES_FILE"] = str(_DATA_DIR / "profiles.json")
+os.environ["DISCOVERY_ENABLED"] = "0"
+os.environ["EMAIL_DRY_RUN"] = "1"
+os.environ["OPENROUTER_API_KEY"] = "dummy"
+os.environ["OPENROUTER_BASE_URL"] = "http://127.0.0.1:9/api/v1"
+os.environ["HTTP_REPLAY_MODE"] = ""
+
+sys.path.insert(0, str(_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def data_dir() -> Path:
+    """テストごとに空のデータディレクトリを用意する"""
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
+    _DATA_DIR.mkdir(parents=True)
+    yield _DATA_DIR
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
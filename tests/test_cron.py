@@ -0,0 +1,73 @@
+"""cron 形式の実行予定の解析と次回・直近の実行日時"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.cron import CronSchedule
+from src.utils.dates import JST
+
+
+def _jst(*args: int) -> datetime:
+    return datetime(*args, tzinfo=JST)
+
+
+@pytest.mark.parametrize(
+    "expr, minutes, hours",
+    [
+        ("0 10 * * *", [0], [10]),
+        ("*/15 9-17/4 * * *", [0, 15, 30, 45], [9, 13, 17]),
+        ("5,35 8,20 * * *", [5, 35], [8, 20]),
+        ("50/5 0 * * *", [50, 55], [0]),
+    ],
+)
+def test_parse_minutes_and_hours(expr: str, minutes: list[int], hours: list[int]) -> None:
+    schedule = CronSchedule(expr)
+
+    assert schedule.minutes == minutes
+    assert schedule.hours == hours
+
+
+def test_weekday_seven_is_sunday() -> None:
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+
+
+@pytest.mark.parametrize(
+    "expr",
+    ["0 10 * *", "0 10 * * * *", "60 10 * * *", "0 24 * * *", "0 10 0 * *", "*/0 * * * *", "a * * * *", "0 5-3 * * *"],
+)
+def test_invalid_expressions_raise(expr: str) -> None:
+    with pytest.raises(ValueError):
+        CronSchedule(expr)
+
+
+@pytest.mark.parametrize(
+    "expr, now, expected",
+    [
+        # 当日の予定前・予定ちょうど（次は翌日）・日付をまたぐ
+        ("0 10 * * *", _jst(2026, 10, 17, 9, 59, 30), _jst(2026, 10, 17, 10, 0)),
+        ("0 10 * * *", _jst(2026, 10, 17, 10, 0), _jst(2026, 10, 18, 10, 0)),
+        ("30 23 * * *", _jst(2026, 12, 31, 23, 45), _jst(2027, 1, 1, 23, 30)),
+        # 2026-10-17 は土曜日。平日のみ → 月曜日
+        ("0 9 * * 1-5", _jst(2026, 10, 17, 8, 0), _jst(2026, 10, 19, 9, 0)),
+        # 日と曜日の両方を指定した場合はどちらかに一致すればよい（20日 or 日曜）
+        ("0 9 20 * 0", _jst(2026, 10, 17, 12, 0), _jst(2026, 10, 18, 9, 0)),
+        # 31日の無い月は飛ばす
+        ("0 0 31 * *", _jst(2026, 11, 1, 0, 0), _jst(2026, 12, 31, 0, 0)),
+        ("0 0 29 2 *", _jst(2026, 3, 1, 0, 0), _jst(2028, 2, 29, 0, 0)),
+    ],
+)
+def test_next_after(expr: str, now: datetime, expected: datetime) -> None:
+    assert CronSchedule(expr).next_after(now) == expected
+
+
+def test_next_after_gives_up_beyond_max_days() -> None:
+    assert CronSchedule("0 0 30 2 *").next_after(_jst(2026, 1, 1), max_days=366) is None
+
+
+def test_last_at_or_before() -> None:
+    schedule = CronSchedule("0 10 * * *")
+    now = _jst(2026, 10, 17, 9, 0)
+
+    assert schedule.last_at_or_before(now, timedelta(days=1)) == _jst(2026, 10, 16, 10, 0)
+    assert schedule.last_at_or_before(now, timedelta(hours=12)) is None
+    assert schedule.last_at_or_before(_jst(2026, 10, 17, 10, 0, 30), timedelta(hours=1)) == _jst(2026, 10, 17, 10, 0)
@@ -0,0 +1,92 @@
+"""直接収集のカーソル・再試行: 返した記事は処理できたものだけ処理済みになり、取りこぼさない"""
+from datetime import timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+
+import src.search.discovery as discovery_mod
+from src.config import DISCOVERY_MAX_RETRIES
+from src.search.discovery import SourceDiscovery
+from src.utils.dates import now_jst
+
+HOST = "news.example.com"
+SITEMAP = f"https://{HOST}/sitemap.xml"
+ARTICLES = [f"https://{HOST}/articles/{i}" for i in range(5)]
+
+
+def _sitemap(urls: list[str]) -> str:
+    now = now_jst()
+    # 先頭ほど古い（1時間刻み）
+    rows = "".join(
+        f"<url><loc>{url}</loc><lastmod>{(now - timedelta(hours=len(urls) - i)).isoformat(timespec='seconds')}</lastmod></url>"
+        for i, url in enumerate(urls)
+    )
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{rows}</urlset>'
+
+
+@pytest.fixture
+def make_discovery(monkeypatch: pytest.MonkeyPatch, data_dir: Path):
+    body = _sitemap(ARTICLES)
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url) == SITEMAP:
+            return httpx.Response(200, text=body, headers={"content-type": "application/xml"})
+        return httpx.Response(404)
+
+    monkeypatch.setattr(
+        discovery_mod, "_create_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    )
+    sources = {HOST: {"feeds": [SITEMAP]}}
+    state_file = data_dir / "discovery_state.json"
+    return lambda max_urls=2: SourceDiscovery(sources, state_file, max_urls=max_urls)
+
+
+def test_cursor_returns_every_entry_once_oldest_first(make_discovery) -> None:
+    returned: list[str] = []
+    for _ in range(4):
+        discovery = make_discovery()
+        urls = discovery.discover()
+        discovery.commit(urls)
+        returned.extend(urls)
+
+    assert returned == ARTICLES
+
+
+def test_failed_fetch_is_returned_again(make_discovery) -> None:
+    discovery = make_discovery()
+    first = discovery.discover()
+    assert first == ARTICLES[:2]
+    discovery.commit(done=[first[0]])  # first[1] は取得に失敗した
+
+    discovery = make_discovery()
+    second = discovery.discover()
+    assert second == [ARTICLES[1], *ARTICLES[2:4]]
+
+
+def test_failed_run_returns_everything_again(make_discovery) -> None:
+    discovery = make_discovery()
+    first = discovery.discover()
+    discovery.commit(done=[])  # 評価・通知で失敗した
+
+    discovery = make_discovery()
+    assert discovery.discover()[:2] == first
+
+
+def test_uncommitted_run_does_not_advance(make_discovery) -> None:
+    first = make_discovery().discover()  # commit() 前に停止した
+
+    assert make_discovery().discover() == first
+
+
+def test_retries_are_bounded(make_discovery) -> None:
+    attempts = 0
+    while True:
+        discovery = make_discovery(max_urls=len(ARTICLES))
+        urls = discovery.discover()
+        if ARTICLES[0] not in urls:
+            break
+        attempts += 1
+        discovery.commit(done=[u for u in urls if u != ARTICLES[0]])
+
+    assert attempts == DISCOVERY_MAX_RETRIES + 1
@@ -0,0 +1,16 @@
+"""LLM評価キャッシュのキー: 視点の文面が既定と異なるプロファイルは既定のキャッシュを使わない"""
+from src.crawl.parse import ParsedPage
+from src.llm.formatter import _cache_key
+from src.profiles import DEFAULT_PROFILE, Profile
+
+PAGE = ParsedPage(url="https://example.com/program", title="募集", body_text="本文")
+
+
+def test_default_named_profile_with_other_company_gets_own_key() -> None:
+    other = Profile(name="default", company="OtherCo")
+
+    assert _cache_key(PAGE, other) != _cache_key(PAGE, DEFAULT_PROFILE)
+
+
+def test_profile_with_default_prompt_shares_default_key() -> None:
+    assert _cache_key(PAGE, Profile(name="copy")) == _cache_key(PAGE, DEFAULT_PROFILE)
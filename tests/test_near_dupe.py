@@ -0,0 +1,60 @@
+"""近似重複の索引: 閾値以内の指紋は必ず見つかり、古い指紋は削除される"""
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.filter.near_dupe import NearDupIndex, hamming, simhash
+
+
+def _flip(fp: int, bits: list[int]) -> int:
+    for bit in bits:
+        fp ^= 1 << bit
+    return fp
+
+
+@pytest.fixture
+def index(data_dir: Path):
+    with NearDupIndex(data_dir / "fingerprints.db", max_hamming=8, bands=3) as idx:
+        yield idx
+
+
+def test_finds_every_fingerprint_within_threshold(index: NearDupIndex) -> None:
+    rng = random.Random(0)
+    stored = [rng.getrandbits(64) for _ in range(500)]
+    index.persist((f"https://example.com/{i}", fp) for i, fp in enumerate(stored))
+
+    for i, fp in enumerate(stored[:200]):
+        probe = _flip(fp, rng.sample(range(64), rng.randint(0, 8)))
+        assert index.find(probe) is not None, i
+
+
+def test_ignores_fingerprints_beyond_threshold(index: NearDupIndex) -> None:
+    fp = 0x0123456789ABCDEF
+    index.persist([("https://example.com/a", fp)])
+
+    far = _flip(fp, list(range(0, 64, 7)))  # 10ビット差
+    assert hamming(fp, far) == 10
+    assert index.find(far) is None
+    assert index.find(fp, exclude_url="https://example.com/a") is None
+
+
+def test_session_fingerprints_are_matched(index: NearDupIndex) -> None:
+    fp = simhash("建設現場のDXに取り組むスタートアップを募集します。" * 10)
+    index.add_session("https://example.com/a", fp)
+
+    assert index.find(_flip(fp, [1, 30, 60])) == "https://example.com/a"
+
+
+def test_prunes_old_fingerprints(data_dir: Path) -> None:
+    db = data_dir / "fingerprints.db"
+    with NearDupIndex(db) as idx:
+        idx.persist([("https://example.com/old", 1), ("https://example.com/new", 2)])
+    with sqlite3.connect(db) as conn:
+        conn.execute("UPDATE fingerprints SET added_at = '2000-01-01T00:00:00+09:00' WHERE url LIKE '%old'")
+
+    with NearDupIndex(db, max_age_days=180) as idx:
+        assert idx.find(1) == "https://example.com/new"  # 1 と 2 は2ビット差
+        assert idx._conn.execute("SELECT url FROM fingerprints").fetchall() == [("https://example.com/new",)]
+        assert idx._conn.execute("SELECT COUNT(*) FROM bands WHERE url LIKE '%old'").fetchone() == (0,)
@@ -0,0 +1,34 @@
+"""lxml 高速版パーサーが bs4 版と同じ ParsedPage を返すこと"""
+from datetime import date
+
+import pytest
+
+from bench.bench_parse_backends import load_fixtures
+from src.crawl.fast_parse import parse_html_lxml
+from src.crawl.parse import parse_html_bs4
+
+FIXTURES = load_fixtures()
+
+
+@pytest.mark.parametrize(
+    "url, html", [(url, html) for _, url, html in FIXTURES], ids=[name for name, _, _ in FIXTURES]
+)
+def test_fixture_matches_bs4(url: str, html: str) -> None:
+    assert parse_html_lxml(url, html) == parse_html_bs4(url, html)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "<div><!-- main -->応募締切：2026年11月30日まで<p>本文です</p><!-- /main --> 続き</div>",
+        "<div>応募<?php echo 1; ?>締切：2026年11月30日<script>x<!-- y -->z</script><!-- c -->まで</div>",
+    ],
+)
+def test_comment_tails_are_kept(body: str) -> None:
+    url = "https://example.com/news/1"
+    html = f"<html><head><title>募集</title></head><body>{body}</body></html>"
+
+    page = parse_html_lxml(url, html)
+
+    assert page == parse_html_bs4(url, html)
+    assert page.deadline_date == date(2026, 11, 30)
@@ -0,0 +1,100 @@
+"""main() の再開モード（送信失敗時は送信済みURLを保存せず、再開時に送り直す）と重複件数の集計"""
+import json
+from pathlib import Path
+
+import pytest
+
+import src.main as main_mod
+from src.crawl.parse import ParsedPage
+from src.filter.seen_store import SeenUrlStore
+from src.profiles import DEFAULT_PROFILE
+from src.utils.dates import today_jst
+from src.utils.metrics import RunMetrics
+
+URLS = [f"https://example.com/program/{i}" for i in range(3)]
+
+
+def _page(url: str) -> ParsedPage:
+    return ParsedPage(url=url, title=f"案件 {url}", body_text="本文", published_date=today_jst())
+
+
+def _record(page: ParsedPage) -> dict:
+    return {"参照URL": page.url, "タイトル": page.title, "is_active": True, "参加お勧め度": 3}
+
+
+@pytest.fixture
+def send_outcomes() -> list[bool]:
+    """send_report が順に返す値（既定は1回目だけ送信失敗）"""
+    return [False, True]
+
+
+@pytest.fixture
+def sent_reports(monkeypatch: pytest.MonkeyPatch, send_outcomes: list[bool]) -> list[dict]:
+    """検索・取得・LLM評価を差し替え、send_report の呼び出しを記録する"""
+    monkeypatch.setattr(main_mod, "fetch_candidate_urls", lambda profiles: (list(URLS), 0))
+    monkeypatch.setattr(
+        main_mod, "fetch_and_parse_sync", lambda urls: ([_page(u) for u in urls], [])
+    )
+    monkeypatch.setattr(
+        main_mod,
+        "format_pages",
+        lambda pages, checkpoint=None, profile=None: ([_record(p) for p in pages], [], []),
+    )
+    monkeypatch.setattr(RunMetrics, "write", lambda self, *args, **kwargs: None)
+
+    reports: list[dict] = []
+    outcomes = iter(send_outcomes)
+
+    def _send_report(**kwargs: object) -> bool:
+        reports.append(kwargs)
+        return next(outcomes)
+
+    monkeypatch.setattr(main_mod, "send_report", _send_report)
+    return reports
+
+
+def _seen_count() -> int:
+    with SeenUrlStore(DEFAULT_PROFILE.seen_db, legacy_json=None) as store:
+        return store.count()
+
+
+def _mark_sent(urls: list[str]) -> None:
+    with SeenUrlStore(DEFAULT_PROFILE.seen_db, legacy_json=None) as store:
+        store.mark_sent(urls)
+
+
+def test_failed_send_does_not_mark_urls_sent(sent_reports: list[dict]) -> None:
+    main_mod.main()
+
+    assert len(sent_reports) == 1
+    assert len(sent_reports[0]["registered"]) == len(URLS)
+    assert _seen_count() == 0
+
+
+def test_resume_resends_records_after_failed_send(sent_reports: list[dict]) -> None:
+    main_mod.main()
+    main_mod.main(resume=True)
+
+    assert len(sent_reports) == 2
+    resent = sent_reports[1]
+    assert [r["参照URL"] for r in resent["registered"]] == [r["参照URL"] for r in sent_reports[0]["registered"]]
+    assert resent["duplicate_count"] == 0
+    assert _seen_count() == len(URLS)
+
+    # 送信に成功した後の再開では何もしない
+    main_mod.main(resume=True)
+    assert len(sent_reports) == 2
+
+
+@pytest.mark.parametrize("send_outcomes", [[True, True]])
+def test_url_already_sent_by_one_profile_counts_once(sent_reports: list[dict], data_dir: Path) -> None:
+    # 他のプロファイルが未送信のため取得されたURLを、送信済みのプロファイルで二重に数えない
+    (data_dir / "profiles.json").write_text(
+        json.dumps([{"name": "default"}, {"name": "other", "company": "OtherCo"}]), encoding="utf-8"
+    )
+    _mark_sent(URLS[:1])
+
+    main_mod.main()
+
+    counts = {report["profile"].name: report["duplicate_count"] for report in sent_reports}
+    assert counts == {"default": 1, "other": 0}